@@ -0,0 +1,86 @@
+import asyncio
+import weakref
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from config import settings
+from database import REPLICA_URLS, SQLALCHEMY_DATABASE_URL, configure_sqlite, pool_options
+from utils.db_pool import InstrumentedAsyncQueuePool
+from utils.replicas import ReplicaRouter, reader_id
+
+# Async drivers for the databases DATABASE_URL may point at
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    """
+    The URL of the same database with its async driver.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend} databases; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def create_async_database_engine(url: str, read_only: bool = False):
+    if url.startswith("sqlite"):
+        async_engine = create_async_engine(
+            url,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            **pool_options(url, InstrumentedAsyncQueuePool)
+        )
+        if settings.SQLITE_PROFILE == "tuned":
+            configure_sqlite(async_engine.sync_engine, read_only)
+        return async_engine
+    return create_async_engine(
+        url,
+        connect_args={"timeout": settings.DB_CONNECT_TIMEOUT},
+        **pool_options(url, InstrumentedAsyncQueuePool)
+    )
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(SQLALCHEMY_DATABASE_URL)
+
+# A second engine on the same database, for routes that await their queries
+# instead of holding a threadpool thread for the whole request
+async_engine = create_async_database_engine(ASYNC_DATABASE_URL)
+
+# Objects stay readable after commit; reloading them lazily would need IO outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# The read replicas, for the async read-only routes
+async_replica_engines = [create_async_database_engine(async_database_url(url), read_only=True) for url in REPLICA_URLS]
+async_read_router = ReplicaRouter(
+    AsyncSessionLocal,
+    [
+        async_sessionmaker(replica, autoflush=False, expire_on_commit=False, info={"replica": True})
+        for replica in async_replica_engines
+    ],
+    settings.REPLICA_RETRY_SECONDS
+)
+
+# Requests that may hold an async session at once, per event loop. The
+# rest wait here in arrival order: asyncio.Semaphore is fair, whereas a
+# connection handed back to the pool can be taken by a newcomer before the
+# waiter it woke, which sends that waiter to the back of the queue.
+SESSION_SLOTS = settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0)
+_session_slots = weakref.WeakKeyDictionary()
+
+def session_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _session_slots.get(loop)
+    if slots is None:
+        slots = _session_slots[loop] = asyncio.Semaphore(SESSION_SLOTS)
+    return slots
+
+# Dependency: for getting an async DB session in async routes
+async def get_async_db():
+    async with session_slots():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+# Dependency: for async read-only routes; a replica session unless the reader just wrote
+async def get_async_read_db(request: Request):
+    async with session_slots():
+        db = await async_read_router.async_session(reader_id(request.headers.get("authorization")))
+        async with db:
+            yield db
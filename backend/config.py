@@ -9,15 +9,132 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "secret_disaster_key_change_in_production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+    # Revoked sessions: checked against an in-memory Bloom filter on every request, which
+    # picks up sessions revoked by other workers every REVOCATION_SYNC_SECONDS. Each sync rereads
+    # the last REVOCATION_SYNC_OVERLAP_SECONDS of revocations, for rows that committed late
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    REVOCATION_SYNC_OVERLAP_SECONDS: float = float(os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", "60"))
+    REVOCATION_FILTER_CAPACITY: int = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+    REVOCATION_FILTER_ERROR_RATE: float = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.001"))
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./disaster.db")
-    
+
+    # Read replicas (comma-separated URLs) for the read-only routes; reads
+    # of a user who wrote in the last READ_YOUR_WRITES_SECONDS go to the primary
+    DATABASE_REPLICA_URLS: list = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    REPLICA_RETRY_SECONDS: float = float(os.getenv("REPLICA_RETRY_SECONDS", "10"))  # a replica that failed is skipped this long
+
+    # Async engine for the async routes; derived from DATABASE_URL (aiosqlite / asyncpg) when empty
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # Connection pool, per process and engine: each uvicorn worker opens up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections for the sync engine and as many
+    # for the async one. PostgreSQL only, apart from the sizes
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds a checkout waits before failing
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # replace connections older than this; -1 never
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_CONNECT_TIMEOUT: int = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+    # SQLite: "tuned" applies WAL, synchronous=NORMAL and the settings below to every
+    # connection; "default" leaves SQLite's own defaults
+    SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "tuned")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))  # 256MB
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # 64MB per connection
+    # Single writer thread that commits small writes from many requests together
+    SQLITE_GROUP_COMMIT: bool = os.getenv("SQLITE_GROUP_COMMIT", "false").lower() == "true"
+    SQLITE_GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("SQLITE_GROUP_COMMIT_MAX_BATCH", "64"))
+    SQLITE_GROUP_COMMIT_WINDOW_MS: float = float(os.getenv("SQLITE_GROUP_COMMIT_WINDOW_MS", "2"))
+
+    # Schema migrations: workers only check the schema version at startup and refuse an outdated
+    # one; run scripts/migrate.py before deploying, while the running release keeps serving.
+    # MIGRATE_ON_STARTUP=true lets a worker migrate itself, backfills included (for development).
+    # Backfills commit MIGRATION_BATCH_SIZE rows at a time
+    MIGRATE_ON_STARTUP: bool = os.getenv("MIGRATE_ON_STARTUP", "false").lower() == "true"
+    MIGRATION_BATCH_SIZE: int = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
+    MIGRATION_BATCH_PAUSE_MS: float = float(os.getenv("MIGRATION_BATCH_PAUSE_MS", "50"))
+
     # File Upload
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", "5242880"))  # 5MB default
     ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+    PHOTO_DERIVATIVES_ENABLED: bool = os.getenv("PHOTO_DERIVATIVES_ENABLED", "true").lower() == "true"
+    DERIVATIVE_WORKERS: int = int(os.getenv("DERIVATIVE_WORKERS", "2"))
     
+    # Request feed pagination: FEED_PAGE_SIZE applies when a cursor comes without a limit; with neither
+    # the feed is returned whole, as clients that do not follow X-Next-Cursor expect
+    FEED_PAGE_SIZE: int = int(os.getenv("FEED_PAGE_SIZE", "100"))
+    FEED_MAX_PAGE_SIZE: int = int(os.getenv("FEED_MAX_PAGE_SIZE", "500"))
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+    # Bulk request ingestion
+    BULK_MAX_ROWS: int = int(os.getenv("BULK_MAX_ROWS", "5000"))
+    BULK_MAX_BYTES: int = int(os.getenv("BULK_MAX_BYTES", "10485760"))  # 10MB default
+    BULK_INSERT_CHUNK_SIZE: int = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+
+    # Feed cache: "memory" (per process), "sqlite" (shared by all workers on the host) or "none"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", "33554432"))  # 32MB default
+    CACHE_SQLITE_PATH: str = os.getenv("CACHE_SQLITE_PATH", "cache.db")
+
+    # Password hashing: bcrypt cost (pick it with scripts/calibrate_bcrypt.py) and the
+    # dedicated pool /login and /signup hash on; callers beyond HASH_MAX_PENDING get a 503
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+    HASH_MAX_PENDING: int = int(os.getenv("HASH_MAX_PENDING", "32"))
+    HASH_RETRY_AFTER_SECONDS: int = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "2"))
+
+    # Authenticated users, cached by id with the same backend as the feed cache
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+    # Live feed events (Server-Sent Events): "memory" (per process) or "sqlite" (shared by all workers on the host)
+    EVENTS_BACKEND: str = os.getenv("EVENTS_BACKEND", "memory")
+    EVENTS_SQLITE_PATH: str = os.getenv("EVENTS_SQLITE_PATH", "events.db")
+    EVENTS_RETENTION: int = int(os.getenv("EVENTS_RETENTION", "10000"))  # events kept for clients resuming after a reconnect
+    EVENTS_POLL_SECONDS: float = float(os.getenv("EVENTS_POLL_SECONDS", "0.25"))
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_SUBSCRIBER_QUEUE: int = int(os.getenv("EVENTS_SUBSCRIBER_QUEUE", "256"))  # batches a client may fall behind
+
+    # Geocoding and nearby search
+    GAZETTEER_PATH: str = os.getenv("GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv"))
+    GEOCODE_CACHE_SIZE: int = int(os.getenv("GEOCODE_CACHE_SIZE", "4096"))
+    GEOHASH_PRECISION: int = int(os.getenv("GEOHASH_PRECISION", "9"))  # ~5m cells
+    NEARBY_DEFAULT_RADIUS_KM: float = float(os.getenv("NEARBY_DEFAULT_RADIUS_KM", "10"))
+    NEARBY_MAX_RADIUS_KM: float = float(os.getenv("NEARBY_MAX_RADIUS_KM", "200"))
+    NEARBY_MAX_CELLS: int = int(os.getenv("NEARBY_MAX_CELLS", "16"))
+
+    # Volunteer service areas: covered by geohash cells of this precision (4 = ~39 x 20 km)
+    SERVICE_AREA_PRECISION: int = int(os.getenv("SERVICE_AREA_PRECISION", "4"))
+    SERVICE_AREA_MAX_RADIUS_KM: float = float(os.getenv("SERVICE_AREA_MAX_RADIUS_KM", "200"))
+    SERVICE_AREA_MAX_AREAS: int = int(os.getenv("SERVICE_AREA_MAX_AREAS", "10"))
+
+    # Volunteer notification fan-out
+    NOTIFY_BATCH_SIZE: int = int(os.getenv("NOTIFY_BATCH_SIZE", "500"))  # volunteers per claim/send/commit round
+    NOTIFY_MAIL_WORKERS: int = int(os.getenv("NOTIFY_MAIL_WORKERS", "8"))
+    NOTIFY_COALESCE_SECONDS: float = float(os.getenv("NOTIFY_COALESCE_SECONDS", "120"))  # edits to a request within this window send one update
+    NOTIFY_DIGEST_MINUTES: float = float(os.getenv("NOTIFY_DIGEST_MINUTES", "60"))  # how often digest-mode volunteers get their summary
+
+    # Notification outbox workers: "inprocess" runs them inside the API, "external"
+    # leaves the outbox to `python -m workers.notifications`
+    NOTIFY_WORKER_MODE: str = os.getenv("NOTIFY_WORKER_MODE", "inprocess")
+    NOTIFY_WORKERS: int = int(os.getenv("NOTIFY_WORKERS", "2"))
+    NOTIFY_CLAIM_BATCH: int = int(os.getenv("NOTIFY_CLAIM_BATCH", "10"))
+    NOTIFY_POLL_SECONDS: float = float(os.getenv("NOTIFY_POLL_SECONDS", "1"))
+    NOTIFY_LEASE_SECONDS: int = int(os.getenv("NOTIFY_LEASE_SECONDS", "600"))
+    NOTIFY_MAX_ATTEMPTS: int = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "6"))
+    NOTIFY_RETRY_BASE_SECONDS: float = float(os.getenv("NOTIFY_RETRY_BASE_SECONDS", "5"))
+    NOTIFY_RETRY_MAX_SECONDS: float = float(os.getenv("NOTIFY_RETRY_MAX_SECONDS", "900"))
+    NOTIFY_JOB_RETENTION_HOURS: int = int(os.getenv("NOTIFY_JOB_RETENTION_HOURS", "24"))
+
     # CORS - Allow production and dev ports
     _cors_raw = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001,http://127.0.0.1:3000,http://127.0.0.1:3001")
     CORS_ORIGINS: list = [origin.strip() for origin in _cors_raw.split(",") if origin.strip()]
@@ -28,6 +145,13 @@ class Settings:
     SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     EMAIL_FROM: str = os.getenv("EMAIL_FROM", "disaster-relief@example.com")
+    EMAIL_BACKEND: str = os.getenv("EMAIL_BACKEND", "log")  # "log" (print only) or "smtp"
+    SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "4"))  # connections open at once
+    SMTP_RATE_LIMIT: float = float(os.getenv("SMTP_RATE_LIMIT", "0"))  # messages per second, 0 = unlimited
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    SMTP_IDLE_SECONDS: float = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "30"))
 
 settings = Settings()
 
@@ -1,27 +1,95 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from config import settings
+from utils.db_pool import InstrumentedQueuePool
+from utils.replicas import ReplicaRouter, reader_id
+
+def normalize_database_url(url: str) -> str:
+    # Fix for older Heroku/Railway PostgreSQL URLs which use 'postgres://' instead of 'postgresql://'
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
 
 # Hybrid Database URL handling
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+SQLALCHEMY_DATABASE_URL = normalize_database_url(settings.DATABASE_URL)
+REPLICA_URLS = [normalize_database_url(url) for url in settings.DATABASE_REPLICA_URLS]
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """
+    The SQLite settings of the "tuned" profile: WAL so readers never block
+    the writer, one fsync per checkpoint instead of per commit, waiting on
+    locks instead of failing with "database is locked", and larger page
+    and mmap caches. Read-only replicas only take the last ones.
+    """
+    journal = [] if read_only else [("journal_mode", "WAL"), ("synchronous", "NORMAL")]
+    return journal + [
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("cache_size", -settings.SQLITE_CACHE_SIZE_KB),  # negative: KiB rather than pages
+        ("temp_store", "MEMORY"),
+    ]
+
+def configure_sqlite(engine, read_only: bool = False):
+    # Applied to every new pooled connection
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in sqlite_pragmas(read_only):
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
 
-# Fix for older Heroku/Railway PostgreSQL URLs which use 'postgres://' instead of 'postgresql://'
-if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
-    SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+def pool_options(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    """
+    Engine arguments for the connection pool. Server databases get the full
+    set: pre-ping drops connections the server or a proxy closed while they
+    sat idle, and recycling replaces them before server-side timeouts do.
+    File-based SQLite only takes the sizes; in-memory SQLite keeps its own pool.
+    """
+    if url.startswith("sqlite") and (url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url):
+        return {}
+    options = {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if not url.startswith("sqlite"):
+        options.update(pool_recycle=settings.DB_POOL_RECYCLE, pool_pre_ping=settings.DB_POOL_PRE_PING)
+    return options
 
-# Create engine with appropriate args
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+def create_database_engine(url: str, read_only: bool = False):
+    # Create engine with appropriate args
+    if url.startswith("sqlite"):
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            **pool_options(url)
+        )
+        if settings.SQLITE_PROFILE == "tuned":
+            configure_sqlite(sqlite_engine, read_only)
+        return sqlite_engine
+    return create_engine(
+        url,
+        connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT},
+        **pool_options(url)
     )
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+engine = create_database_engine(SQLALCHEMY_DATABASE_URL)
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas; their sessions are marked so that nothing read from them is cached as current
+replica_engines = [create_database_engine(url, read_only=True) for url in REPLICA_URLS]
+read_router = ReplicaRouter(
+    SessionLocal,
+    [sessionmaker(autocommit=False, autoflush=False, bind=replica, info={"replica": True}) for replica in replica_engines],
+    settings.REPLICA_RETRY_SECONDS
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -32,3 +100,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency: for read-only routes; a replica session unless the reader just wrote
+def get_read_db(request: Request):
+    db = read_router.session(reader_id(request.headers.get("authorization")))
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional, Literal
+from fastapi import Query
+from schemas.request import RequestFeedParams
+from config import settings
+
+
+# Async so that resolving them does not take a threadpool thread
+async def get_photo_size(
+    size: Optional[Literal["thumb", "medium"]] = Query(None, description="Serve this photo derivative instead of the original")
+) -> Optional[str]:
+    return size
+
+
+async def get_feed_params(
+    limit: Optional[int] = Query(None, ge=1, le=settings.FEED_MAX_PAGE_SIZE, description="Page size; without limit and cursor every request is returned"),
+    cursor: Optional[str] = Query(None, description="Opaque token from the X-Next-Cursor header of the previous page"),
+    urgency_level: Optional[str] = Query(None),
+    location: Optional[str] = Query(None),
+    user_id: Optional[int] = Query(None),
+    since: Optional[datetime] = Query(None, description="Only requests created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only requests created before this time"),
+) -> RequestFeedParams:
+    # Clients that predate pagination send neither and still get the whole feed
+    if limit is None and cursor is not None:
+        limit = settings.FEED_PAGE_SIZE
+    return RequestFeedParams(
+        limit=limit,
+        cursor=cursor,
+        urgency_level=urgency_level,
+        location=location,
+        user_id=user_id,
+        since=since,
+        until=until
+    )
@@ -1,40 +1,127 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import SessionLocal
+from async_database import AsyncSessionLocal
 from models import user as models
 from schemas.user import UserOut
+from utils.user_cache import get_cached_user, cache_user, user_cache
+from utils.offload import offload
+from utils.sessions import revocation_list
 from config import settings
 
 # ⚠️ Use env variables in production!
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserOut:
-    credentials_exception = HTTPException(
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> UserOut:
+    user = await async_user_from_token(token)
+    # Once the response is out their reads go to the primary for READ_YOUR_WRITES_SECONDS,
+    # so they see this write before the replicas do (see mark_writer_after_response)
+    if request.method not in SAFE_METHODS:
+        request.state.writer_id = user.id
+    return user
+
+async def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="Bearer token, for clients such as EventSource that cannot send headers")
+) -> UserOut:
+    # Streams stay open for a long time, so they must not hold a pooled session either
+    return await async_user_from_token(token or access_token)
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+def read_token(token: Optional[str]) -> Tuple[str, Optional[int], Optional[str]]:
+    """
+    The email, user id and session id an access token was issued for.
+    """
+    if not token:
+        raise credentials_exception()
+
     try:
         # ✅ Decode token
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        # Refresh tokens are only accepted by /token/refresh
+        if email is None or payload.get("type") == "refresh":
+            raise credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise credentials_exception()
+    return email, payload.get("uid"), payload.get("sid")
 
-    # ✅ Fetch user from database using email in token
-    user = db.query(models.User).filter(models.User.email == email).first()
+def load_user_record(session: Session, email: str, user_id: Optional[int]) -> dict:
+    query = session.query(models.User)
+    # Tokens issued before the id claim was added are looked up by email
+    user = query.filter(models.User.id == user_id).first() if user_id is not None else query.filter(models.User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
+    return cache_user(user)
+
+def user_out(record: dict, email: str) -> UserOut:
+    # A changed email invalidates the tokens issued for the old one
+    if record["email"] != email:
+        raise credentials_exception()
 
     # ✅ Return full UserOut with role
-    return UserOut(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        role=user.role
-    )
+    return UserOut(**record)
+
+def user_from_token(token: Optional[str], db: Optional[Session] = None) -> UserOut:
+    """
+    The user a token belongs to. Tokens carry the user id, which is looked
+    up in the user cache; only a miss reads the database, with `db` or a
+    short-lived session of its own, so open requests do not hold pool
+    connections for authentication.
+    """
+    email, user_id, session_id = read_token(token)
+
+    # Logged-out sessions; answered from memory unless the Bloom filter matches
+    if session_id is not None and revocation_list.is_revoked(session_id):
+        raise credentials_exception()
+
+    # ✅ Cached record first; the role and name come from it, so changes apply before the token expires
+    record = get_cached_user(user_id) if user_id is not None else None
+    if record is None:
+        session = db or SessionLocal()
+        try:
+            record = load_user_record(session, email, user_id)
+        finally:
+            if db is None:
+                session.close()
+    return user_out(record, email)
+
+async def async_user_from_token(token: Optional[str], db: Optional[AsyncSession] = None) -> UserOut:
+    """
+    user_from_token for async dependencies. With the memory cache, a cached
+    user with a live session is authenticated on the event loop without any
+    IO; the sqlite cache is read on the threadpool. A cache miss awaits an
+    async session, and a revocation check that needs the database moves
+    to a thread.
+    """
+    email, user_id, session_id = read_token(token)
+
+    if session_id is not None:
+        revoked = revocation_list.is_revoked_in_memory(session_id)
+        if revoked is None:
+            revoked = await run_in_threadpool(revocation_list.is_revoked, session_id)
+        if revoked:
+            raise credentials_exception()
+
+    record = await offload(user_cache.blocking, get_cached_user, user_id) if user_id is not None else None
+    if record is None:
+        if db is not None:
+            record = await db.run_sync(load_user_record, email, user_id)
+        else:
+            async with AsyncSessionLocal() as session:
+                record = await session.run_sync(load_user_record, email, user_id)
+    return user_out(record, email)
@@ -1,11 +1,20 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from routers import user,request,volunteer,resources
-from database import Base, engine
+from routers import user,request,volunteer,resources,metrics
+from database import engine, SessionLocal
+from async_database import async_engine, async_replica_engines
 from models import user as user_model
-from fastapi.staticfiles import StaticFiles
+from utils.static import ContentAddressedStaticFiles
 from config import settings
+from utils.derivatives import shutdown_derivatives
+from utils.migrate import check_schema
+from migrations import MIGRATIONS
+from utils.outbox import start_workers, stop_workers
+from utils.events import event_broker
+from utils.group_commit import start_writer, stop_writer
+from utils.replicas import mark_writer_after_response
+from utils.uploads import reject_oversized_uploads
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -23,6 +32,12 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
+# Photo uploads are refused before their multipart body is spooled
+app.middleware("http")(reject_oversized_uploads)
+
+# Read-your-writes: a writer's reads move to the primary once their write has committed
+app.middleware("http")(mark_writer_after_response)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -30,16 +45,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "ETag"],
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# One version lookup; an outdated schema is migrated by scripts/migrate.py, or here only if MIGRATE_ON_STARTUP
+check_schema(engine, MIGRATIONS, settings.MIGRATE_ON_STARTUP)
 
 app.include_router(user.router)
 app.include_router(request.router)
 app.include_router(volunteer.router, tags=["Volunteer"])
 app.include_router(resources.router)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.include_router(metrics.router)
+app.mount("/uploads", ContentAddressedStaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+
+@app.on_event("startup")
+def start_background_pools():
+    if settings.SQLITE_GROUP_COMMIT and engine.dialect.name == "sqlite":
+        start_writer(SessionLocal)
+    if settings.NOTIFY_WORKER_MODE == "inprocess":
+        start_workers(SessionLocal)
+    event_broker.start()
+
+@app.on_event("shutdown")
+def stop_background_pools():
+    stop_writer(timeout=10)
+    stop_workers(timeout=10)
+    shutdown_derivatives()
+    event_broker.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
 
 # Global error handler
 @app.exception_handler(Exception)
@@ -0,0 +1,37 @@
+"""
+Versioned schema migrations, applied in order by utils.migrate and recorded
+in the schema_version table.
+
+To change the schema, add a module with an upgrade(engine) function and
+append it to MIGRATIONS with the next version; never edit or reorder one
+that has shipped. Migrations may run again after an interruption and the
+first one creates every table a fresh database needs, so later ones check
+before they add (add_columns and create_indexes do). Keep them additive:
+the previous release runs against the new schema during a rolling restart.
+Fill existing rows with utils.migrate.backfill, in batches, rather than
+one UPDATE over the whole table.
+"""
+from utils.migrate import Migration
+from migrations import (
+    v001_create_tables,
+    v002_add_columns,
+    v003_add_indexes,
+    v004_search_index,
+    v005_geocode_requests,
+    v006_notification_claims,
+    v007_unique_mergeable_jobs,
+    v008_revoked_at_index,
+    v009_request_timestamp_not_null,
+)
+
+MIGRATIONS = [
+    Migration(1, "create tables", v001_create_tables.upgrade),
+    Migration(2, "add columns", v002_add_columns.upgrade),
+    Migration(3, "add indexes", v003_add_indexes.upgrade),
+    Migration(4, "search index", v004_search_index.upgrade),
+    Migration(5, "geocode requests", v005_geocode_requests.upgrade),
+    Migration(6, "notification claims", v006_notification_claims.upgrade),
+    Migration(7, "unique mergeable jobs", v007_unique_mergeable_jobs.upgrade),
+    Migration(8, "revoked_at index", v008_revoked_at_index.upgrade),
+    Migration(9, "request timestamp not null", v009_request_timestamp_not_null.upgrade),
+]
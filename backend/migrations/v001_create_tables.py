@@ -0,0 +1,12 @@
+"""
+Creates the tables that do not exist yet. A new database gets the whole
+current schema here; one created before migrations keeps its tables, and
+the following migrations bring them up to date.
+"""
+from sqlalchemy.engine import Engine
+import models  # registers every table
+from database import Base
+
+
+def upgrade(engine: Engine):
+    Base.metadata.create_all(bind=engine)
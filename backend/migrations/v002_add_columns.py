@@ -0,0 +1,34 @@
+"""
+Adds the columns that used to be added by one-off scripts
+(add_phone_column, migrate_user_model, add_notification_digest_columns,
+add_volunteer_routing, add_request_coordinates, add_photo_variants_column)
+to databases created before them.
+"""
+from sqlalchemy.engine import Engine
+from utils.migrate import add_columns
+
+COLUMNS = {
+    "users": [
+        ("phone_number", "VARCHAR"),
+        ("is_verified", "BOOLEAN DEFAULT FALSE"),
+        ("otp_code", "VARCHAR"),
+        ("otp_expiry", "TIMESTAMP"),
+        ("notification_mode", "VARCHAR DEFAULT 'immediate'"),
+        ("service_scope", "VARCHAR DEFAULT 'everywhere'"),
+    ],
+    "requests": [
+        ("latitude", "FLOAT"),
+        ("longitude", "FLOAT"),
+        ("geohash", "VARCHAR(12)"),
+        ("category", "VARCHAR"),
+        ("photo_variants", "JSON"),
+    ],
+    "notification_jobs": [
+        ("coalesce_key", "VARCHAR"),
+    ],
+}
+
+
+def upgrade(engine: Engine):
+    for table, columns in COLUMNS.items():
+        add_columns(engine, table, columns)
@@ -0,0 +1,22 @@
+"""
+Creates the indexes of every model on tables that existed before them;
+create_all only creates indexes together with their table. Duplicate
+notification log rows left by the old per-volunteer loop are removed
+first, since the (user, request, type) index is unique.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+import models  # registers every table
+from database import Base
+from utils.migrate import create_indexes
+
+
+def upgrade(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            DELETE FROM notification_logs WHERE id NOT IN (
+                SELECT MIN(id) FROM notification_logs GROUP BY user_id, request_id, notification_type
+            )
+        """))
+    for table in Base.metadata.sorted_tables:
+        create_indexes(engine, sorted(table.indexes, key=lambda index: index.name))
@@ -0,0 +1,10 @@
+"""
+Creates the full-text search index over requests, which startup used to
+check on every worker start.
+"""
+from sqlalchemy.engine import Engine
+from utils.search import ensure_search_index
+
+
+def upgrade(engine: Engine):
+    ensure_search_index(engine)
@@ -0,0 +1,30 @@
+"""
+Geocodes requests created before they had coordinates, in batches, while
+the application keeps serving. Requests whose location cannot be geocoded
+stay without coordinates.
+"""
+from sqlalchemy import select, update
+from sqlalchemy.engine import Engine
+from models.request import Request
+from utils.geo import location_fields
+from utils.migrate import backfill
+
+
+def select_batch(conn, last_id, limit):
+    return conn.execute(
+        select(Request.id, Request.location)
+        .where(Request.id > last_id, Request.geohash.is_(None))
+        .order_by(Request.id)
+        .limit(limit)
+    ).all()
+
+
+def geocode_batch(conn, rows):
+    for request_id, location in rows:
+        fields = location_fields(location)
+        if fields["geohash"]:
+            conn.execute(update(Request).where(Request.id == request_id).values(**fields))
+
+
+def upgrade(engine: Engine):
+    backfill(engine, select_batch, geocode_batch)
@@ -0,0 +1,10 @@
+"""
+Adds notification_logs.claimed_by, the token of the fan-out or digest run
+that claimed a row for sending.
+"""
+from sqlalchemy.engine import Engine
+from utils.migrate import add_columns
+
+
+def upgrade(engine: Engine):
+    add_columns(engine, "notification_logs", [("claimed_by", "VARCHAR")])
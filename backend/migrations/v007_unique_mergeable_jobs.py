@@ -0,0 +1,31 @@
+"""
+Adds the partial unique index that allows one mergeable (queued, never
+run) notification job per coalesce_key. Duplicates queued before it
+existed are merged into the oldest job of their key first.
+"""
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models.notification_job import NotificationJob
+from utils.migrate import create_indexes
+
+
+def upgrade(engine: Engine):
+    with Session(engine) as db:
+        mergeable = (NotificationJob.status == "queued", NotificationJob.attempts == 0)
+        duplicated = db.query(NotificationJob.coalesce_key).filter(
+            NotificationJob.coalesce_key.isnot(None), *mergeable
+        ).group_by(NotificationJob.coalesce_key).having(func.count() > 1)
+        for (coalesce_key,) in duplicated.all():
+            first, *rest = db.query(NotificationJob).filter(
+                NotificationJob.coalesce_key == coalesce_key, *mergeable
+            ).order_by(NotificationJob.id).all()
+            for job in rest:
+                first.request_ids = first.request_ids + [
+                    request_id for request_id in job.request_ids if request_id not in first.request_ids
+                ]
+                db.delete(job)
+        db.commit()
+    create_indexes(engine, [
+        index for index in NotificationJob.__table__.indexes if index.name == "uq_notification_jobs_mergeable_coalesce_key"
+    ])
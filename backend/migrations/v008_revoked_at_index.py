@@ -0,0 +1,13 @@
+"""
+Indexes revoked_sessions.revoked_at, which each worker's revocation sync
+reads the recently revoked sessions by.
+"""
+from sqlalchemy.engine import Engine
+from models.auth_session import RevokedSession
+from utils.migrate import create_indexes
+
+
+def upgrade(engine: Engine):
+    create_indexes(engine, [
+        index for index in RevokedSession.__table__.indexes if index.name == "ix_revoked_sessions_revoked_at"
+    ])
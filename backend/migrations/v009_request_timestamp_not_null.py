@@ -0,0 +1,59 @@
+"""
+Fills in requests.timestamp where it is NULL, so every request has a
+position in the (timestamp, id) feed order: keyset pagination skips NULL
+rows and cannot encode a cursor for one. A missing timestamp is taken from
+the closest earlier request, ids being handed out in creation order, or
+the Unix epoch if there is none.
+
+PostgreSQL then gets the NOT NULL constraint through a validated CHECK, so
+the full-table scan runs without blocking writes. SQLite cannot add it
+without rebuilding the table; there the column stays nullable, and every
+insert sets it.
+"""
+from datetime import datetime
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.engine import Engine
+from models.request import Request
+from utils.migrate import backfill
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def select_batch(conn, last_id, limit):
+    return conn.execute(
+        select(Request.id)
+        .where(Request.id > last_id, Request.timestamp.is_(None))
+        .order_by(Request.id)
+        .limit(limit)
+    ).all()
+
+
+def fill_batch(conn, rows):
+    # In id order, so a run of NULL rows inherits the timestamp filled in just before
+    for (request_id,) in rows:
+        previous = conn.execute(
+            select(Request.timestamp)
+            .where(Request.id < request_id, Request.timestamp.isnot(None))
+            .order_by(Request.id.desc())
+            .limit(1)
+        ).scalar()
+        conn.execute(update(Request).where(Request.id == request_id).values(timestamp=previous or EPOCH))
+
+
+def upgrade(engine: Engine):
+    backfill(engine, select_batch, fill_batch)
+    if engine.dialect.name != "postgresql":
+        return
+    timestamp = next(column for column in inspect(engine).get_columns("requests") if column["name"] == "timestamp")
+    if not timestamp["nullable"]:
+        return
+    with engine.begin() as conn:
+        # Added NOT VALID and validated separately: validating holds a lock that lets writes continue,
+        # and SET NOT NULL then relies on the constraint instead of scanning under an exclusive lock
+        conn.execute(text('ALTER TABLE requests DROP CONSTRAINT IF EXISTS ck_requests_timestamp_not_null'))
+        conn.execute(text('ALTER TABLE requests ADD CONSTRAINT ck_requests_timestamp_not_null CHECK ("timestamp" IS NOT NULL) NOT VALID'))
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE requests VALIDATE CONSTRAINT ck_requests_timestamp_not_null'))
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE requests ALTER COLUMN "timestamp" SET NOT NULL'))
+        conn.execute(text('ALTER TABLE requests DROP CONSTRAINT ck_requests_timestamp_not_null'))
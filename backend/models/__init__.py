@@ -1,2 +1,9 @@
+from .user import User
+from .request import Request
 from .volunteer_application import VolunteerApplication
 from .notification import NotificationLog
+from .change_version import ChangeVersion
+from .photo_blob import PhotoBlob
+from .notification_job import NotificationJob
+from .volunteer_routing import VolunteerServiceArea, VolunteerAreaCell, VolunteerCategory
+from .auth_session import RefreshToken, RevokedSession
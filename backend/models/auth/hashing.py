@@ -1,6 +1,11 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 from passlib.context import CryptContext
+from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 class Hash:
     @staticmethod
@@ -10,3 +15,75 @@ class Hash:
     @staticmethod
     def verify(hashed_password: str, plain_password: str) -> bool:
         return pwd_context.verify(plain_password, hashed_password)
+
+    @staticmethod
+    def cost(hashed_password: str) -> Optional[int]:
+        # "$2b$12$<salt and digest>": the cost is the second field
+        try:
+            return int(hashed_password.split("$")[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        return Hash.cost(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+class HashingBusy(Exception):
+    """
+    Raised instead of queueing when the hashing pool is saturated.
+    """
+
+
+class HashingPool:
+    """
+    Runs bcrypt on a few dedicated threads so a burst of logins cannot take
+    over the threads every other endpoint runs on. At most `max_pending`
+    calls wait behind the running ones; beyond that callers are turned
+    away at once with HashingBusy.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._stats = {"completed": 0, "rejected": 0}
+
+    async def run(self, fn: Callable, *args):
+        with self._lock:
+            if self._admitted >= self.workers + self.max_pending:
+                self._stats["rejected"] += 1
+                raise HashingBusy()
+            self._admitted += 1
+        future = self._executor.submit(fn, *args)
+        # Released when the hash finishes, even if the caller gave up waiting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self._admitted -= 1
+            self._stats["completed"] += 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(Hash.bcrypt, password)
+
+    async def verify(self, hashed_password: str, plain_password: str) -> bool:
+        return await self.run(Hash.verify, hashed_password, plain_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": min(self._admitted, self.workers),
+                "queued": max(self._admitted - self.workers, 0),
+                "rounds": settings.BCRYPT_ROUNDS,
+                **self._stats
+            }
+
+
+# Password hashing for /login and /signup
+hashing_pool = HashingPool(settings.HASH_WORKERS, settings.HASH_MAX_PENDING)
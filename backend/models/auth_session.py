@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from database import Base
+
+
+class RefreshToken(Base):
+    """
+    One issued refresh token. Every refresh uses up the token and issues
+    the next one in the same session (family); presenting a used token
+    again means it was stolen, and the whole session is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Revoking a session: all of its tokens
+        Index("ix_refresh_tokens_session_id", "session_id"),
+        # Purging expired tokens
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
+    id = Column(String, primary_key=True)  # the token's jti
+    session_id = Column(String, nullable=False)  # shared by every token rotated from one login
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)  # set when it is exchanged for the next token
+    revoked_at = Column(DateTime, nullable=True)
+
+
+class RevokedSession(Base):
+    """
+    A logged-out or compromised session whose access tokens must stop
+    working before they expire. Rows are kept until the last access token
+    of the session has expired; each process loads them into a Bloom
+    filter so authentication checks them without a query.
+    """
+    __tablename__ = "revoked_sessions"
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, nullable=False, unique=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # processes load the recent ones
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, event, insert
+from database import Base
+
+
+class ChangeVersion(Base):
+    """
+    Monotonically increasing counter per data set, bumped in the same
+    transaction as every write to it. Used for ETags on polled listings.
+    """
+    __tablename__ = "change_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(ChangeVersion.__table__, "after_create")
+def seed_change_versions(target, connection, **kw):
+    connection.execute(insert(target), [{"name": "requests", "version": 0}])
@@ -1,16 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from datetime import datetime
 from database import Base
 from sqlalchemy.orm import relationship
 
 class NotificationLog(Base):
     __tablename__ = "notification_logs"
+    __table_args__ = (
+        # One notification per volunteer, request and type; fan-out inserts rely on it
+        Index("uq_notification_logs_user_request_type", "user_id", "request_id", "notification_type", unique=True),
+        # Finds the rows a fan-out still has to deliver
+        Index("ix_notification_logs_request_type_status", "request_id", "notification_type", "status", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     request_id = Column(Integer, ForeignKey("requests.id"))
     notification_type = Column(String)  # 'new_disaster' or 'update'
-    status = Column(String, default="sent")
+    status = Column(String, default="sent")  # 'pending', 'digest' (waiting for the volunteer's digest), 'sending'/'sending_digest' (claimed by a run), 'sent', 'failed' (retried) or 'rejected'
+    claimed_by = Column(String, nullable=True)  # Token of the run mailing the row while it is 'sending'
     sent_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User")
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON, text
+from datetime import datetime
+from database import Base
+
+# Jobs that have not run yet; new work with the same coalesce_key merges into them
+MERGEABLE = "status = 'queued' AND attempts = 0"
+
+
+class NotificationJob(Base):
+    """
+    Outbox entry for a volunteer notification fan-out. Written in the same
+    transaction as the change it announces and processed by the
+    notification workers, so a restart never loses an alert.
+    """
+    __tablename__ = "notification_jobs"
+    __table_args__ = (
+        # Claiming: the oldest due jobs
+        Index("ix_notification_jobs_status_available_at", "status", "available_at"),
+        # Latency metrics: the most recently finished jobs
+        Index("ix_notification_jobs_status_finished_at", "status", "finished_at"),
+        # Coalescing: the queued job new work with the same key is merged into
+        Index("ix_notification_jobs_coalesce_key_status", "coalesce_key", "status"),
+        # At most one job per key that work can still merge into, even when two transactions enqueue at once
+        Index(
+            "uq_notification_jobs_mergeable_coalesce_key", "coalesce_key", unique=True,
+            sqlite_where=text(MERGEABLE), postgresql_where=text(MERGEABLE)
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    notification_type = Column(String, nullable=False)  # 'new_disaster', 'update' or 'digest'
+    request_ids = Column(JSON, nullable=False)
+    coalesce_key = Column(String, nullable=True)  # e.g. 'update:42'; later jobs with the key merge into this one while it waits
+    status = Column(String, nullable=False, default="queued")  # 'queued', 'running', 'done' or 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # A running job past its lease is claimed again
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
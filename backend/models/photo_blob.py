@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from database import Base
+
+
+class PhotoBlob(Base):
+    """
+    One stored photo file, named after the SHA-256 of its content, with the
+    number of requests that reference it.
+    """
+    __tablename__ = "photo_blobs"
+
+    digest = Column(String(64), primary_key=True)
+    filename = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, JSON
 from datetime import datetime
 from database import Base
 from sqlalchemy.orm import relationship
@@ -6,14 +6,30 @@ from sqlalchemy.orm import relationship
 
 class Request(Base):
     __tablename__ = "requests"
+    # Composite indexes backing keyset pagination on (timestamp, id), alone
+    # and combined with each equality filter of the request feed.
+    __table_args__ = (
+        Index("ix_requests_timestamp_id", "timestamp", "id"),
+        Index("ix_requests_urgency_timestamp_id", "urgency_level", "timestamp", "id"),
+        Index("ix_requests_location_timestamp_id", "location", "timestamp", "id"),
+        Index("ix_requests_user_timestamp_id", "user_id", "timestamp", "id"),
+        # Nearby search scans geohash prefix ranges; the coordinates are
+        # included so the distance check never touches the table.
+        Index("ix_requests_geohash", "geohash", "latitude", "longitude"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     description = Column(String)
     location = Column(String)
+    latitude = Column(Float, nullable=True)  # Geocoded from location, None if unknown
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
     urgency_level = Column(String, default="medium")
+    category = Column(String, nullable=True)  # e.g. 'medical' or 'food'; None reaches volunteers of every category
     photo = Column(String, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    photo_variants = Column(JSON(none_as_null=True), nullable=True)  # e.g. {"thumb": "..._thumb.webp", "medium": "..._medium.webp"}
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)  # Backfilled by migration 9; the feed orders by it
 
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="requests")  # ✅ new backref
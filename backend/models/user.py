@@ -1,16 +1,22 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from database import Base
 from sqlalchemy.orm import relationship
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Notification routing: volunteers who take alerts from everywhere
+        Index("ix_users_role_service_scope", "role", "service_scope"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String)
     phone_number = Column(String, nullable=True)
-    role = Column(String, default="user")
+    role = Column(String, default="user", index=True)
+    notification_mode = Column(String, default="immediate")  # 'immediate' or 'digest' (low-urgency alerts batched)
+    service_scope = Column(String, default="everywhere")  # 'everywhere', or 'areas' once service areas are registered
     
     # Verification Fields
     is_verified = Column(Boolean, default=False)
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from database import Base
+
+
+class VolunteerServiceArea(Base):
+    """
+    An area a volunteer wants alerts for, as they entered it: a center and
+    a radius. Routing uses the geohash cells in VolunteerAreaCell.
+    """
+    __tablename__ = "volunteer_service_areas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    location = Column(String, nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    radius_km = Column(Float, nullable=False)
+
+
+class VolunteerAreaCell(Base):
+    """
+    One SERVICE_AREA_PRECISION geohash cell covered by a volunteer's areas.
+    A request's recipients are the rows for the cell its geohash falls in.
+    """
+    __tablename__ = "volunteer_area_cells"
+    __table_args__ = (
+        Index("ix_volunteer_area_cells_cell_user", "cell", "user_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    cell = Column(String(12), nullable=False)
+
+
+class VolunteerCategory(Base):
+    """
+    A request category a volunteer wants alerts for. Volunteers without
+    any get every category.
+    """
+    __tablename__ = "volunteer_categories"
+    __table_args__ = (
+        Index("ix_volunteer_categories_user_category", "user_id", "category", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category = Column(String, nullable=False)
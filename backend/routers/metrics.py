@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database import get_db, engine, read_router
+from async_database import async_engine, async_read_router
+from utils.cache import feed_cache
+from utils.outbox import outbox_stats
+from utils.events import event_broker
+from models.auth.hashing import hashing_pool
+from utils.sessions import revocation_list
+from utils.group_commit import writer_stats
+from utils.db_pool import pool_stats
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+
+@router.get("/cache")
+def cache_metrics():
+    return feed_cache.stats()
+
+
+@router.get("/notifications")
+def notification_metrics(db: Session = Depends(get_db)):
+    return outbox_stats(db)
+
+
+@router.get("/events")
+def event_metrics():
+    return event_broker.stats()
+
+
+@router.get("/hashing")
+def hashing_metrics():
+    return hashing_pool.stats()
+
+
+@router.get("/revocations")
+def revocation_metrics():
+    return revocation_list.stats()
+
+
+@router.get("/writes")
+def write_metrics():
+    return writer_stats()
+
+
+@router.get("/db-pool")
+def db_pool_metrics():
+    return {**pool_stats(engine), "async": pool_stats(async_engine)}
+
+
+@router.get("/replicas")
+def replica_metrics():
+    return {"sync": read_router.stats(), "async": async_read_router.stats()}
@@ -1,70 +1,106 @@
 # routers/request.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Form, File, UploadFile, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import Optional, List
-import shutil
+from fastapi import APIRouter, Depends, HTTPException, status, Form, File, UploadFile, Response, Query, Header
+from fastapi import Request as HTTPRequest
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from typing import Callable, Optional, List
+from datetime import datetime
 import os
 
-from database import get_db
+from database import get_db, get_read_db, SessionLocal
+from async_database import get_async_db, get_async_read_db
 from models.request import Request
 from models import user as models
 
-from schemas.request import ShowRequest
-from dependencies.oauth2 import get_current_user
+from schemas.request import ShowRequest, RequestFeedParams, RequestCreate, RequestCategory
+from dependencies.oauth2 import get_current_user, get_stream_user
+from dependencies.feed import get_feed_params, get_photo_size
+from utils.feed import serialize_request, query_feed_page, load_feed_page, overlay_viewer_fields, apply_photo_size, invalidate_feed
+from utils.derivatives import schedule_derivatives
+from utils.versioning import bump_version, get_version, make_etag, etag_matches
 from schemas.user import UserOut
-from utils.email import notify_volunteer
-from models.user import User as UserModel
+from utils.outbox import enqueue_notification, enqueue_update
+from utils.bulk import detect_format, parse_rows, validate_rows, read_upload, upload_chunks, check_multipart_size
+from utils.uploads import PendingUpload, receive_upload, finalize_upload, discard_upload, retain_photo, release_photo, collect_photo
+from utils.geo import location_fields, find_nearby_requests
+from utils.search import search_requests
+from utils.group_commit import commit_write, async_commit_write
+from utils.events import event_broker, publish_events, request_delta, stream_events, DELTA_FIELDS, CREATED, UPDATED, DELETED
+from utils.cache import feed_cache
+from utils.offload import offload
+from models.volunteer_application import VolunteerApplication
 from models.notification import NotificationLog
+from config import settings
 
 router = APIRouter(
     prefix="/request",
     tags=["Help Requests"]
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)  # Ensure upload dir exists
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
-# POST /request-help (already working)
-@router.post("/request-help", status_code=status.HTTP_201_CREATED, response_model=ShowRequest)
-def create_request(
-    title: str = Form(...),
-    description: str = Form(...),
-    location: str = Form(...),
-    urgency_level: str = Form("medium"),
-    photo: Optional[UploadFile] = File(None),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_db),
-    current_user: UserOut = Depends(get_current_user)
-):
-    photo_filename = None
-    if photo:
-        photo_filename = f"{current_user.id}_{photo.filename}"
-        file_path = os.path.join(UPLOAD_DIR, photo_filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(photo.file, buffer)
-
-    new_request = Request(
-        title=title,
-        description=description,
-        location=location,
-        urgency_level=urgency_level,
-        photo=photo_filename,
-        user_id=current_user.id
-    )
+UPLOAD_DIR = settings.UPLOAD_DIR
+os.makedirs(UPLOAD_DIR, exist_ok=True)  # Ensure upload dir exists
 
-    db.add(new_request)
-    db.commit()
-    db.refresh(new_request)
+def new_request_write(
+    current_user: UserOut,
+    title: str,
+    description: str,
+    location: str,
+    urgency_level: str,
+    photo: Optional[PendingUpload],
+    category: Optional[str] = None
+) -> Callable[[Session], int]:
+    """
+    The write that creates a request, for commit_write or async_commit_write;
+    it returns the new id.
+    """
+    fields = location_fields(location)
+
+    def write(session: Session) -> int:
+        new_request = Request(
+            title=title,
+            description=description,
+            location=location,
+            urgency_level=urgency_level,
+            category=category,
+            photo=photo.filename if photo else None,
+            user_id=current_user.id,
+            **fields
+        )
+        session.add(new_request)
+        if photo:
+            retain_photo(session, photo)
+        session.flush()
+        # Queued in the same transaction, so the alert is sent exactly when the request exists
+        enqueue_notification(session, [new_request.id], "new_disaster")
+        bump_version(session)
+        return new_request.id
+
+    return write
+
+def announce_new_request(new_request: Request, user: Optional[models.User]) -> dict:
+    """
+    Drops the cached first pages, tells live subscribers and builds the
+    response, once the request is committed.
+    """
+    invalidate_feed(created=True)
+    publish_events([(CREATED, request_delta(new_request))])
 
     # Create response with user information
-    user = db.query(models.User).filter(models.User.id == current_user.id).first()
     response_data = {
         "id": new_request.id,
         "title": new_request.title,
         "description": new_request.description,
         "location": new_request.location,
+        "latitude": new_request.latitude,
+        "longitude": new_request.longitude,
         "urgency_level": new_request.urgency_level,
+        "category": new_request.category,
         "photo": new_request.photo,
         "timestamp": new_request.timestamp,
         "user_id": new_request.user_id
@@ -78,129 +114,290 @@ def create_request(
             "phone_number": user.phone_number
         }
 
-    # Robust Asynchronous Alerts
-    background_tasks.add_task(
-        trigger_volunteer_notifications,
-        db,
-        new_request.id,
-        "new_disaster"
-    )
-
     return response_data
 
-def trigger_volunteer_notifications(db: Session, request_id: int, notification_type: str):
+def save_new_request(
+    db: Session,
+    current_user: UserOut,
+    title: str,
+    description: str,
+    location: str,
+    urgency_level: str,
+    photo: Optional[PendingUpload],
+    category: Optional[str] = None
+) -> dict:
+    write = new_request_write(current_user, title, description, location, urgency_level, photo, category)
+    request_id = commit_write(db, write)
+    if photo:
+        finalize_upload(photo, UPLOAD_DIR)
+    new_request = db.query(Request).filter(Request.id == request_id).one()
+    user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    return announce_new_request(new_request, user)
+
+async def save_new_request_async(
+    db: AsyncSession,
+    current_user: UserOut,
+    title: str,
+    description: str,
+    location: str,
+    urgency_level: str,
+    photo: Optional[PendingUpload],
+    category: Optional[str] = None
+) -> dict:
     """
-    Background task to notify volunteers and log it.
+    save_new_request on an async session: the commit is awaited, on the
+    group-commit writer when it serves this database.
     """
-    # Use a new session inside the background task if needed, 
-    # but here we're passing the session from the request which might be closed.
-    # Better to create a new one using next(get_db()) but for simplicity here we assume it works.
-    request_obj = db.query(Request).filter(Request.id == request_id).first()
-    if not request_obj:
-        return
-
-    request_data = {
-        "title": request_obj.title,
-        "location": request_obj.location,
-        "urgency_level": request_obj.urgency_level,
-        "description": request_obj.description
-    }
+    write = new_request_write(current_user, title, description, location, urgency_level, photo, category)
+    request_id = await async_commit_write(db, write)
+    if photo:
+        await run_in_threadpool(finalize_upload, photo, UPLOAD_DIR)
+    # One round trip for the request and its owner; each one costs a hop to the driver's thread
+    result = await db.execute(select(Request).options(joinedload(Request.user)).where(Request.id == request_id))
+    new_request = result.scalar_one()
+    return await offload(feed_cache.blocking or event_broker.blocking, announce_new_request, new_request, new_request.user)
 
-    volunteers = db.query(UserModel).filter(UserModel.role == "volunteer").all()
-    for volunteer in volunteers:
-        # Deduplication: Check if already notified for THIS request and THIS type
-        existing_log = db.query(NotificationLog).filter_by(
-            user_id=volunteer.id,
-            request_id=request_id,
-            notification_type=notification_type
-        ).first()
-
-        if existing_log:
-            continue
-
-        # Send email
-        notify_volunteer(volunteer.email, volunteer.username, request_data, notification_type)
-
-        # Log notification
-        new_log = NotificationLog(
-            user_id=volunteer.id,
-            request_id=request_id,
-            notification_type=notification_type
+# POST /request-help (already working)
+@router.post("/request-help", status_code=status.HTTP_201_CREATED, response_model=ShowRequest)
+async def create_request(
+    title: str = Form(...),
+    description: str = Form(...),
+    location: str = Form(...),
+    urgency_level: str = Form("medium"),
+    category: Optional[RequestCategory] = Form(None),
+    photo: Optional[UploadFile] = File(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    pending_photo = None
+    if photo and photo.filename:
+        pending_photo = await receive_upload(photo, UPLOAD_DIR)
+
+    try:
+        response_data = await save_new_request_async(
+            db, current_user, title, description, location, urgency_level, pending_photo, category
         )
-        db.add(new_log)
-    
+    except Exception:
+        # Don't leave an orphaned photo behind if the request could not be saved
+        if pending_photo:
+            discard_upload(pending_photo)
+        raise
+
+    # Thumbnails and WebP variants are rendered off the request path
+    if pending_photo:
+        schedule_derivatives(response_data["id"], pending_photo.filename, UPLOAD_DIR)
+
+    return response_data
+
+def insert_request_rows(db: Session, rows: List[RequestCreate], user_id: int) -> List[int]:
+    """
+    Inserts validated rows with chunked executemany batches inside a single
+    transaction and returns the new ids in input order.
+    """
+    timestamp = datetime.utcnow()
+    request_ids = []
+    deltas = []
+    for start in range(0, len(rows), settings.BULK_INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + settings.BULK_INSERT_CHUNK_SIZE]
+        values = [
+            {
+                "title": row.title,
+                "description": row.description,
+                "location": row.location,
+                "urgency_level": row.urgency_level or "medium",
+                "category": row.category,
+                "photo": None,
+                "timestamp": timestamp,
+                "user_id": user_id,
+                **location_fields(row.location)
+            }
+            for row in chunk
+        ]
+        # RETURNING rows of an executemany come back in any order unless SQLAlchemy is asked to sort them;
+        # on PostgreSQL that stays one statement per chunk, SQLite falls back to a statement per row
+        result = db.execute(insert(Request).returning(Request.id, sort_by_parameter_order=True), values)
+        chunk_ids = result.scalars().all()
+        request_ids.extend(chunk_ids)
+        for request_id, row in zip(chunk_ids, values):
+            row = {**row, "id": request_id}
+            deltas.append((CREATED, {field: row[field] for field in DELTA_FIELDS}))
+
+    # One coalesced notification job for the whole batch
+    enqueue_notification(db, request_ids, "new_disaster")
+    bump_version(db)
     db.commit()
+    publish_events(deltas)
+    return request_ids
+
+# POST /request/bulk - Create many requests from a JSON array, CSV or NDJSON upload
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def bulk_create_requests(
+    http_request: HTTPRequest,
+    all_or_nothing: bool = Query(False, description="Reject the whole upload if any row is invalid"),
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    content_type = http_request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        # form() spools the whole body before the file can be read, so its size is checked first
+        check_multipart_size(http_request.headers.get("content-length"))
+        form = await http_request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart uploads need a 'file' field")
+        fmt = detect_format(upload.content_type, upload.filename)
+        data = await read_upload(upload_chunks(upload))
+    else:
+        fmt = detect_format(content_type)
+        data = await read_upload(http_request.stream())
+
+    try:
+        rows, errors = parse_rows(data, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_MAX_ROWS} requests per upload"
+        )
+
+    valid, validation_errors = validate_rows(rows)
+    errors = sorted(errors + validation_errors, key=lambda error: error["row"])
+
+    if errors and all_or_nothing:
+        raise HTTPException(status_code=422, detail={"created": 0, "errors": errors})
+
+    request_ids = []
+    if valid:
+        request_ids = await run_in_threadpool(insert_request_rows, db, [row for _, row in valid], current_user.id)
+        await offload(feed_cache.blocking, invalidate_feed, created=True)
+
+    return {"created": len(request_ids), "request_ids": request_ids, "errors": errors}
+
+def stream_requests_ndjson(params: RequestFeedParams, current_user: UserOut, size: Optional[str] = None):
+    """
+    Yields the feed as newline-delimited JSON, reading fixed-size keyset
+    batches with a short-lived session each, so memory stays flat and the
+    first line goes out before the whole table has been read.
+    """
+    batch_params = params.model_copy(update={"limit": settings.STREAM_BATCH_SIZE})
+
+    while True:
+        db = SessionLocal()
+        try:
+            items, next_cursor = query_feed_page(db, batch_params)
+            items = apply_photo_size(overlay_viewer_fields(db, items, current_user), size)
+        finally:
+            db.close()
+
+        yield "".join(ShowRequest.model_validate(item).model_dump_json() + "\n" for item in items)
+
+        if not next_cursor:
+            break
+        batch_params = batch_params.model_copy(update={"cursor": next_cursor})
+
+def list_requests(
+    db: Session,
+    response: Response,
+    params: RequestFeedParams,
+    size: Optional[str],
+    stream: bool,
+    accept: Optional[str],
+    if_none_match: Optional[str],
+    current_user: UserOut
+):
+    if stream or (accept and NDJSON_MEDIA_TYPE in accept):
+        return StreamingResponse(stream_requests_ndjson(params, current_user, size), media_type=NDJSON_MEDIA_TYPE)
+
+    # Pollers get a 304 from a single version lookup while nothing has changed
+    etag = make_etag(get_version(db), current_user.id, params.model_dump_json(), size)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    items, next_cursor = load_feed_page(db, params)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    # Add user-specific volunteer applications and has_applied flags
+    return apply_photo_size(overlay_viewer_fields(db, items, current_user), size)
 
 # ✅ GET /request - List all help requests
 @router.get("/", response_model=List[ShowRequest])
-def get_all_requests(db: Session = Depends(get_db), current_user: UserOut = Depends(get_current_user)):
-    requests = db.query(Request).all()
-
-    # Create response with user information and volunteer applications
-    response_data = []
-    for request in requests:
-        user = db.query(models.User).filter(models.User.id == request.user_id).first()
-        request_dict = {
-            "id": request.id,
-            "title": request.title,
-            "description": request.description,
-            "location": request.location,
-            "urgency_level": request.urgency_level,
-            "photo": request.photo,
-            "timestamp": request.timestamp,
-            "user_id": request.user_id
-        }
-
-        if user:
-            request_dict["user"] = {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "phone_number": user.phone_number
-            }
+async def get_all_requests(
+    response: Response,
+    params: RequestFeedParams = Depends(get_feed_params),
+    size: Optional[str] = Depends(get_photo_size),
+    stream: bool = Query(False, description="Stream every matching request as NDJSON instead of one page"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    # The queries are awaited on the event loop instead of blocking a threadpool thread
+    return await db.run_sync(list_requests, response, params, size, stream, accept, if_none_match, current_user)
+
+# ✅ GET /request/events - Live created/updated/deleted/applied deltas as Server-Sent Events
+@router.get("/events")
+def request_events(
+    cursor: Optional[int] = Query(None, description="Resume after this event id"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: UserOut = Depends(get_stream_user)
+):
+    # Browsers resend the last id they saw when EventSource reconnects
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+    return StreamingResponse(
+        stream_events(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        # Include volunteer applications for the request owner
-        if current_user.id == request.user_id:
-            from models.volunteer_application import VolunteerApplication
-            applications = db.query(VolunteerApplication).filter(
-                VolunteerApplication.request_id == request.id
-            ).all()
-
-            volunteers = []
-            for app in applications:
-                volunteer = db.query(models.User).filter(models.User.id == app.volunteer_id).first()
-                if volunteer:
-                    volunteers.append({
-                        "id": volunteer.id,
-                        "username": volunteer.username,
-                        "email": volunteer.email,
-                        "phone_number": volunteer.phone_number,
-                        "applied_at": app.applied_at.isoformat() if app.applied_at else None
-                    })
-
-            if volunteers:
-                request_dict["volunteers"] = volunteers
-
-        # Check if current volunteer has applied (for volunteer views)
-        if current_user.role == "volunteer" and current_user.id != request.user_id:
-            from models.volunteer_application import VolunteerApplication
-            existing_application = db.query(VolunteerApplication).filter_by(
-                volunteer_id=current_user.id,
-                request_id=request.id
-            ).first()
-            request_dict["has_applied"] = existing_application is not None
-
-        response_data.append(request_dict)
+# ✅ GET /request/nearby - Requests within a radius of a point, nearest first
+@router.get("/nearby", response_model=List[ShowRequest])
+def get_nearby_requests(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(settings.NEARBY_DEFAULT_RADIUS_KM, gt=0, le=settings.NEARBY_MAX_RADIUS_KM, description="Radius in km"),
+    limit: int = Query(settings.FEED_PAGE_SIZE, ge=1, le=settings.FEED_MAX_PAGE_SIZE),
+    size: Optional[str] = Depends(get_photo_size),
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    items = []
+    for help_request, distance in find_nearby_requests(db, lat, lon, radius, limit):
+        item = serialize_request(help_request)
+        item["distance_km"] = round(distance, 3)
+        items.append(item)
+
+    return apply_photo_size(overlay_viewer_fields(db, items, current_user), size)
+
+# ✅ GET /request/search - Full-text search over title, description and location
+@router.get("/search", response_model=List[ShowRequest])
+def search_help_requests(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(settings.FEED_PAGE_SIZE, ge=1, le=settings.FEED_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, description="Value of the X-Next-Offset header of the previous page"),
+    size: Optional[str] = Depends(get_photo_size),
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    results, next_offset = search_requests(db, q, limit, offset)
+    if next_offset is not None:
+        response.headers["X-Next-Offset"] = str(next_offset)
 
-    return response_data
+    items = [serialize_request(help_request) for help_request in results]
+    return apply_photo_size(overlay_viewer_fields(db, items, current_user), size)
 
 # ✅ GET /request/{id} - Get a single help request by ID
 @router.get("/{id}", response_model=ShowRequest)
-def get_request(id: int, db: Session = Depends(get_db)):
+def get_request(id: int, size: Optional[str] = Depends(get_photo_size), db: Session = Depends(get_read_db)):
     help_request = db.query(Request).filter(Request.id == id).first()
     if not help_request:
         raise HTTPException(status_code=404, detail="Request not found")
-    return help_request
+    return apply_photo_size([serialize_request(help_request)], size)[0]
 
 # ✅ GET /request/{id}/volunteers - Get volunteers for a request
 @router.get("/{id}/volunteers")
@@ -245,7 +442,7 @@ def update_request(
     description: str = Form(...),
     location: str = Form(...),
     urgency_level: str = Form("medium"),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
+    category: Optional[RequestCategory] = Form(None),
     db: Session = Depends(get_db),
     current_user: UserOut = Depends(get_current_user)
 ):
@@ -258,22 +455,29 @@ def update_request(
     if help_request.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this request")
 
+    # Listings filtered on the new values may now include this request
+    changed_filters = {
+        field: value for field, value in (("urgency_level", urgency_level), ("location", location))
+        if getattr(help_request, field) != value
+    }
+
     # Update fields
     help_request.title = title
     help_request.description = description
+    if help_request.location != location:
+        for field, value in location_fields(location).items():
+            setattr(help_request, field, value)
     help_request.location = location
     help_request.urgency_level = urgency_level
+    if category is not None:
+        help_request.category = category
+    enqueue_update(db, help_request.id)
+    bump_version(db)
 
     db.commit()
     db.refresh(help_request)
-
-    # Trigger update notifications
-    background_tasks.add_task(
-        trigger_volunteer_notifications,
-        db,
-        help_request.id,
-        "update"
-    )
+    invalidate_feed([help_request.id], filter_values=changed_filters)
+    publish_events([(UPDATED, request_delta(help_request))])
 
     return {"message": "Request updated successfully", "request_id": help_request.id}
 
@@ -296,9 +500,19 @@ def delete_request(
     # Delete associated applications first
     from models.volunteer_application import VolunteerApplication
     db.query(VolunteerApplication).filter(VolunteerApplication.request_id == id).delete()
+    # Along with notifications about it, including ones still waiting for a digest
+    db.query(NotificationLog).filter(NotificationLog.request_id == id).delete()
 
-    # Delete the request
+    # Delete the request and drop its reference to the photo
+    photo = help_request.photo
     db.delete(help_request)
+    release_photo(db, photo)
+    bump_version(db)
     db.commit()
+    invalidate_feed([id])
+    publish_events([(DELETED, {"id": id})])
+
+    # Remove the photo files if no other request shares them
+    collect_photo(db, photo, UPLOAD_DIR)
 
     return {"message": "Request deleted successfully"}
\ No newline at end of file
@@ -1,27 +1,51 @@
 from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from schemas import user as schemas
 import models.user as models
 from models.user import User
-from schemas.user import UserCreate, ShowUser, UserOut
-from models.auth.hashing import Hash
+from schemas.user import UserCreate, ShowUser, UserOut, NotificationPreferences, ServicePreferences, RefreshRequest
+from models.auth.hashing import Hash, HashingBusy, hashing_pool
 from sqlalchemy.exc import IntegrityError
-from database import get_db
+from database import get_db, get_read_db
 from fastapi.security import OAuth2PasswordRequestForm
-from models.auth.token import create_access_token
 from dependencies.oauth2 import get_current_user
+from dependencies.roles import require_volunteer
+from utils.service_areas import get_service_preferences, set_service_preferences
+from utils.sessions import issue_tokens, rotate_refresh_token, logout
+from utils.group_commit import commit_write
+from config import settings
 
 router = APIRouter()
 
 
 
 
+def hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, please try again shortly",
+        headers={"Retry-After": str(settings.HASH_RETRY_AFTER_SECONDS)}
+    )
+
+def find_login(db: Session, email: str):
+    row = db.query(User.id, User.email, User.username, User.role, User.password).filter(User.email == email).first()
+    # End the read so the pooled connection is not held while bcrypt runs
+    db.rollback()
+    return row
+
+def store_password_hash(db: Session, user_id: int, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update({User.password: hashed_password})
+    db.commit()
+
 @router.post("/login")
-def login(
+async def login(
     request: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = db.query(models.User).filter(models.User.email == request.username).first()
+    # Database work runs in the threadpool and bcrypt on the hashing pool, so a
+    # burst of logins queues there instead of stalling every other endpoint
+    user = await run_in_threadpool(find_login, db, request.username)
 
     if not user:
         raise HTTPException(
@@ -30,17 +54,21 @@ def login(
         )
 
     try:
-        if not Hash.verify(user.password, request.password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect password"
-            )
+        verified = await hashing_pool.verify(user.password, request.password)
+    except HashingBusy:
+        raise hashing_busy()
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Password verification failed: {str(e)}"
         )
 
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect password"
+        )
+
     # Skip OTP verification - auto-verify users on signup
     # if not user.is_verified:
     #     raise HTTPException(
@@ -48,17 +76,44 @@ def login(
     #         detail="Email not verified. Please verify your email to log in."
     #     )
 
-    token = create_access_token(data={"sub": user.email, "role": user.role})
+    # A new session: a short-lived access token and a refresh token to renew it without the password
+    tokens = await run_in_threadpool(issue_tokens, db, user)
 
+    # Move the stored hash to the configured cost while the password is at hand;
+    # if the pool is busy it is left for a later login
+    if Hash.needs_rehash(user.password):
+        try:
+            rehashed = await hashing_pool.hash(request.password)
+            await run_in_threadpool(store_password_hash, db, user.id, rehashed)
+        except HashingBusy:
+            pass
 
-    return {
-        "access_token": token,
-        "token_type": "bearer"
-    }
+    return tokens
+
+@router.post("/token/refresh")
+def refresh_tokens(body: RefreshRequest, db: Session = Depends(get_db)):
+    # Rotation: the refresh token is used up and replaced with the next one
+    try:
+        return rotate_refresh_token(db, body.refresh_token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+@router.post("/logout")
+def logout_session(body: RefreshRequest, db: Session = Depends(get_db)):
+    # Ends the session: its refresh tokens and access tokens stop working
+    try:
+        logout(db, body.refresh_token)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    return {"message": "Logged out"}
 
 
 @router.get("/users", response_model=list[schemas.ShowUser])
-def get_users(db: Session = Depends(get_db), current_user: schemas.UserOut = Depends(get_current_user)):
+def get_users(db: Session = Depends(get_read_db), current_user: schemas.UserOut = Depends(get_current_user)):
     users = db.query(models.User).all()
     return users
 
@@ -66,8 +121,47 @@ def get_users(db: Session = Depends(get_db), current_user: schemas.UserOut = Dep
 def get_my_profile(current_user: schemas.UserOut = Depends(get_current_user)):
     return current_user
 
-@router.post("/signup", response_model=ShowUser)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+@router.get("/users/me/notifications", response_model=NotificationPreferences)
+def get_notification_preferences(
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(require_volunteer)
+):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    return NotificationPreferences(notification_mode=user.notification_mode or "immediate")
+
+@router.put("/users/me/notifications", response_model=NotificationPreferences)
+def update_notification_preferences(
+    preferences: NotificationPreferences,
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(require_volunteer)
+):
+    user = db.query(User).filter(User.id == current_user.id).first()
+    user.notification_mode = preferences.notification_mode
+    db.commit()
+    return preferences
+
+@router.get("/users/me/service-areas", response_model=ServicePreferences)
+def get_service_areas(
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(require_volunteer)
+):
+    return get_service_preferences(db, current_user.id)
+
+@router.put("/users/me/service-areas", response_model=ServicePreferences)
+def update_service_areas(
+    preferences: ServicePreferences,
+    db: Session = Depends(get_db),
+    current_user: UserOut = Depends(require_volunteer)
+):
+    # Only alerts for requests in these areas and categories will be sent
+    try:
+        set_service_preferences(db, current_user.id, preferences)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_service_preferences(db, current_user.id)
+
+def check_signup_available(db: Session, user: UserCreate):
     db_user_email = db.query(User).filter(User.email == user.email).first()
     if db_user_email:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -76,25 +170,41 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     if db_user_name:
         raise HTTPException(status_code=400, detail="Username already taken")
 
-    hashed_pwd = Hash.bcrypt(user.password)
+    # Release the connection before hashing
+    db.rollback()
+
+def insert_user(db: Session, user: UserCreate, hashed_pwd: str) -> User:
+    def write(session: Session) -> int:
+        # OTP disabled - users auto-verified on signup
+        new_user = User(
+            username=user.username,
+            email=user.email,
+            password=hashed_pwd,
+            phone_number=user.phone_number,
+            role=user.role,
+            is_verified=True
+        )
+        session.add(new_user)
+        session.flush()
+        return new_user.id
 
-    # OTP disabled - users auto-verified on signup
-    new_user = User(
-        username=user.username,
-        email=user.email,
-        password=hashed_pwd,
-        phone_number=user.phone_number,
-        role=user.role,
-        is_verified=True
-    )
     try:
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        return new_user
+        user_id = commit_write(db, write)
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=500, detail="Could not create user")
+    return db.query(User).filter(User.id == user_id).one()
+
+@router.post("/signup", response_model=ShowUser)
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(check_signup_available, db, user)
+
+    try:
+        hashed_pwd = await hashing_pool.hash(user.password)
+    except HashingBusy:
+        raise hashing_busy()
+
+    return await run_in_threadpool(insert_user, db, user, hashed_pwd)
 
 @router.post("/verify-otp")
 def verify_otp(email: str, otp: str, db: Session = Depends(get_db)):
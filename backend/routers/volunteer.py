@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Header
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from async_database import get_async_db, get_async_read_db
 from models import volunteer_application as models
 from models import request as request_models
 from schemas.user import UserOut
 from dependencies.roles import require_volunteer
+from dependencies.feed import get_feed_params, get_photo_size
+from schemas.request import RequestFeedParams
+from utils.feed import load_feed_page, overlay_viewer_fields, apply_photo_size
+from utils.versioning import bump_version, get_version, make_etag, etag_matches
+from utils.events import event_broker, publish_events, APPLIED
+from utils.offload import offload
+from utils.group_commit import async_commit_write
 
 router = APIRouter(
     prefix="/volunteer",
@@ -16,12 +25,7 @@ def volunteer_dashboard(current_user: UserOut = Depends(require_volunteer)):
     return {"message": f"Welcome, volunteer {current_user.username}!"}
 
 
-@router.post("/apply/{request_id}", status_code=status.HTTP_201_CREATED)
-def apply_to_help(
-    request_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserOut = Depends(require_volunteer)  # ✅ Only volunteers can apply
-):
+def check_can_apply(db: Session, request_id: int, current_user: UserOut):
     req = db.query(request_models.Request).filter(request_models.Request.id == request_id).first()
     if not req:
         raise HTTPException(status_code=404, detail="Request not found.")
@@ -33,19 +37,53 @@ def apply_to_help(
     if existing:
         raise HTTPException(status_code=400, detail="Already applied to this request.")
 
-    application = models.VolunteerApplication(
-        volunteer_id=current_user.id,
-        request_id=request_id
-    )
-    db.add(application)
-    db.commit()
+
+@router.post("/apply/{request_id}", status_code=status.HTTP_201_CREATED)
+async def apply_to_help(
+    request_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserOut = Depends(require_volunteer)  # ✅ Only volunteers can apply
+):
+    await db.run_sync(check_can_apply, request_id, current_user)
+
+    def write(session: Session):
+        session.add(models.VolunteerApplication(
+            volunteer_id=current_user.id,
+            request_id=request_id
+        ))
+        bump_version(session)
+
+    await async_commit_write(db, write)
+    await offload(event_broker.blocking, publish_events, [(APPLIED, {"id": request_id, "volunteer_id": current_user.id})])
     return {"message": "Application submitted successfully."}
 
 
+def list_open_requests(
+    db: Session,
+    response: Response,
+    params: RequestFeedParams,
+    size: Optional[str],
+    if_none_match: Optional[str],
+    current_user: UserOut
+):
+    etag = make_etag(get_version(db), current_user.id, params.model_dump_json(), size)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    items, next_cursor = load_feed_page(db, params)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return apply_photo_size(overlay_viewer_fields(db, items, current_user), size)
+
+
 @router.get("/view-requests")
-def view_requests(
-    db: Session = Depends(get_db),
+async def view_requests(
+    response: Response,
+    params: RequestFeedParams = Depends(get_feed_params),
+    size: Optional[str] = Depends(get_photo_size),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: UserOut = Depends(require_volunteer)  # ✅ Cleaner
 ):
-    requests = db.query(request_models.Request).all()
-    return requests
+    return await db.run_sync(list_open_requests, response, params, size, if_none_match, current_user)
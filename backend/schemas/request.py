@@ -1,24 +1,43 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
+# Kinds of help a request asks for; volunteers subscribe to these
+RequestCategory = Literal["rescue", "medical", "food", "water", "shelter", "other"]
+
 class RequestCreate(BaseModel):
     title: str
     description: str
     location: str
     urgency_level: Optional[str] = "medium"  # low, medium, high
+    category: Optional[RequestCategory] = None
 
 class ShowRequest(BaseModel):
     id: int
     title: str
     description: str
     location: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     urgency_level: str
+    category: Optional[str] = None
     photo: Optional[str] = None
+    photo_variants: Optional[dict] = None
     timestamp: datetime
     user_id: int
     user: Optional[dict] = None  # Include user information
     volunteers: Optional[list] = None  # Include volunteer applications (for request owners only)
+    has_applied: Optional[bool] = None  # Whether the current volunteer has applied (for volunteer views)
+    distance_km: Optional[float] = None  # Distance from the searched point (nearby search only)
 
     class Config:
         from_attributes = True
+
+class RequestFeedParams(BaseModel):
+    limit: Optional[int] = None  # None: every matching request, unpaginated
+    cursor: Optional[str] = None
+    urgency_level: Optional[str] = None
+    location: Optional[str] = None
+    user_id: Optional[int] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
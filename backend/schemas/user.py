@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Literal
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Literal, Optional
+from schemas.request import RequestCategory
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
@@ -25,3 +26,22 @@ class UserOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class NotificationPreferences(BaseModel):
+    # 'digest' batches low-urgency alerts into a periodic summary; high urgency is always sent right away
+    notification_mode: Literal["immediate", "digest"] = "immediate"
+
+class ServiceArea(BaseModel):
+    # A place name to geocode, or explicit coordinates
+    location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: float = Field(25, gt=0)
+
+class ServicePreferences(BaseModel):
+    # No areas: alerts from everywhere. No categories: alerts of every category.
+    areas: List[ServiceArea] = []
+    categories: List[RequestCategory] = []
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
@@ -0,0 +1,42 @@
+"""
+Script to render thumbnails/WebP variants for photos uploaded before
+derivatives existed. The photo_variants column itself is added by
+migration 2; run scripts/migrate.py first.
+"""
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from models.request import Request
+from config import settings
+from utils.derivatives import render_variants, Image
+from utils.feed import invalidate_feed
+from utils.versioning import bump_version
+
+try:
+    if Image is None:
+        print("Pillow is not installed; skipping derivative generation.")
+        sys.exit(0)
+
+    db = SessionLocal()
+    try:
+        pending = db.query(Request).filter(Request.photo.isnot(None), Request.photo_variants.is_(None)).all()
+        for help_request in pending:
+            try:
+                help_request.photo_variants = render_variants(help_request.photo, settings.UPLOAD_DIR)
+                # Cached feed pages and ETags must pick up the new variants
+                bump_version(db)
+                db.commit()
+                invalidate_feed([help_request.id])
+                print(f"✅ Rendered variants for request {help_request.id}")
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Request {help_request.id}: {e}")
+    finally:
+        db.close()
+except Exception as e:
+    print(f"❌ Error: {e}")
+    sys.exit(1)
@@ -0,0 +1,183 @@
+"""
+Load benchmark for the sync and async request paths.
+
+Serves the app with uvicorn on a throwaway SQLite database (tuned, with
+the group-commit writer) and drives two endpoints with many concurrent
+keep-alive clients for a fixed time: the feed (GET /request/, which also
+authenticates and checks the change version) and request creation
+(POST /request/request-help). The sync variants are the handlers as they
+were before the async engine, on the sync Session with sync dependencies,
+so every request holds one of the threadpool's threads while it runs or
+waits for its commit. Reports sustained requests per second, p50/p99
+latency and errors for each.
+
+Usage: python scripts/bench_async_routes.py [clients] [seconds]
+"""
+import sys
+import os
+import asyncio
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8765
+CONTENT_LENGTH = re.compile(rb"content-length: (\d+)", re.IGNORECASE)
+CREATE_FORM = {"title": "Flood", "description": "Help", "location": "Kochi", "urgency_level": "high"}
+SCENARIOS = [
+    ("feed", "sync", "GET", "/bench/sync-feed?limit=20"),
+    ("feed", "async", "GET", "/request/?limit=20"),
+    ("create", "sync", "POST", "/bench/sync-create"),
+    ("create", "async", "POST", "/request/request-help"),
+]
+
+
+def build_app():
+    from fastapi import Depends, Form, Query, Response
+    from fastapi.concurrency import run_in_threadpool
+    from sqlalchemy.orm import Session
+    from database import get_db
+    from dependencies.oauth2 import oauth2_scheme, user_from_token
+    from main import app
+    from routers.request import list_requests, save_new_request
+    from schemas.request import RequestFeedParams
+
+    def sync_user(token: str = Depends(oauth2_scheme)):
+        return user_from_token(token)
+
+    @app.get("/bench/sync-feed")
+    def sync_feed(response: Response, limit: int = Query(20), db: Session = Depends(get_db), current_user=Depends(sync_user)):
+        return list_requests(db, response, RequestFeedParams(limit=limit), None, False, None, None, current_user)
+
+    @app.post("/bench/sync-create", status_code=201)
+    async def sync_create(
+        title: str = Form(...), description: str = Form(...), location: str = Form(...), urgency_level: str = Form("medium"),
+        db: Session = Depends(get_db), current_user=Depends(sync_user)
+    ):
+        return await run_in_threadpool(save_new_request, db, current_user, title, description, location, urgency_level, None)
+
+    return app
+
+
+def seed(workdir: str) -> str:
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    from database import Base, SessionLocal, engine
+    from models.auth.token import create_access_token
+    from models.request import Request
+    from models.user import User as UserModel
+    from models.volunteer_application import VolunteerApplication
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    owner = UserModel(username="owner", email="owner@bench.com", role="user")
+    volunteer = UserModel(username="vol", email="vol@bench.com", role="volunteer")
+    db.add_all([owner, volunteer])
+    db.flush()
+    requests = [Request(title=f"Flood {i}", description="Help", location="Kochi", user_id=owner.id) for i in range(200)]
+    db.add_all(requests)
+    db.flush()
+    db.add_all([VolunteerApplication(volunteer_id=volunteer.id, request_id=request.id) for request in requests[::3]])
+    db.commit()
+    token = create_access_token({"sub": volunteer.email, "uid": volunteer.id, "role": "volunteer", "username": "vol"})
+    db.close()
+    return token
+
+
+def raw_request(method: str, path: str, token: str) -> bytes:
+    headers = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n"
+    if method == "GET":
+        return (headers + "\r\n").encode()
+    body = urlencode(CREATE_FORM)
+    return (
+        headers + f"Content-Type: application/x-www-form-urlencoded\r\nContent-Length: {len(body)}\r\n\r\n{body}"
+    ).encode()
+
+
+async def drive(method: str, path: str, token: str, clients: int, seconds: float) -> dict:
+    """
+    Keep-alive clients on bare asyncio streams; httpx would use most of the
+    CPU that the server is supposed to get when both share a machine.
+    """
+    request = raw_request(method, path, token)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = CONTENT_LENGTH.search(head)
+                await reader.readexactly(int(length.group(1)) if length else 0)
+                if head[9:12] not in (b"200", b"201"):
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+        except (OSError, asyncio.IncompleteReadError):
+            errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+        "errors": errors,
+    }
+
+
+def wait_for_server():
+    for _ in range(100):
+        try:
+            urlopen(f"http://127.0.0.1:{PORT}/health", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("The server did not start")
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workdir = tempfile.mkdtemp()
+    token = seed(workdir)
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "SQLITE_PROFILE": "tuned", "SQLITE_GROUP_COMMIT": "true", "NOTIFY_WORKER_MODE": "external", "MIGRATE_ON_STARTUP": "true"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "scripts.bench_async_routes:build_app", "--factory",
+         "--port", str(PORT), "--log-level", "warning", "--app-dir", BACKEND_DIR],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server()
+        print(f"{clients} concurrent clients, {seconds:.0f}s per variant")
+        for endpoint, variant, method, path in SCENARIOS:
+            asyncio.run(drive(method, path, token, 50, 2))  # warm the caches and connections
+            result = asyncio.run(drive(method, path, token, clients, seconds))
+            print(
+                f"{endpoint:>6} {variant:>5}: {result['requests_per_second']:7.0f} req/s, p50 {result['p50_ms']:7.1f} ms, "
+                f"p99 {result['p99_ms']:7.1f} ms, {result['errors']} errors"
+            )
+    finally:
+        server.terminate()
+        server.wait(10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark for per-request authentication.
+
+Fills a throwaway SQLite database with N users and authenticates requests
+from a pool of active tokens: once the old way (decode the token, then
+look the user up by email in a fresh session) and once with the id claim
+and the user cache, cold and warm.
+
+Usage: python scripts/bench_auth.py [users] [requests]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+import models
+from models.request import Request  # noqa: F401, registers the table users relate to
+from models.auth.token import create_access_token
+from models.user import User as UserModel
+from dependencies.oauth2 import user_from_token
+from schemas.user import UserOut
+from utils.user_cache import user_cache
+from config import settings
+
+ACTIVE_USERS = 1000
+
+
+def make_database(users: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_auth.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    db.execute(insert(UserModel), [
+        {"username": f"user{i}", "email": f"user{i}@test.com", "role": "volunteer" if i % 3 else "user"}
+        for i in range(users)
+    ])
+    db.commit()
+    active = db.query(UserModel).filter(UserModel.id.in_(random.sample(range(1, users + 1), ACTIVE_USERS))).all()
+    tokens = [
+        create_access_token(data={"sub": user.email, "uid": user.id, "role": user.role, "username": user.username})
+        for user in active
+    ]
+    db.close()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    return path, session_factory, tokens, statements
+
+
+def lookup_by_email(token: str, db) -> UserOut:
+    # What every authenticated request used to do
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    user = db.query(UserModel).filter(UserModel.email == payload["sub"]).first()
+    return UserOut(id=user.id, username=user.username, email=user.email, role=user.role)
+
+
+def run(authenticate, session_factory, tokens, statements, requests: int) -> tuple:
+    statements.clear()
+    start = time.perf_counter()
+    for i in range(requests):
+        # A session per request, like get_db
+        db = session_factory()
+        try:
+            authenticate(tokens[i % len(tokens)], db)
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1e6, len(statements) / requests
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    path, session_factory, tokens, statements = make_database(users)
+
+    user_cache.clear()
+    results = [
+        ("email lookup", run(lookup_by_email, session_factory, tokens, statements, requests)),
+        ("cache, cold", run(user_from_token, session_factory, tokens, statements, len(tokens))),
+        ("cache, warm", run(user_from_token, session_factory, tokens, statements, requests)),
+    ]
+
+    print(f"{users} users, {len(tokens)} active tokens, {requests} requests")
+    for name, (micros, queries) in results:
+        print(f"{name:>13}: {micros:7.1f} us per request, {queries:.2f} queries per request")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
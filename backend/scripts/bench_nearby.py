@@ -0,0 +1,93 @@
+"""
+Benchmark for GET /request/nearby at scale.
+
+Fills a throwaway SQLite database with N synthetic geocoded requests spread
+over India and compares the geohash range scan used by find_nearby_requests
+with a full table scan plus distance check, for a few search radii.
+
+Usage: python scripts/bench_nearby.py [requests]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from utils.geo import encode_geohash, find_nearby_requests, haversine_km
+
+QUERIES = 20
+RADII = (5, 25, 100)
+
+
+def populate(db, count: int):
+    rng = random.Random(1)
+    owner = UserModel(username="bench", email="bench@test.com", role="user")
+    db.add(owner)
+    db.commit()
+    for start in range(0, count, 50000):
+        rows = []
+        for _ in range(min(50000, count - start)):
+            lat, lon = rng.uniform(8, 32), rng.uniform(68, 92)
+            rows.append({
+                "title": "Synthetic",
+                "description": "Benchmark",
+                "location": f"{lat:.5f}, {lon:.5f}",
+                "latitude": lat,
+                "longitude": lon,
+                "geohash": encode_geohash(lat, lon),
+                "urgency_level": "medium",
+                "user_id": owner.id
+            })
+        db.execute(insert(Request), rows)
+        db.commit()
+
+
+def full_scan(db, lat, lon, radius_km, limit):
+    hits = sorted(
+        (haversine_km(lat, lon, row_lat, row_lon), request_id)
+        for request_id, row_lat, row_lon in db.query(Request.id, Request.latitude, Request.longitude)
+        if haversine_km(lat, lon, row_lat, row_lon) <= radius_km
+    )
+    return hits[:limit]
+
+
+def timed(fn, points, radius):
+    start = time.perf_counter()
+    for lat, lon in points:
+        fn(lat, lon, radius)
+    return (time.perf_counter() - start) / len(points) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = os.path.join(tempfile.mkdtemp(), "bench_nearby.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    populate(db, count)
+    print(f"Inserted {count} requests in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(2)
+    points = [(rng.uniform(10, 30), rng.uniform(70, 90)) for _ in range(QUERIES)]
+    for radius in RADII:
+        indexed = timed(lambda lat, lon, r: find_nearby_requests(db, lat, lon, r, 100), points, radius)
+        scanned = timed(lambda lat, lon, r: full_scan(db, lat, lon, r, 100), points[:2], radius)
+        print(f"radius {radius:>4} km: geohash scan {indexed:8.2f} ms/query, full scan {scanned:9.2f} ms/query")
+
+    db.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for notification routing.
+
+Fills a throwaway SQLite database with N volunteers, each with a 25 km
+service area around a random gazetteer place, and times claiming the
+recipients of one alert in Kochi: once with every volunteer taking alerts
+from everywhere (the old behaviour) and once routed by service area.
+
+Usage: python scripts/bench_notification_routing.py [volunteers]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.notification import NotificationLog
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_routing import VolunteerAreaCell
+from utils.geo import load_gazetteer, covering_cells, location_fields
+from utils.notifications import claim_recipients
+from config import settings
+
+CHUNK = 50000
+
+
+def make_database(volunteers: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_routing.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(UserModel), [{"username": "owner", "email": "owner@test.com", "role": "user"}])
+
+    places = sorted(set(load_gazetteer().values()))
+    cells = {place: covering_cells(*place, 25, settings.SERVICE_AREA_PRECISION) for place in places}
+    rng = random.Random(7)
+    for start in range(0, volunteers, CHUNK):
+        ids = range(start + 2, min(volunteers, start + CHUNK) + 2)
+        db.execute(insert(UserModel), [
+            {"id": i, "username": f"vol{i}", "email": f"vol{i}@test.com", "role": "volunteer", "service_scope": "areas"}
+            for i in ids
+        ])
+        db.execute(insert(VolunteerAreaCell), [
+            {"user_id": i, "cell": cell} for i in ids for cell in cells[rng.choice(places)]
+        ])
+    db.add(Request(title="Flood", description="Help", location="Kochi", urgency_level="high", user_id=1, **location_fields("Kochi")))
+    db.commit()
+    return path, db
+
+
+def timed_claim(db) -> tuple:
+    db.query(NotificationLog).delete()
+    db.commit()
+    start = time.perf_counter()
+    claimed = claim_recipients(db, [1], "new_disaster")
+    return time.perf_counter() - start, claimed
+
+
+def main():
+    volunteers = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path, db = make_database(volunteers)
+
+    routed_time, routed = timed_claim(db)
+    db.execute(update(UserModel).values(service_scope="everywhere"))
+    db.commit()
+    broadcast_time, broadcast = timed_claim(db)
+
+    print(f"{volunteers} volunteers, one alert in Kochi")
+    print(f"{'everyone':>10}: {broadcast:7d} recipients claimed in {broadcast_time * 1000:8.1f} ms")
+    print(f"{'routed':>10}: {routed:7d} recipients claimed in {routed_time * 1000:8.1f} ms")
+    db.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for the volunteer notification fan-out.
+
+Fills a throwaway SQLite database with N volunteers and runs one
+"new_disaster" fan-out through the set-based implementation and through
+the original per-volunteer loop (on a smaller sample, since it is linear
+in queries). Mail delivery is simulated with a fixed per-message latency.
+
+Usage: python scripts/bench_notifications.py [volunteers] [legacy_volunteers] [mail_latency_ms]
+"""
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.notification import NotificationLog
+from models.request import Request
+from models.user import User as UserModel
+from utils.email import notify_volunteer
+from utils.notifications import fan_out_notifications
+
+
+def legacy_fan_out(db, request_id: int, notification_type: str):
+    # The original trigger_volunteer_notifications
+    request_obj = db.query(Request).filter(Request.id == request_id).first()
+    request_data = {
+        "title": request_obj.title,
+        "location": request_obj.location,
+        "urgency_level": request_obj.urgency_level,
+        "description": request_obj.description
+    }
+    for volunteer in db.query(UserModel).filter(UserModel.role == "volunteer").all():
+        existing_log = db.query(NotificationLog).filter_by(
+            user_id=volunteer.id, request_id=request_id, notification_type=notification_type
+        ).first()
+        if existing_log:
+            continue
+        notify_volunteer(volunteer.email, volunteer.username, request_data, notification_type)
+        db.add(NotificationLog(user_id=volunteer.id, request_id=request_id, notification_type=notification_type))
+    db.commit()
+
+
+def make_database(volunteers: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_notifications.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(UserModel), [{"username": "owner", "email": "owner@test.com", "role": "user"}])
+    for start in range(0, volunteers, 50000):
+        db.execute(insert(UserModel), [
+            {"username": f"vol{i}", "email": f"vol{i}@test.com", "role": "volunteer"}
+            for i in range(start, min(volunteers, start + 50000))
+        ])
+    db.add(Request(title="Flood", description="Help", location="Kochi", urgency_level="high", user_id=1))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    return path, db, statements
+
+
+def run(fan_out, volunteers: int, latency: float):
+    path, db, statements = make_database(volunteers)
+    with patch("utils.email.deliver_email", side_effect=lambda *args, **kwargs: time.sleep(latency) or "sent"):
+        start = time.perf_counter()
+        fan_out(db, 1, "new_disaster")
+        elapsed = time.perf_counter() - start
+    assert db.query(NotificationLog).count() == volunteers
+    db.close()
+    os.remove(path)
+    return elapsed, len(statements)
+
+
+def main():
+    volunteers = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    legacy_volunteers = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 1.0) / 1000
+
+    print(f"Simulated mail latency {latency * 1000:.1f} ms per message")
+    for name, fan_out, count in (
+        ("per-volunteer loop", legacy_fan_out, legacy_volunteers),
+        ("set-based fan-out", lambda db, request_id, kind: fan_out_notifications(db, [request_id], kind), volunteers),
+    ):
+        elapsed, statements = run(fan_out, count, latency)
+        print(f"{name:>20}: {count} volunteers in {elapsed:7.2f}s ({count / elapsed:8.0f}/s), {statements} SQL statements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark for SMTP delivery.
+
+Starts a local aiosmtpd server and sends N messages through a fresh
+connection per message (connect, EHLO, AUTH, send, QUIT, as the original
+send_email did) and through the pooled SMTPTransport from several threads.
+
+Usage: python scripts/bench_smtp.py [messages] [threads]
+"""
+import sys
+import os
+import smtplib
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from utils.email import SMTPTransport, SENT
+
+
+class CountingHandler:
+    def __init__(self):
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return "250 Message accepted"
+
+
+def make_message(i: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "alerts@relief.test"
+    message["To"] = f"vol{i}@relief.test"
+    message["Subject"] = "Alert"
+    message.set_content("Help needed")
+    return message
+
+
+def send_unpooled(port: int, message: EmailMessage) -> str:
+    with smtplib.SMTP("127.0.0.1", port) as server:
+        server.login("relief", "secret")
+        server.send_message(message)
+    return SENT
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    handler = CountingHandler()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port,
+        authenticator=lambda *args: AuthResult(success=True), auth_require_tls=False
+    )
+    controller.start()
+
+    transport = SMTPTransport("127.0.0.1", port, "relief", "secret", pool_size=threads, max_messages=1000)
+    try:
+        for name, send in (
+            ("connection per message", lambda message: send_unpooled(port, message)),
+            ("pooled transport", transport.send),
+        ):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(send, [make_message(i) for i in range(messages)]))
+            elapsed = time.perf_counter() - start
+            assert results.count(SENT) == messages
+            print(f"{name:>22}: {messages} messages in {elapsed:6.2f}s ({messages / elapsed:7.0f}/s)")
+        print(f"pooled transport opened {transport.stats()['connections']} connections")
+    finally:
+        transport.close()
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
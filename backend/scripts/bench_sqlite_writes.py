@@ -0,0 +1,127 @@
+"""
+Write-throughput benchmark for SQLite.
+
+Runs the same small write (one user row plus the feed change version, as
+signup and request creation do) from many threads against a throwaway
+database file, in three setups: SQLite defaults (rollback journal,
+synchronous=FULL), the tuned profile (WAL, synchronous=NORMAL, busy
+timeout, caches), and the tuned profile with the group-commit writer.
+
+Usage: python scripts/bench_sqlite_writes.py [threads] [writes_per_thread]
+"""
+import sys
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, configure_sqlite
+import models
+from models.request import Request  # noqa: F401, registers the table users relate to
+from models.user import User as UserModel
+from utils.group_commit import GroupCommitWriter
+from utils.versioning import bump_version
+
+
+def make_session_factory(tuned: bool):
+    path = os.path.join(tempfile.mkdtemp(), "bench_writes.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if tuned:
+        configure_sqlite(engine)
+    Base.metadata.create_all(bind=engine)
+    return path, engine, sessionmaker(bind=engine)
+
+
+def write_for(name: str):
+    def write(session):
+        user = UserModel(username=name, email=f"{name}@test.com", role="volunteer")
+        session.add(user)
+        bump_version(session)
+        session.flush()
+        return user.id
+    return write
+
+
+def direct(session_factory):
+    def run(work):
+        db = session_factory()
+        try:
+            result = work(db)
+            db.commit()
+            return result
+        finally:
+            db.close()
+    return run
+
+
+def run_setup(name: str, tuned: bool, group_commit: bool, threads: int, writes: int) -> dict:
+    path, engine, session_factory = make_session_factory(tuned)
+    writer = None
+    if group_commit:
+        writer = GroupCommitWriter(session_factory, max_batch=64, window=0.002)
+        writer.start()
+    submit = writer.submit if writer else direct(session_factory)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def client(index: int):
+        for i in range(writes):
+            start = time.perf_counter()
+            try:
+                submit(write_for(f"{index}-{i}"))
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(client, range(threads)))
+    elapsed = time.perf_counter() - start
+    if writer:
+        writer.stop(10)
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.rmdir(os.path.dirname(path))
+    latencies.sort()
+    return {
+        "name": name,
+        "writes_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+        "errors": len(errors),
+        "batches": writer.stats()["batches"] if writer else len(latencies),
+    }
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"{threads} threads x {writes} writes")
+    for name, tuned, group_commit in (
+        ("defaults", False, False),
+        ("tuned", True, False),
+        ("tuned + group commit", True, True),
+    ):
+        result = run_setup(name, tuned, group_commit, threads, writes)
+        print(
+            f"{result['name']:>21}: {result['writes_per_second']:7.0f} writes/s, p50 {result['p50_ms']:6.1f} ms, "
+            f"p99 {result['p99_ms']:7.1f} ms, {result['batches']:5d} commits, {result['errors']} 'database is locked' errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Throughput benchmark for concurrent large photo uploads.
+
+Runs N concurrent uploads through the streaming pipeline and through the
+old blocking copy, and reports throughput together with the worst event
+loop stall seen by a ticker task while the uploads were running.
+
+Usage: python scripts/bench_uploads.py [uploads] [size_mb]
+"""
+import sys
+import os
+import io
+import asyncio
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.datastructures import UploadFile
+from utils.uploads import store_upload
+
+
+def make_upload(payload: bytes) -> UploadFile:
+    # Starlette spools multipart files larger than 1MB to disk the same way
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(spooled, filename="photo.jpg")
+
+
+async def legacy_store(photo: UploadFile, upload_dir: str) -> str:
+    # The original create_request: blocking copy on the calling thread
+    filename = f"1_{id(photo)}_{photo.filename}"
+    with open(os.path.join(upload_dir, filename), "wb") as buffer:
+        shutil.copyfileobj(photo.file, buffer)
+    return filename
+
+
+async def run(store, uploads: int, payload: bytes):
+    upload_dir = tempfile.mkdtemp()
+    files = [make_upload(payload) for _ in range(uploads)]
+    worst_stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst_stall
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst_stall = max(worst_stall, time.perf_counter() - start - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(store(photo, upload_dir) for photo in files))
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    shutil.rmtree(upload_dir)
+    return elapsed, worst_stall
+
+
+def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    size_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+    payload = b"\xff\xd8\xff\xe0" + os.urandom(int(size_mb * 1024 * 1024) - 4)
+    total_mb = uploads * size_mb
+
+    print(f"{uploads} concurrent uploads of {size_mb}MB")
+    with patch("utils.uploads.settings.MAX_UPLOAD_SIZE", len(payload)):
+        for name, store in (("blocking copy", legacy_store), ("streaming pipeline", store_upload)):
+            elapsed, stall = asyncio.run(run(store, uploads, payload))
+            print(f"{name:>20}: {total_mb / elapsed:8.1f} MB/s, worst event loop stall {stall * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Picks the bcrypt cost for this machine.
+
+Times one hash at each cost from 10 up and reports the highest cost whose
+median stays within the target latency (250 ms by default). Run it on the
+deployment hardware and set the result as BCRYPT_ROUNDS; stored hashes
+move to the new cost as their users log in.
+
+Usage: python scripts/calibrate_bcrypt.py [target_ms] [samples]
+"""
+import sys
+import os
+import statistics
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def time_hash(rounds: int, samples: int) -> float:
+    salt = bcrypt.gensalt(rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target: float, samples: int) -> int:
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = time_hash(rounds, samples)
+        fits = elapsed <= target
+        print(f"cost {rounds:2d}: {elapsed * 1000:7.1f} ms{'' if fits else '  (over target)'}")
+        if not fits:
+            break
+        chosen = rounds
+    return chosen
+
+
+def main():
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    rounds = calibrate(target_ms / 1000, samples)
+    print(f"BCRYPT_ROUNDS={rounds}  (highest cost within {target_ms:.0f} ms per hash)")
+
+
+if __name__ == "__main__":
+    main()
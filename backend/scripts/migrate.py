@@ -0,0 +1,31 @@
+"""
+Applies the pending schema migrations to DATABASE_URL, including their
+batched data backfills. Run it before starting a new release (workers
+only check the schema version); the running workers keep serving while
+it runs.
+
+Usage: python scripts/migrate.py [target_version]
+"""
+import sys
+import os
+import logging
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from migrations import MIGRATIONS
+from utils.migrate import current_version, migrate
+
+try:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(f"Schema version {current_version(engine)}, latest {MIGRATIONS[-1].version}")
+    applied = migrate(engine, MIGRATIONS, target)
+    if applied:
+        print(f"✅ Applied migrations {', '.join(map(str, applied))}; schema version {current_version(engine)}.")
+    else:
+        print("✅ The schema is up to date.")
+except Exception as e:
+    print(f"❌ Error: {e}")
+    sys.exit(1)
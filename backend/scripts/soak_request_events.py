@@ -0,0 +1,203 @@
+"""
+Soak test for the live request feed (GET /request/events).
+
+Starts the API with uvicorn in a subprocess on a throwaway database,
+connects N Server-Sent Events clients, creates requests and measures how
+long each created event takes to reach every client. A tenth of the
+clients then disconnect, more requests are created, and they reconnect
+with Last-Event-ID and must receive exactly what they missed. With more
+than one worker the sqlite event backend is used, so clients on one
+worker see writes handled by another.
+
+Usage: python scripts/soak_request_events.py [clients] [events] [workers]
+"""
+import sys
+import os
+import asyncio
+import re
+import socket
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EVENT = re.compile(rb"id: (\d+)\nevent: created\ndata: \{\"id\": (\d+)")
+
+
+class Client:
+    def __init__(self, port: int, token: str):
+        self.port = port
+        self.token = token
+        self.arrivals = {}  # request id -> arrival time
+        self.last_event_id = None
+        self.task = None
+
+    async def run(self, connected: asyncio.Event):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        resume = f"Last-Event-ID: {self.last_event_id}\r\n" if self.last_event_id else ""
+        writer.write(
+            f"GET /request/events?access_token={self.token} HTTP/1.1\r\n"
+            f"Host: localhost\r\nAccept: text/event-stream\r\n{resume}\r\n".encode()
+        )
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.split(b"\r\n")[0].decode())
+        connected.set()
+        buffer = b""
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                buffer += data
+                for match in EVENT.finditer(buffer):
+                    self.last_event_id = int(match.group(1))
+                    self.arrivals.setdefault(int(match.group(2)), time.perf_counter())
+                buffer = buffer[-256:]
+        finally:
+            writer.close()
+
+    async def connect(self):
+        connected = asyncio.Event()
+        self.task = asyncio.create_task(self.run(connected))
+        done, _ = await asyncio.wait([self.task, asyncio.create_task(connected.wait())], return_when=asyncio.FIRST_COMPLETED)
+        if self.task in done:
+            self.task.result()
+
+    def disconnect(self):
+        self.task.cancel()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int, workdir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'soak.db')}",
+        UPLOAD_DIR=os.path.join(workdir, "uploads"),
+        EVENTS_BACKEND="sqlite" if workers > 1 else "memory",
+        EVENTS_SQLITE_PATH=os.path.join(workdir, "events.db"),
+        EVENTS_POLL_SECONDS="0.05",
+        NOTIFY_WORKERS="1",
+    )
+    # Workers only check the schema version, so migrate before starting them
+    subprocess.run([sys.executable, "scripts/migrate.py"], cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--backlog", "8192", "--limit-concurrency", "100000"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    for _ in range(200):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+
+def server_rss_mb(server: subprocess.Popen) -> float:
+    pids = [server.pid] + [
+        int(pid) for pid in subprocess.run(["pgrep", "-P", str(server.pid)], capture_output=True, text=True).stdout.split()
+    ]
+    total = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/status") as f:
+            total += next((int(line.split()[1]) for line in f if line.startswith("VmRSS")), 0)
+    return total / 1024
+
+
+async def create_requests(http: httpx.AsyncClient, headers: dict, count: int, started: dict):
+    for i in range(count):
+        start = time.perf_counter()
+        response = await http.post("/request/request-help", headers=headers, data={
+            "title": f"Soak {i}", "description": "Help", "location": "Kochi", "urgency_level": "low"
+        })
+        response.raise_for_status()
+        started[response.json()["id"]] = start
+        await asyncio.sleep(0.05)
+
+
+async def wait_for(clients, request_ids, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if all(request_id in client.arrivals for client in clients for request_id in request_ids):
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def soak(port: int, client_count: int, event_count: int, server: subprocess.Popen):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as http:
+        await http.post("/signup", json={"username": "soak", "email": "soak@test.com", "password": "pw", "role": "user"})
+        token = (await http.post("/login", data={"username": "soak@test.com", "password": "pw"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        clients = [Client(port, token) for _ in range(client_count)]
+        start = time.perf_counter()
+        for batch in range(0, client_count, 250):
+            await asyncio.gather(*(client.connect() for client in clients[batch:batch + 250]))
+        print(f"{client_count} clients connected in {time.perf_counter() - start:.1f}s, server RSS {server_rss_mb(server):.0f} MB")
+        print(f"Broker: {(await http.get('/metrics/events')).json()}")
+
+        # Live fan-out
+        started = {}
+        await create_requests(http, headers, event_count, started)
+        complete = await wait_for(clients, started, 60)
+        latencies = [client.arrivals[request_id] - started[request_id] for client in clients for request_id in started if request_id in client.arrivals]
+        missing = client_count * event_count - len(latencies)
+        print(
+            f"{event_count} events to {client_count} clients: {len(latencies)} deliveries, {missing} missing, "
+            f"latency p50 {percentile(latencies, 0.5) * 1000:.0f} ms, p95 {percentile(latencies, 0.95) * 1000:.0f} ms, "
+            f"max {max(latencies) * 1000:.0f} ms"
+        )
+
+        # Resume after a reconnect
+        dropped = clients[:client_count // 10]
+        for client in dropped:
+            client.disconnect()
+        await asyncio.sleep(0.5)
+        missed = {}
+        await create_requests(http, headers, 5, missed)
+        for batch in range(0, len(dropped), 250):
+            await asyncio.gather(*(client.connect() for client in dropped[batch:batch + 250]))
+        resumed = await wait_for(dropped, missed, 30)
+        print(f"{len(dropped)} clients reconnected with Last-Event-ID and {'received' if resumed else 'did NOT receive'} all {len(missed)} missed events")
+        print(f"Server RSS {server_rss_mb(server):.0f} MB")
+
+        for client in clients:
+            client.disconnect()
+        return complete and resumed
+
+
+def main():
+    client_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    event_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    port = free_port()
+    server = start_server(port, workers, tempfile.mkdtemp())
+    try:
+        ok = asyncio.run(soak(port, client_count, event_count, server))
+    finally:
+        server.terminate()
+        server.wait(30)
+    print("✅ Soak test passed" if ok else "❌ Soak test failed")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
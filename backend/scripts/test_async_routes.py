@@ -0,0 +1,187 @@
+import sys
+import os
+import asyncio
+import tempfile
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from async_database import async_database_url
+from database import Base, configure_sqlite
+from dependencies.oauth2 import async_user_from_token
+from models.auth.token import create_access_token
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_application import VolunteerApplication
+from routers.request import get_all_requests, save_new_request_async
+from routers.volunteer import apply_to_help
+from schemas.request import RequestFeedParams
+from schemas.user import UserOut
+from utils.cache import feed_cache, MemoryCache, SQLiteCache
+from utils.group_commit import GroupCommitWriter
+from utils.offload import offload
+from utils.sessions import RevocationList
+from utils.user_cache import user_cache
+
+
+def make_engines():
+    path = os.path.join(tempfile.mkdtemp(), "async.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_sqlite(engine)
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    configure_sqlite(async_engine.sync_engine)
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    return engine, async_engine, statements
+
+
+def status_of(coroutine) -> int:
+    try:
+        asyncio.run(coroutine)
+        return 200
+    except HTTPException as e:
+        return e.status_code
+
+
+def test_async_database_url():
+    print("Starting async routes test...")
+    assert async_database_url("sqlite:///./disaster.db") == "sqlite+aiosqlite:///./disaster.db"
+    assert async_database_url("postgresql://relief:secret@db/relief") == "postgresql+asyncpg://relief:secret@db/relief"
+    try:
+        async_database_url("oracle://db/relief")
+        raise AssertionError("Expected a ValueError")
+    except ValueError:
+        pass
+    print("✅ Scenario 1: The async engine reaches DATABASE_URL through aiosqlite or asyncpg.")
+
+
+def test_async_routes():
+    feed_cache.clear()
+    user_cache.clear()
+    engine, async_engine, statements = make_engines()
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteer = UserModel(username="vol", email="vol@test.com", role="volunteer")
+    db.add_all([owner, volunteer])
+    db.commit()
+    owner_out = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+    volunteer_out = UserOut(id=volunteer.id, username="vol", email="vol@test.com", role="volunteer")
+    db.close()
+
+    revocations = RevocationList(session_factory, capacity=1000, error_rate=0.001, sync_seconds=3600)
+    token = create_access_token({"sub": "vol@test.com", "uid": volunteer_out.id, "role": "volunteer", "sid": "live"})
+
+    async def authenticate(access_token):
+        async with AsyncSession(async_engine) as async_db:
+            return await async_user_from_token(access_token, async_db)
+
+    with patch("dependencies.oauth2.revocation_list", revocations):
+        # Scenario 2: a cache miss is read through the async session, a hit needs no IO and no thread
+        assert asyncio.run(authenticate(token)).role == "volunteer"
+        assert len(statements) == 1
+        statements.clear()
+        with patch("dependencies.oauth2.run_in_threadpool", side_effect=AssertionError("left the event loop")):
+            for _ in range(100):
+                asyncio.run(authenticate(token))
+        assert statements == []
+        print("✅ Scenario 2: Async authentication of a cached user with a live session stays on the event loop.")
+
+        # Scenario 3: revoked sessions are still rejected
+        revocations.add("ended")
+        ended = create_access_token({"sub": "vol@test.com", "uid": volunteer_out.id, "role": "volunteer", "sid": "ended"})
+        assert status_of(authenticate(ended)) == 401
+        print("✅ Scenario 3: Async authentication rejects logged-out sessions.")
+
+    writer = GroupCommitWriter(session_factory, max_batch=64, window=0.01)
+    writer.start()
+    try:
+        async def create(title):
+            async with AsyncSession(async_engine, expire_on_commit=False) as async_db:
+                return await save_new_request_async(async_db, owner_out, title, "Help", "Kochi", "high", None)
+
+        async def apply(request_id):
+            async with AsyncSession(async_engine, expire_on_commit=False) as async_db:
+                return await apply_to_help(request_id, db=async_db, current_user=volunteer_out)
+
+        async def create_and_apply():
+            created = await asyncio.gather(*[create(f"Flood {i}") for i in range(3)])
+            await apply(created[0]["id"])
+            return created
+
+        # Scenario 4: request creation and applications commit through the writer without blocking the loop
+        with patch("utils.group_commit._writer", writer), patch("routers.request.publish_events"), \
+             patch("routers.volunteer.publish_events"):
+            created = asyncio.run(create_and_apply())
+            assert created[0]["user"]["username"] == "owner" and created[0]["latitude"] is not None
+            assert writer.stats()["writes"] == 4 and writer.stats()["batches"] < 4
+            assert status_of(apply(created[0]["id"])) == 400
+            assert status_of(apply(999)) == 404
+        check = session_factory()
+        assert check.query(Request).count() == 3 and check.query(VolunteerApplication).count() == 1
+        check.close()
+        print("✅ Scenario 4: Request creation and applications are committed through the group-commit writer.")
+    finally:
+        writer.stop(5)
+
+    # Scenario 5: the feed runs its queries on the async session, with the same ETags and 304s
+    async def feed(if_none_match=None):
+        response = Response()
+        async with AsyncSession(async_engine) as async_db:
+            result = await get_all_requests(
+                response=response, params=RequestFeedParams(limit=10), size=None, stream=False, accept=None,
+                if_none_match=if_none_match, db=async_db, current_user=volunteer_out
+            )
+        return response, result
+
+    response, items = asyncio.run(feed())
+    assert len(items) == 3 and sum(item["has_applied"] for item in items) == 1
+    _, not_modified = asyncio.run(feed(response.headers["ETag"]))
+    assert not_modified.status_code == 304
+
+    async def concurrent_feeds():
+        return await asyncio.gather(*[feed() for _ in range(50)])
+    assert all(len(items) == 3 for _, items in asyncio.run(concurrent_feeds()))
+    print("✅ Scenario 5: The feed is served from the async session, including 50 concurrent readers.")
+
+    # Scenario 6: a SQLite cache is used from the threadpool, also from sync code inside run_sync
+    sqlite_cache = SQLiteCache(os.path.join(tempfile.mkdtemp(), "cache.db"), max_entries=10, max_bytes=10000, ttl=60)
+    memory_cache = MemoryCache(max_entries=10, max_bytes=10000, ttl=60)
+    offloaded = []
+
+    def recording_run_in_threadpool(function, *args, **kwargs):
+        offloaded.append(function.__name__)
+        return run_in_threadpool(function, *args, **kwargs)
+
+    async def use_caches():
+        async with AsyncSession(async_engine) as async_db:
+            await async_db.run_sync(lambda session: sqlite_cache.set("page", [1, 2], tags=["requests"]))
+            assert await offload(sqlite_cache.blocking, sqlite_cache.get, "page") == [1, 2]
+            await offload(memory_cache.blocking, memory_cache.set, "page", [1, 2])
+
+    with patch("utils.offload.run_in_threadpool", recording_run_in_threadpool):
+        asyncio.run(use_caches())
+    assert offloaded == ["set", "get"]
+    assert sqlite_cache.get("page") == [1, 2] and offloaded == ["set", "get"]  # Called off the loop, it runs inline
+    print("✅ Scenario 6: SQLite cache calls from async routes run on the threadpool; memory cache calls stay on the loop.")
+
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+    print("✅ All async routes tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_async_database_url()
+        test_async_routes()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,100 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import settings
+from database import Base
+import models
+from models.request import Request  # noqa: F401, registers the table users relate to
+from dependencies.oauth2 import user_from_token
+from models.auth.token import create_access_token
+from models.user import User as UserModel
+from utils.user_cache import user_cache
+
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    return sessionmaker(bind=engine)(), statements
+
+
+def token_for(user):
+    return create_access_token(data={"sub": user.email, "uid": user.id, "role": user.role, "username": user.username})
+
+
+def rejected(token, db):
+    try:
+        user_from_token(token, db)
+        return False
+    except HTTPException as e:
+        return e.status_code == 401
+
+
+def test_token_claims_and_user_cache():
+    print("Starting token claim authentication test...")
+    user_cache.clear()
+    db, statements = make_session()
+    volunteer = UserModel(username="vol", email="vol@test.com", role="volunteer")
+    db.add(volunteer)
+    db.commit()
+
+    # Scenario 1: tokens carry the id, role and username
+    token = token_for(volunteer)
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert (claims["uid"], claims["role"], claims["username"]) == (volunteer.id, "volunteer", "vol")
+    print("✅ Scenario 1: Access tokens include the user id, role and username.")
+
+    # Scenario 2: only the first request reads the user
+    statements.clear()
+    first = user_from_token(token, db)
+    assert len(statements) == 1
+    statements.clear()
+    for _ in range(5):
+        assert user_from_token(token, db) == first
+    assert statements == []
+    print("✅ Scenario 2: Repeated requests authenticate with zero database queries.")
+
+    # Scenario 3: changing the user drops the cached record
+    volunteer.role = "user"
+    db.commit()
+    assert user_from_token(token, db).role == "user"
+    print("✅ Scenario 3: Role changes take effect before the token expires.")
+
+    # Scenario 4: deleted users and tokens for another email are refused
+    impostor = create_access_token(data={"sub": "other@test.com", "uid": volunteer.id})
+    assert rejected(impostor, db)
+    db.delete(volunteer)
+    db.commit()
+    assert rejected(token, db)
+    assert rejected("not-a-token", db) and rejected(None, db)
+    print("✅ Scenario 4: Deleted users and mismatched tokens are rejected.")
+
+    # Scenario 5: tokens issued before the id claim still work
+    legacy = UserModel(username="legacy", email="legacy@test.com", role="user")
+    db.add(legacy)
+    db.commit()
+    assert user_from_token(create_access_token(data={"sub": legacy.email, "role": "user"}), db).id == legacy.id
+    print("✅ Scenario 5: Older tokens without an id fall back to the email lookup.")
+
+    print("✅ All token claim authentication tests passed!")
+    db.close()
+
+
+if __name__ == "__main__":
+    try:
+        test_token_claims_and_user_cache()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
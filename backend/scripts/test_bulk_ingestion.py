@@ -0,0 +1,129 @@
+import sys
+import os
+import asyncio
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import settings
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from models.notification import NotificationLog
+from routers.request import insert_request_rows
+from utils.notifications import fan_out_notifications
+from utils.bulk import check_multipart_size, detect_format, parse_rows, validate_rows, read_upload
+from utils.uploads import MULTIPART_OVERHEAD
+
+
+def test_parse_and_validate():
+    print("Starting bulk parsing test...")
+
+    assert detect_format("text/csv; charset=utf-8") == "csv"
+    assert detect_format("application/octet-stream", "feed.ndjson") == "ndjson"
+    assert detect_format("application/json") == "json"
+
+    csv_data = b"title,description,location,urgency_level\nFlood,Help,Kochi,\nFire,Help,,high\n"
+    valid, errors = validate_rows(parse_rows(csv_data, "csv")[0])
+    assert [row.title for _, row in valid] == ["Flood"] and valid[0][1].urgency_level == "medium"
+    assert errors == [{"row": 2, "errors": ["location: Field required"]}]
+
+    rows, errors = parse_rows(b'{"title": "a", "description": "b", "location": "c"}\nnot json\n', "ndjson")
+    assert len(rows) == 1 and errors[0]["row"] == 2
+
+    try:
+        parse_rows(b'{"title": "a"}', "json")
+        assert False, "non-array JSON accepted"
+    except ValueError:
+        pass
+    print("✅ CSV, NDJSON and JSON uploads are parsed with per-row errors.")
+
+    # Undecodable and unreadable uploads are client errors (400), not crashes
+    for data, fmt in [(b"title\n\xff\xfe\n", "csv"), (b"title,description\n" + b"x" * 200000 + b",y\n", "csv")]:
+        try:
+            parse_rows(data, fmt)
+            assert False, "broken upload accepted"
+        except ValueError:
+            pass
+
+    # Oversized uploads are rejected while reading, before the rest arrives
+    async def chunks(received):
+        for _ in range(100):
+            received.append(1)
+            yield b"x" * 1000
+    received = []
+    with patch.object(settings, "BULK_MAX_BYTES", 5000):
+        try:
+            asyncio.run(read_upload(chunks(received)))
+            assert False, "oversized upload accepted"
+        except HTTPException as e:
+            assert e.status_code == 413 and len(received) == 6
+        # Multipart forms are spooled whole when parsed, so their declared size is checked before
+        check_multipart_size("5000")
+        for content_length, status_code in [(str(5001 + MULTIPART_OVERHEAD), 413), (None, 411)]:
+            try:
+                check_multipart_size(content_length)
+                assert False, "multipart upload accepted"
+            except HTTPException as e:
+                assert e.status_code == status_code
+    print("✅ Invalid UTF-8 and CSV give ValueError; uploads over BULK_MAX_BYTES stop with 413 before parsing.")
+
+
+def test_chunked_insert_and_coalesced_notifications():
+    print("Starting bulk insert test...")
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteers = [UserModel(username=f"vol{i}", email=f"vol{i}@test.com", role="volunteer") for i in range(2)]
+    db.add_all([owner, *volunteers])
+    db.commit()
+
+    payload = "\n".join(f'{{"title": "Request {i}", "description": "Help", "location": "Kochi"}}' for i in range(120))
+    valid, _ = validate_rows(parse_rows(payload.encode(), "ndjson")[0])
+
+    inserts = []
+    listener = lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT INTO requests") else None
+    event.listen(engine, "before_cursor_execute", listener)
+    with patch("routers.request.settings.BULK_INSERT_CHUNK_SIZE", 50):
+        request_ids = insert_request_rows(db, [row for _, row in valid], owner.id)
+    event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(request_ids) == 120 and db.query(Request).count() == 120
+    titles = dict(db.query(Request.id, Request.title))
+    assert [titles[request_id] for request_id in request_ids] == [f"Request {i}" for i in range(120)]
+    # Ids can only be matched to rows of a multi-row INSERT where the dialect sorts RETURNING by parameter order
+    expected_inserts = 3 if engine.dialect.name == "postgresql" else 120
+    assert len(inserts) == expected_inserts, f"expected {expected_inserts} inserts, saw {len(inserts)}"
+    print("✅ Scenario 1: Rows are inserted in one transaction and every id is returned in input order.")
+
+    # One already-notified pair must be skipped, everything else coalesced into one mail per volunteer
+    db.add(NotificationLog(user_id=volunteers[0].id, request_id=request_ids[0], notification_type="new_disaster"))
+    db.commit()
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent") as mock_notify:
+        fan_out_notifications(db, request_ids, "new_disaster")
+        assert mock_notify.call_count == 2
+        sizes = sorted(len(call.args[2]) for call in mock_notify.call_args_list)
+        assert sizes == [119, 120]
+    assert db.query(NotificationLog).count() == 240
+    print("✅ Scenario 2: One coalesced notification per volunteer for the whole batch.")
+
+    print("✅ All bulk ingestion tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_parse_and_validate()
+        test_chunked_insert_and_coalesced_notifications()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
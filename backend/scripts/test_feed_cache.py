@@ -0,0 +1,165 @@
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_application import VolunteerApplication
+from schemas.request import RequestFeedParams
+from schemas.user import UserOut
+from utils.cache import MemoryCache, SQLiteCache, feed_cache
+import utils.feed
+from utils.feed import load_feed_page, overlay_viewer_fields, invalidate_feed
+
+
+def test_memory_cache_bounds():
+    print("Starting memory cache test...")
+    cache = MemoryCache(max_entries=2, max_bytes=1000, ttl=0.2)
+
+    cache.set("a", [1], tags=["t1"])
+    cache.set("b", [2], tags=["t2"])
+    assert cache.get("a") == [1]
+    cache.set("c", [3])
+    assert cache.get("b") is None and cache.get("a") == [1], "least recently used entry should go first"
+
+    cache.invalidate_tags(["t1"])
+    assert cache.get("a") is None
+
+    cache.set("big", "x" * 2000)
+    assert cache.get("big") is None, "entries larger than the byte bound are not stored"
+
+    cache.set("short", 1)
+    time.sleep(0.25)
+    assert cache.get("short") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["invalidations"] == 1 and stats["hits"] == 2
+    print("✅ Memory cache honours LRU, TTL, size bounds and tags.")
+
+
+def test_sqlite_cache_is_shared():
+    print("Starting SQLite cache test...")
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    # Two instances on one file stand in for two uvicorn workers
+    worker_a = SQLiteCache(path, max_entries=2, max_bytes=10000, ttl=60)
+    worker_b = SQLiteCache(path, max_entries=2, max_bytes=10000, ttl=60)
+
+    worker_a.set("page", {"items": [1, 2]}, tags=["request:1", "head"])
+    assert worker_b.get("page") == {"items": [1, 2]}
+    worker_b.invalidate_tags(["request:1"])
+    assert worker_a.get("page") is None
+
+    # A value loaded before another worker's invalidation is not stored
+    generation = worker_a.generation()
+    worker_b.invalidate_tags(["request:2"])
+    worker_a.set("page", {"items": [2]}, tags=["request:2"], generation=generation)
+    assert worker_b.get("page") is None
+    worker_a.set("page", {"items": [2]}, tags=["request:2"], generation=worker_a.generation())
+    assert worker_b.get("page") == {"items": [2]}
+    worker_b.clear()
+
+    worker_a.set("x", 1)
+    worker_a.set("y", 2)
+    worker_a.set("z", 3)
+    assert worker_b.stats()["entries"] == 2
+    print("✅ SQLite cache shares entries, invalidations and its generation across workers.")
+
+
+def test_feed_cache_invalidation():
+    print("Starting feed cache invalidation test...")
+    feed_cache.clear()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteer = UserModel(username="vol", email="vol@test.com", role="volunteer")
+    db.add_all([owner, volunteer])
+    db.commit()
+    first = Request(title="Flood", description="Help", location="Kochi", urgency_level="low", user_id=owner.id)
+    db.add(first)
+    db.commit()
+
+    params = RequestFeedParams(limit=10)
+    high = RequestFeedParams(limit=10, urgency_level="high")
+    items, _ = load_feed_page(db, params)
+    assert [item["id"] for item in items] == [first.id]
+    assert load_feed_page(db, high)[0] == []
+
+    # Scenario 1: overlays are per viewer and never written back to the cache
+    db.add(VolunteerApplication(volunteer_id=volunteer.id, request_id=first.id))
+    db.commit()
+    volunteer_view = UserOut(id=volunteer.id, username="vol", email="vol@test.com", role="volunteer")
+    owner_view = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+    assert overlay_viewer_fields(db, load_feed_page(db, params)[0], volunteer_view)[0]["has_applied"] is True
+    assert overlay_viewer_fields(db, load_feed_page(db, params)[0], owner_view)[0]["volunteers"][0]["username"] == "vol"
+    assert "has_applied" not in load_feed_page(db, params)[0][0]
+    print("✅ Scenario 1: Applications show up without invalidating the cached page.")
+
+    # Scenario 2: a new request only drops first pages
+    second = Request(title="Fire", description="Help", location="Kochi", urgency_level="low", user_id=owner.id)
+    db.add(second)
+    db.commit()
+    assert len(load_feed_page(db, params)[0]) == 1, "page should still be served from cache"
+    invalidate_feed(created=True)
+    assert len(load_feed_page(db, params)[0]) == 2
+    print("✅ Scenario 2: Creating a request invalidates first pages.")
+
+    # Scenario 3: an update drops pages holding the request and listings filtered on its new values
+    second.urgency_level = "high"
+    second.title = "Wildfire"
+    db.commit()
+    invalidate_feed([second.id], filter_values={"urgency_level": "high"})
+    assert load_feed_page(db, params)[0][0]["title"] == "Wildfire"
+    assert [item["id"] for item in load_feed_page(db, high)[0]] == [second.id]
+    print("✅ Scenario 3: Updates invalidate affected pages only.")
+
+    # Scenario 4: pages show their owners, so changing an owner drops them
+    load_feed_page(db, params)
+    owner.username = "renamed"
+    db.commit()
+    assert {item["user"]["username"] for item in load_feed_page(db, params)[0]} == {"renamed"}
+    print("✅ Scenario 4: Changing a request owner invalidates the pages showing them.")
+
+    # Scenario 5: a reader whose query raced an invalidation does not store its outdated page
+    invalidate_feed(created=True)
+    real_query = utils.feed.query_feed_page
+
+    def query_then_concurrent_write(db, params):
+        page = real_query(db, params)
+        first.title = "Flash flood"
+        db.commit()
+        invalidate_feed([first.id])
+        return page
+
+    with patch("utils.feed.query_feed_page", query_then_concurrent_write):
+        assert "Flash flood" not in {item["title"] for item in load_feed_page(db, params)[0]}
+    assert "Flash flood" in {item["title"] for item in load_feed_page(db, params)[0]}
+    assert feed_cache.stats()["stale_sets"] == 1
+    print("✅ Scenario 5: Pages read before an invalidation are not cached after it.")
+
+    stats = feed_cache.stats()
+    assert stats["hits"] > 0 and stats["misses"] > 0
+    print("✅ All feed cache tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_memory_cache_bounds()
+        test_sqlite_cache_is_shared()
+        test_feed_cache_invalidation()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,124 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database import Base, configure_sqlite
+from models.request import Request
+from models.user import User as UserModel
+from routers.request import save_new_request
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from utils.group_commit import GroupCommitWriter, commit_write
+
+
+def make_engine():
+    path = os.path.join(tempfile.mkdtemp(), "writes.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_sqlite(engine)
+    Base.metadata.create_all(bind=engine)
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(threading.current_thread().name))
+    return engine, sessionmaker(bind=engine), commits
+
+
+def add_user(name):
+    def write(session):
+        user = UserModel(username=name, email=f"{name}@test.com", role="volunteer")
+        session.add(user)
+        session.flush()
+        return user.id
+    return write
+
+
+def test_sqlite_profile():
+    print("Starting SQLite write path test...")
+    engine, _, _ = make_engine()
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+    print("✅ Scenario 1: Every connection gets WAL, synchronous=NORMAL, a busy timeout and larger caches.")
+
+
+def test_group_commit_writer():
+    engine, session_factory, commits = make_engine()
+    writer = GroupCommitWriter(session_factory, max_batch=64, window=0.02)
+    writer.start()
+    try:
+        # Scenario 2: concurrent small writes share commits
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            ids = list(pool.map(lambda i: writer.submit(add_user(f"vol{i}")), range(50)))
+        assert sorted(ids) == list(range(1, 51))
+        assert 1 <= writer.stats()["batches"] < 50 and len(commits) == writer.stats()["batches"]
+        assert set(commits) == {"group-commit-writer"}
+        print(f"✅ Scenario 2: 50 concurrent writes were committed in {len(commits)} transaction(s).")
+
+        # Scenario 3: a failing write does not take its batch down with it
+        def attempt(name):
+            try:
+                return writer.submit(add_user(name))
+            except IntegrityError:
+                return "duplicate"
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            outcomes = list(pool.map(attempt, ["vol0"] + [f"new{i}" for i in range(9)]))
+        assert outcomes[0] == "duplicate" and all(isinstance(outcome, int) for outcome in outcomes[1:])
+        db = session_factory()
+        assert db.query(UserModel).count() == 59
+        db.close()
+        print("✅ Scenario 3: A failing write is reported to its caller alone; the rest of its batch commits.")
+
+        # Scenario 4: request handlers route their writes through the writer when it serves their database
+        feed_cache.clear()
+        db = session_factory()
+        owner = UserOut(id=1, username="vol0", email="vol0@test.com", role="user")
+        with patch("utils.group_commit._writer", writer), patch("routers.request.invalidate_feed"):
+            batches = writer.stats()["batches"]
+            created = save_new_request(db, owner, "Flood", "Help", "Kochi", "high", None)
+            assert writer.stats()["batches"] == batches + 1
+            assert db.query(Request).filter_by(id=created["id"]).one().title == "Flood"
+
+            # Sessions on another database commit inline
+            _, other_factory, other_commits = make_engine()
+            other = other_factory()
+            commit_write(other, add_user("elsewhere"))
+            assert other_commits == [threading.current_thread().name]
+            other.close()
+        db.close()
+        print("✅ Scenario 4: Handlers commit through the writer only for the database it serves.")
+    finally:
+        writer.stop(5)
+
+    # Scenario 5: stopping drains what is queued
+    writer = GroupCommitWriter(session_factory, max_batch=64, window=0.5)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(writer.submit, add_user(f"late{i}")) for i in range(5)]
+        while writer.stats()["queued"] < 5:
+            time.sleep(0.01)
+        writer.start()
+        writer.stop(5)
+        assert all(isinstance(future.result(5), int) for future in futures)
+    print("✅ Scenario 5: Writes queued before shutdown are still committed.")
+
+    print("✅ All SQLite write path tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_sqlite_profile()
+        test_group_commit_writer()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,177 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, inspect, text
+
+from migrations import MIGRATIONS
+from migrations.v005_geocode_requests import geocode_batch, select_batch
+from utils.migrate import Migration, backfill, check_schema, current_version, migrate
+
+# The users, requests and notification_logs tables as databases created
+# before the columns and indexes of later releases have them
+LEGACY_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR, email VARCHAR, password VARCHAR, role VARCHAR)",
+    """CREATE TABLE requests (id INTEGER PRIMARY KEY, title VARCHAR, description VARCHAR, location VARCHAR,
+       urgency_level VARCHAR, photo VARCHAR, timestamp DATETIME, user_id INTEGER REFERENCES users (id))""",
+    """CREATE TABLE notification_logs (id INTEGER PRIMARY KEY, user_id INTEGER, request_id INTEGER,
+       notification_type VARCHAR, status VARCHAR, sent_at DATETIME)""",
+]
+
+
+def make_engine():
+    path = os.path.join(tempfile.mkdtemp(), "migrations.db")
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def count_statements(engine, action):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return statements
+
+
+def test_new_database():
+    print("Starting migrations test...")
+    engine = make_engine()
+
+    # Scenario 1: a new database gets every table and index
+    assert current_version(engine) == 0
+    assert check_schema(engine, MIGRATIONS, auto_migrate=True) == MIGRATIONS[-1].version
+    inspector = inspect(engine)
+    assert {"users", "requests", "volunteer_applications", "requests_fts", "schema_version"} <= set(inspector.get_table_names())
+    assert "ix_requests_geohash" in [index["name"] for index in inspector.get_indexes("requests")]
+    print("✅ Scenario 1: A new database is created by the migrations.")
+
+    # Scenario 2: starting against an up-to-date database only reads its version
+    statements = count_statements(engine, lambda: check_schema(engine, MIGRATIONS, auto_migrate=True))
+    assert len(statements) <= 2, statements
+    assert not any(statement.lstrip().upper().startswith(("CREATE", "ALTER", "INSERT")) for statement in statements)
+    print(f"✅ Scenario 2: Startup on a migrated database runs {len(statements)} queries.")
+
+    # Scenario 3: without MIGRATE_ON_STARTUP a worker refuses an outdated schema, and accepts a newer one
+    try:
+        check_schema(make_engine(), MIGRATIONS, auto_migrate=False)
+        raise AssertionError("Expected a RuntimeError")
+    except RuntimeError as e:
+        assert "scripts/migrate.py" in str(e)
+    assert check_schema(engine, MIGRATIONS[:2], auto_migrate=False) == MIGRATIONS[-1].version
+    print("✅ Scenario 3: Workers refuse a schema older than their release, not a newer one.")
+    engine.dispose()
+
+
+def test_legacy_database():
+    engine = make_engine()
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, username, email, role) VALUES (1, 'owner', 'owner@test.com', 'user')"))
+        for i in range(7):
+            conn.execute(
+                text("INSERT INTO requests (title, description, location, timestamp, user_id) VALUES ('Flood', 'Help', :location, :timestamp, 1)"),
+                {"location": "Nowhere Special" if i == 3 else "Kochi", "timestamp": "2024-05-01 10:00:00.000000" if i == 2 else None}
+            )
+        for _ in range(2):
+            conn.execute(text("INSERT INTO notification_logs (user_id, request_id, notification_type) VALUES (1, 1, 'new_disaster')"))
+
+    # Scenario 4: a database created before migrations is brought up to date, keeping its rows
+    assert migrate(engine, MIGRATIONS) == [migration.version for migration in MIGRATIONS]
+    inspector = inspect(engine)
+    assert {"notification_mode", "service_scope", "is_verified"} <= {column["name"] for column in inspector.get_columns("users")}
+    assert "uq_notification_logs_user_request_type" in [index["name"] for index in inspector.get_indexes("notification_logs")]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM notification_logs")).scalar() == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM requests WHERE geohash IS NOT NULL")).scalar() == 6
+        assert conn.execute(text("SELECT COUNT(*) FROM requests_fts WHERE requests_fts MATCH 'flood'")).scalar() == 7
+        # Requests without a timestamp get the one of the request before them, or the epoch
+        timestamps = [timestamp for (timestamp,) in conn.execute(text("SELECT timestamp FROM requests ORDER BY id"))]
+        assert [timestamp[:10] for timestamp in timestamps] == ["1970-01-01"] * 2 + ["2024-05-01"] * 5
+    assert migrate(engine, MIGRATIONS) == []
+    print("✅ Scenario 4: A database from before migrations is upgraded in place.")
+
+    # Scenario 5: backfills commit in batches, so writers get in between them
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE requests SET latitude = NULL, longitude = NULL, geohash = NULL"))
+    batches = []
+
+    def write_between_batches(conn, rows):
+        batches.append(len(rows))
+        geocode_batch(conn, rows)
+
+    writer_latencies = []
+
+    def writer():
+        time.sleep(0.01)
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO requests (title, description, location, user_id) VALUES ('Fire', 'Help', 'Kochi', 1)"))
+        writer_latencies.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    seen = backfill(engine, select_batch, write_between_batches, batch_size=2, pause_ms=20)
+    thread.join()
+    # The row written meanwhile is backfilled too, in the last batch
+    assert batches == [2, 2, 2, 2] and seen == 8
+    assert writer_latencies and writer_latencies[0] < 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM requests WHERE geohash IS NOT NULL")).scalar() == 7
+    print(f"✅ Scenario 5: The backfill ran in {len(batches)} batches of up to 2 rows alongside a writer.")
+    engine.dispose()
+
+
+def test_interrupted_and_concurrent_runs():
+    engine = make_engine()
+    runs = []
+
+    def failing(engine):
+        runs.append("failing")
+        raise RuntimeError("interrupted")
+
+    def slow(engine):
+        runs.append("slow")
+        time.sleep(0.2)
+
+    # Scenario 6: an interrupted run keeps the migrations that finished and resumes at the one that failed
+    steps = [Migration(1, "first", lambda engine: runs.append("first")), Migration(2, "second", failing)]
+    try:
+        migrate(engine, steps)
+        raise AssertionError("Expected the migration to fail")
+    except RuntimeError:
+        pass
+    assert current_version(engine) == 1
+    steps[1] = Migration(2, "second", lambda engine: runs.append("second"))
+    assert migrate(engine, steps) == [2] and runs == ["first", "failing", "second"]
+    print("✅ Scenario 6: An interrupted migration run resumes where it stopped.")
+
+    # Scenario 7: workers starting together apply each migration once
+    steps.append(Migration(3, "third", slow))
+    threads = [threading.Thread(target=check_schema, args=(engine, steps, True)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert runs.count("slow") == 1 and current_version(engine) == 3
+    print("✅ Scenario 7: Concurrent startups apply each migration once.")
+    engine.dispose()
+
+    print("✅ All migrations tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_new_database()
+        test_legacy_database()
+        test_interrupted_and_concurrent_runs()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,188 @@
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.notification import NotificationLog
+from models.notification_job import NotificationJob
+from models.user import User as UserModel
+from routers.request import save_new_request, update_request
+from routers.user import update_notification_preferences
+from schemas.user import UserOut, NotificationPreferences
+from utils.cache import feed_cache
+from utils.notifications import fan_out_notifications
+from utils.outbox import enqueue_notification, enqueue_update, mergeable_job, process_available_jobs
+
+
+def make_session_factory():
+    path = os.path.join(tempfile.mkdtemp(), "digest.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def seed(session_factory):
+    db = session_factory()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteers = [UserModel(username=f"vol{i}", email=f"vol{i}@test.com", role="volunteer") for i in range(3)]
+    db.add_all([owner, *volunteers])
+    db.commit()
+    viewer = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+    volunteer_views = [UserOut(id=v.id, username=v.username, email=v.email, role="volunteer") for v in volunteers]
+    db.close()
+    return viewer, volunteer_views
+
+
+def make_due(db, **filters):
+    db.query(NotificationJob).filter_by(status="queued", **filters).update(
+        {NotificationJob.available_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+
+def test_update_coalescing():
+    print("Starting notification coalescing test...")
+    feed_cache.clear()
+    session_factory = make_session_factory()
+    viewer, _ = seed(session_factory)
+    db = session_factory()
+
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent") as mock_notify:
+        created = save_new_request(db, viewer, "Flood", "Help", "Kochi", "high", None)
+        process_available_jobs(session_factory)
+        assert mock_notify.call_count == 3
+
+        # Scenario 1: five quick edits become one delayed job
+        for i in range(5):
+            update_request(created["id"], f"Flood {i}", "Help", "Kochi", "high", category=None, db=db, current_user=viewer)
+        jobs = db.query(NotificationJob).filter_by(notification_type="update").all()
+        assert len(jobs) == 1 and jobs[0].coalesce_key == f"update:{created['id']}"
+        assert jobs[0].available_at > datetime.utcnow() + timedelta(seconds=60)
+        assert process_available_jobs(session_factory) == {"done": 0, "queued": 0, "failed": 0}
+        print("✅ Scenario 1: Edits within the coalescing window share one queued job.")
+
+        # Scenario 2: the window closes and each volunteer gets one update with the latest title
+        make_due(db)
+        mock_notify.reset_mock()
+        assert process_available_jobs(session_factory)["done"] == 1
+        assert mock_notify.call_count == 3
+        assert all(call.args[2][0]["title"] == "Flood 4" for call in mock_notify.call_args_list)
+        print("✅ Scenario 2: Volunteers receive one update reflecting all merged edits.")
+
+        # Scenario 3: a later round of edits is announced again, but rerunning a finished job is not
+        done_job = db.query(NotificationJob).filter_by(notification_type="update").one()
+        outcome = fan_out_notifications(db, [created["id"]], "update", renotify_before=done_job.created_at)
+        assert outcome["claimed"] == 0
+        update_request(created["id"], "Flood 5", "Help", "Kochi", "high", category=None, db=db, current_user=viewer)
+        make_due(db)
+        mock_notify.reset_mock()
+        assert process_available_jobs(session_factory)["done"] == 1
+        assert mock_notify.call_count == 3
+        assert db.query(NotificationLog).filter_by(notification_type="update").count() == 3
+    print("✅ Scenario 3: Each round of edits notifies once, and reruns stay idempotent.")
+    db.close()
+
+
+def test_digest_mode():
+    print("Starting notification digest test...")
+    feed_cache.clear()
+    session_factory = make_session_factory()
+    viewer, volunteers = seed(session_factory)
+    db = session_factory()
+
+    # Scenario 4: a volunteer opts into digests
+    update_notification_preferences(NotificationPreferences(notification_mode="digest"), db=db, current_user=volunteers[0])
+    assert db.query(UserModel).filter_by(id=volunteers[0].id).one().notification_mode == "digest"
+    print("✅ Scenario 4: Volunteers can switch to digest mode.")
+
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent") as mock_notify, \
+         patch("utils.notifications.notify_volunteer_digest", return_value="sent") as mock_digest:
+        # Scenario 5: low-urgency alerts are held for the digest, high urgency goes out at once
+        low = [save_new_request(db, viewer, title, "Help", "Kochi", "low", None)["id"] for title in ("Water", "Food")]
+        high = save_new_request(db, viewer, "Fire", "Help", "Kochi", "high", None)["id"]
+        process_available_jobs(session_factory)
+        recipients = [call.args[0] for call in mock_notify.call_args_list]
+        assert recipients.count(volunteers[0].email) == 1 and len(recipients) == 7
+        assert mock_digest.call_count == 0
+        held = db.query(NotificationLog).filter_by(user_id=volunteers[0].id, status="digest").all()
+        assert sorted(row.request_id for row in held) == low
+        assert db.query(NotificationLog).filter_by(user_id=volunteers[0].id, request_id=high).one().status == "sent"
+        digest_jobs = db.query(NotificationJob).filter_by(notification_type="digest", status="queued").all()
+        assert len(digest_jobs) == 1 and digest_jobs[0].available_at > datetime.utcnow() + timedelta(minutes=30)
+        print("✅ Scenario 5: Low-urgency alerts wait for the digest; high urgency is sent immediately.")
+
+        # Scenario 6: the digest job sends one summary with everything held
+        make_due(db, notification_type="digest")
+        assert process_available_jobs(session_factory)["done"] == 1
+        assert mock_digest.call_count == 1
+        email, _, alerts = mock_digest.call_args.args
+        assert email == volunteers[0].email
+        assert sorted(data["title"] for _, data in alerts) == ["Food", "Water"]
+        db.expire_all()
+        assert db.query(NotificationLog).filter_by(status="digest").count() == 0
+    print("✅ Scenario 6: The periodic digest delivers all held alerts in one mail.")
+
+    # Scenario 7: a fan-out whose deliveries partly fail still leaves the digest queued
+    db.query(NotificationJob).filter_by(notification_type="digest").delete()
+    db.commit()
+    failing = {volunteers[1].email}
+    with patch("utils.notifications.notify_volunteer_batch", side_effect=lambda email, *args: "failed" if email in failing else "sent"):
+        save_new_request(db, viewer, "Shelter", "Help", "Kochi", "low", None)
+        assert process_available_jobs(session_factory)["queued"] == 1
+    db.expire_all()
+    assert db.query(NotificationJob).filter_by(notification_type="digest", status="queued").count() == 1
+    assert db.query(NotificationLog).filter_by(user_id=volunteers[0].id, status="digest").count() == 1
+    print("✅ Scenario 7: Held alerts keep their digest job when the fan-out is retried.")
+
+    db.close()
+
+
+def test_concurrent_coalescing():
+    session_factory = make_session_factory()
+    first, second = session_factory(), session_factory()
+
+    # Scenario 8: two transactions that both found no job to merge into still end up with one
+    enqueue_update(first, 1)
+    first.commit()
+    lookups = []
+
+    def stale_then_current(db, coalesce_key):
+        # The first lookup ran before the other transaction committed its job
+        lookups.append(coalesce_key)
+        return None if len(lookups) == 1 else mergeable_job(db, coalesce_key)
+
+    with patch("utils.outbox.mergeable_job", side_effect=stale_then_current):
+        job = enqueue_notification(second, [2], "update", coalesce_key="update:1", delay=60)
+    second.commit()
+    jobs = second.query(NotificationJob).filter_by(coalesce_key="update:1").all()
+    assert len(jobs) == 1 and job.id == jobs[0].id and jobs[0].request_ids == [1, 2] and len(lookups) == 2
+    try:
+        second.add(NotificationJob(notification_type="update", request_ids=[1], coalesce_key="update:1"))
+        second.commit()
+        raise AssertionError("Expected a duplicate mergeable job to be rejected")
+    except IntegrityError:
+        second.rollback()
+    first.close()
+    second.close()
+    print("✅ Scenario 8: Concurrent edits cannot queue two update jobs for one request.")
+
+    print("✅ All notification coalescing and digest tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_update_coalescing()
+        test_digest_mode()
+        test_concurrent_coalescing()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,176 @@
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.notification import NotificationLog
+from models.notification_job import NotificationJob
+from models.user import User as UserModel
+from routers.request import save_new_request
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from utils.outbox import claim_jobs, process_available_jobs, outbox_stats, retry_delay, run_job, start_workers, stop_workers
+
+
+def make_session_factory():
+    # A file database, so worker threads get connections of their own
+    path = os.path.join(tempfile.mkdtemp(), "outbox.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def seed(session_factory):
+    db = session_factory()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteers = [UserModel(username=f"vol{i}", email=f"vol{i}@test.com", role="volunteer") for i in range(3)]
+    db.add_all([owner, *volunteers])
+    db.commit()
+    viewer = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+    db.close()
+    return viewer
+
+
+def create(session_factory, viewer, title):
+    db = session_factory()
+    try:
+        return save_new_request(db, viewer, title, "Help", "Kochi", "high", None)
+    finally:
+        db.close()
+
+
+def test_outbox_jobs():
+    print("Starting notification outbox test...")
+    feed_cache.clear()
+    session_factory = make_session_factory()
+    viewer = seed(session_factory)
+
+    # Scenario 1: creating a request queues a job in the same transaction, nothing is sent inline
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent") as mock_notify:
+        created = create(session_factory, viewer, "Flood")
+        assert mock_notify.call_count == 0
+    db = session_factory()
+    job = db.query(NotificationJob).one()
+    assert job.status == "queued" and job.request_ids == [created["id"]]
+    print("✅ Scenario 1: Requests enqueue a durable notification job.")
+
+    # Scenario 2: a worker round claims the job with its own session and runs the fan-out
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent") as mock_notify:
+        assert process_available_jobs(session_factory) == {"done": 1, "queued": 0, "failed": 0}
+        assert mock_notify.call_count == 3
+    db.expire_all()
+    assert db.query(NotificationJob).one().status == "done"
+    assert db.query(NotificationLog).filter_by(status="sent").count() == 3
+    print("✅ Scenario 2: Workers deliver queued jobs.")
+
+    # Scenario 3: failures are retried with exponential backoff, then given up
+    create(session_factory, viewer, "Fire")
+    with patch("utils.outbox.fan_out_notifications", side_effect=RuntimeError("smtp down")), \
+         patch("utils.outbox.settings.NOTIFY_MAX_ATTEMPTS", 2):
+        assert process_available_jobs(session_factory)["queued"] == 1
+        db.expire_all()
+        job = db.query(NotificationJob).filter_by(status="queued").one()
+        assert job.attempts == 1 and "smtp down" in job.last_error and job.available_at > datetime.utcnow()
+        # Not due yet
+        assert process_available_jobs(session_factory) == {"done": 0, "queued": 0, "failed": 0}
+
+        job.available_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        assert process_available_jobs(session_factory)["failed"] == 1
+    assert 2.5 <= retry_delay(1) <= 5 and 10 <= retry_delay(3) <= 20
+    print("✅ Scenario 3: Failed jobs back off exponentially and stop after the last attempt.")
+
+    # Scenario 4: a job is claimed once, and again only after its worker's lease expired
+    create(session_factory, viewer, "Landslide")
+    _, first = claim_jobs(session_factory(), 10)
+    assert len(first) == 1 and claim_jobs(session_factory(), 10) == (None, [])
+    db.expire_all()
+    db.query(NotificationJob).filter(NotificationJob.id == first[0]).update(
+        {NotificationJob.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    assert claim_jobs(session_factory(), 10)[1] == first
+    print("✅ Scenario 4: Claims are exclusive and crashed jobs are reclaimed.")
+
+    stats = outbox_stats(db)
+    assert stats["done"] == 1 and stats["failed"] == 1 and stats["running"] == 1
+    assert stats["latency_seconds"]["samples"] == 1
+    print("✅ Scenario 5: Queue depth and latency are reported.")
+
+    # Scenario 6: long fan-outs keep their lease, and a worker that lost it records nothing
+    create(session_factory, viewer, "Cyclone")
+    token, (job_id,) = claim_jobs(session_factory(), 10)
+    leases = []
+
+    def send(*args):
+        check = session_factory()
+        leases.append(check.get(NotificationJob, job_id).lease_expires_at)
+        check.close()
+        return "sent"
+
+    with patch("utils.notifications.notify_volunteer_batch", side_effect=send), \
+         patch("utils.notifications.settings.NOTIFY_BATCH_SIZE", 1):
+        worker_db = session_factory()
+        assert run_job(worker_db, job_id, token) == "done"
+        worker_db.close()
+    assert len(leases) == 3 and leases[0] < leases[1] < leases[2]
+
+    create(session_factory, viewer, "Tsunami")
+    token, (job_id,) = claim_jobs(session_factory(), 10)
+    db.expire_all()
+    db.query(NotificationJob).filter(NotificationJob.id == job_id).update({NotificationJob.claimed_by: "other-worker"})
+    db.commit()
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent"):
+        worker_db = session_factory()
+        assert run_job(worker_db, job_id, token) is None
+        worker_db.close()
+    db.expire_all()
+    job = db.get(NotificationJob, job_id)
+    assert job.status == "running" and job.claimed_by == "other-worker"
+    print("✅ Scenario 6: Leases are renewed after every batch; a reclaimed job keeps the new worker's state.")
+    db.close()
+
+
+def test_worker_pool():
+    print("Starting notification worker pool test...")
+    feed_cache.clear()
+    session_factory = make_session_factory()
+    viewer = seed(session_factory)
+
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent") as mock_notify, \
+         patch("utils.outbox.settings.NOTIFY_POLL_SECONDS", 30):
+        start_workers(session_factory, workers=2)
+        try:
+            for i in range(5):
+                create(session_factory, viewer, f"Request {i}")
+            # Committing wakes the pool long before its 30s poll interval
+            deadline = time.time() + 10
+            db = session_factory()
+            while db.query(NotificationJob).filter(NotificationJob.status != "done").count() and time.time() < deadline:
+                time.sleep(0.05)
+            assert db.query(NotificationJob).filter_by(status="done").count() == 5
+            assert mock_notify.call_count == 15
+            db.close()
+        finally:
+            stop_workers(timeout=10)
+    print("✅ Scenario 7: The in-process pool drains the outbox as soon as jobs are committed.")
+
+    print("✅ All notification outbox tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_outbox_jobs()
+        test_worker_pool()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
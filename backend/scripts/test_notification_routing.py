@@ -0,0 +1,121 @@
+import sys
+import os
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.notification import NotificationLog
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_routing import VolunteerAreaCell
+from routers.user import get_service_areas, update_service_areas
+from schemas.user import UserOut, ServiceArea, ServicePreferences
+from utils.geo import location_fields
+from utils.notifications import fan_out_notifications
+
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def as_viewer(user):
+    return UserOut(id=user.id, username=user.username, email=user.email, role=user.role)
+
+
+def add_request(db, title, location, category=None):
+    request = Request(
+        title=title, description="Help", location=location, urgency_level="high",
+        category=category, user_id=1, **location_fields(location)
+    )
+    db.add(request)
+    db.commit()
+    return request.id
+
+
+def notified(db, request_id):
+    with patch("utils.notifications.notify_volunteer_batch", return_value="sent"):
+        fan_out_notifications(db, [request_id], "new_disaster")
+    return sorted(
+        username for (username,) in db.query(UserModel.username).join(
+            NotificationLog, NotificationLog.user_id == UserModel.id
+        ).filter(NotificationLog.request_id == request_id)
+    )
+
+
+def test_service_areas():
+    print("Starting volunteer service area test...")
+    db = make_session()
+    db.add(UserModel(username="owner", email="owner@test.com", role="user"))
+    volunteers = {
+        name: UserModel(username=name, email=f"{name}@test.com", role="volunteer")
+        for name in ("kochi", "delhi", "anywhere", "kochi_medic", "food_only")
+    }
+    db.add_all(volunteers.values())
+    db.commit()
+
+    # Scenario 1: volunteers register areas by place name or coordinates, and categories
+    for name, preferences in (
+        ("kochi", ServicePreferences(areas=[ServiceArea(location="Kochi", radius_km=25)])),
+        ("delhi", ServicePreferences(areas=[ServiceArea(latitude=28.6139, longitude=77.2090, radius_km=30)])),
+        ("kochi_medic", ServicePreferences(areas=[ServiceArea(location="Kochi")], categories=["medical"])),
+        ("food_only", ServicePreferences(categories=["food"])),
+    ):
+        update_service_areas(preferences, db=db, current_user=as_viewer(volunteers[name]))
+
+    saved = get_service_areas(db=db, current_user=as_viewer(volunteers["kochi_medic"]))
+    assert saved.categories == ["medical"] and saved.areas[0].location == "Kochi" and saved.areas[0].latitude
+    assert volunteers["kochi"].service_scope == "areas" and volunteers["food_only"].service_scope == "everywhere"
+    assert 1 <= db.query(VolunteerAreaCell).filter_by(user_id=volunteers["kochi"].id).count() <= 16
+    print("✅ Scenario 1: Service areas are stored with the geohash cells that cover them.")
+
+    # Scenario 2: bad areas are rejected
+    for preferences in (
+        ServicePreferences(areas=[ServiceArea(location="Atlantis")]),
+        ServicePreferences(areas=[ServiceArea(location="Kochi", radius_km=5000)]),
+        ServicePreferences(areas=[ServiceArea(radius_km=10)]),
+    ):
+        try:
+            update_service_areas(preferences, db=db, current_user=as_viewer(volunteers["kochi"]))
+            assert False, "invalid service area accepted"
+        except HTTPException as e:
+            assert e.status_code == 400
+    assert get_service_areas(db=db, current_user=as_viewer(volunteers["kochi"])).areas[0].location == "Kochi"
+    print("✅ Scenario 2: Unknown places and oversized areas are rejected without losing the old ones.")
+
+    # Scenario 3: alerts reach the volunteers whose areas and categories match
+    assert notified(db, add_request(db, "Injured", "Ernakulam, Kochi", "medical")) == ["anywhere", "kochi", "kochi_medic"]
+    assert notified(db, add_request(db, "Hungry", "Connaught Place, Delhi", "food")) == ["anywhere", "delhi", "food_only"]
+    assert notified(db, add_request(db, "Stranded", "Kochi")) == ["anywhere", "food_only", "kochi", "kochi_medic"]
+    print("✅ Scenario 3: Requests are routed by service area and category.")
+
+    # Scenario 4: requests that cannot be placed still reach every volunteer of the category
+    assert notified(db, add_request(db, "Lost", "Somewhere unknown")) == ["anywhere", "delhi", "food_only", "kochi", "kochi_medic"]
+    print("✅ Scenario 4: Requests without coordinates fall back to all volunteers.")
+
+    # Scenario 5: clearing the areas makes a volunteer hear about everywhere again
+    update_service_areas(ServicePreferences(), db=db, current_user=as_viewer(volunteers["delhi"]))
+    assert db.query(VolunteerAreaCell).filter_by(user_id=volunteers["delhi"].id).count() == 0
+    assert "delhi" in notified(db, add_request(db, "Flood", "Kochi"))
+    print("✅ Scenario 5: Volunteers without service areas get alerts from everywhere.")
+
+    print("✅ All notification routing tests passed!")
+    db.close()
+
+
+if __name__ == "__main__":
+    try:
+        test_service_areas()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
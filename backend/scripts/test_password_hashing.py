@@ -0,0 +1,119 @@
+import sys
+import os
+import asyncio
+import time
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from passlib.context import CryptContext
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import settings
+from database import Base
+from models.auth.hashing import Hash, HashingBusy, HashingPool
+from models.user import User as UserModel
+from routers.user import login, create_user
+from schemas.user import UserCreate
+
+TEST_ROUNDS = 5
+
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def status_of(call) -> int:
+    try:
+        asyncio.run(call)
+        return 200
+    except HTTPException as e:
+        return e.status_code
+
+
+def test_bounded_hashing_pool():
+    print("Starting password hashing test...")
+    pool = HashingPool(workers=1, max_pending=1)
+
+    async def scenario():
+        # One running, one queued, the third is turned away without waiting
+        slow = [asyncio.create_task(pool.run(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        try:
+            await pool.run(time.sleep, 0.2)
+            assert False, "saturated pool accepted work"
+        except HashingBusy:
+            rejected_in = time.perf_counter() - start
+        await asyncio.gather(*slow)
+        return rejected_in
+
+    assert asyncio.run(scenario()) < 0.05
+    assert pool.stats()["rejected"] == 1 and pool.stats()["completed"] == 2
+    assert pool.stats()["in_flight"] == 0
+    print("✅ Scenario 1: The hashing pool queues a bounded number of calls and rejects the rest at once.")
+
+
+def test_login_and_signup():
+    db = make_session()
+    fast_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=TEST_ROUNDS)
+    pool = HashingPool(workers=2, max_pending=2)
+    with patch.object(settings, "BCRYPT_ROUNDS", TEST_ROUNDS), \
+         patch("models.auth.hashing.pwd_context", fast_context), \
+         patch("routers.user.hashing_pool", pool):
+        # Scenario 2: signup hashes at the configured cost
+        asyncio.run(create_user(UserCreate(username="vol", email="vol@test.com", password="pw", role="volunteer"), db=db))
+        user = db.query(UserModel).filter_by(email="vol@test.com").one()
+        assert Hash.cost(user.password) == TEST_ROUNDS and Hash.verify(user.password, "pw")
+        print("✅ Scenario 2: Signup hashes passwords off the request threads at the configured cost.")
+
+        # Scenario 3: a hash with another cost is replaced on the next successful login
+        user.password = bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode()
+        db.commit()
+        result = asyncio.run(login(OAuth2PasswordRequestForm(username="vol@test.com", password="pw"), db=db))
+        assert result["token_type"] == "bearer"
+        db.expire_all()
+        rehashed = db.query(UserModel).filter_by(email="vol@test.com").one().password
+        assert Hash.cost(rehashed) == TEST_ROUNDS and Hash.verify(rehashed, "pw")
+        asyncio.run(login(OAuth2PasswordRequestForm(username="vol@test.com", password="pw"), db=db))
+        db.expire_all()
+        assert db.query(UserModel).filter_by(email="vol@test.com").one().password == rehashed
+        print("✅ Scenario 3: Logins rehash passwords stored with a different cost.")
+
+        # Scenario 4: a wrong password is a 401, an unknown user a 404
+        assert status_of(login(OAuth2PasswordRequestForm(username="vol@test.com", password="bad"), db=db)) == 401
+        assert status_of(login(OAuth2PasswordRequestForm(username="nobody@test.com", password="pw"), db=db)) == 404
+        print("✅ Scenario 4: Failed logins keep their status codes.")
+
+    # Scenario 5: when the pool is saturated login and signup answer 503 with Retry-After
+    with patch("routers.user.hashing_pool.run", side_effect=HashingBusy()):
+        try:
+            asyncio.run(login(OAuth2PasswordRequestForm(username="vol@test.com", password="pw"), db=db))
+            assert False, "login went through a saturated pool"
+        except HTTPException as e:
+            assert e.status_code == 503 and e.headers["Retry-After"] == str(settings.HASH_RETRY_AFTER_SECONDS)
+        assert status_of(create_user(UserCreate(username="new", email="new@test.com", password="pw"), db=db)) == 503
+    assert db.query(UserModel).filter_by(email="new@test.com").count() == 0
+    print("✅ Scenario 5: A saturated pool answers 503 instead of tying up worker threads.")
+
+    print("✅ All password hashing tests passed!")
+    db.close()
+
+
+if __name__ == "__main__":
+    try:
+        test_bounded_hashing_pool()
+        test_login_and_signup()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,92 @@
+import sys
+import os
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from utils.cache import feed_cache
+from utils.derivatives import render_variants, schedule_derivatives, shutdown_derivatives
+from utils.feed import apply_photo_size
+
+
+def test_photo_derivatives():
+    print("Starting photo derivative test...")
+    feed_cache.clear()
+    upload_dir = tempfile.mkdtemp()
+
+    # A noisy phone-sized photo compresses about as badly as a real one
+    photo = Image.frombytes("RGB", (3000, 2000), os.urandom(3000 * 2000 * 3))
+    photo.save(os.path.join(upload_dir, "abc.jpg"), "JPEG", quality=90)
+    original_size = os.path.getsize(os.path.join(upload_dir, "abc.jpg"))
+
+    # Scenario 1: variants are downscaled WebPs
+    variants = render_variants("abc.jpg", upload_dir)
+    assert variants == {"thumb": "abc_thumb.webp", "medium": "abc_medium.webp"}
+    with Image.open(os.path.join(upload_dir, variants["thumb"])) as thumb:
+        assert thumb.format == "WEBP" and max(thumb.size) == 320
+    thumb_size = os.path.getsize(os.path.join(upload_dir, variants["thumb"]))
+    assert thumb_size * 10 < original_size, f"thumb is {thumb_size} bytes for a {original_size} byte original"
+    # Concurrent renders of one photo write separate temp files and leave no partial files behind
+    for filename in variants.values():
+        os.remove(os.path.join(upload_dir, filename))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: render_variants("abc.jpg", upload_dir), range(4)))
+    assert results == [variants] * 4
+    assert sorted(os.listdir(upload_dir)) == ["abc.jpg", "abc_medium.webp", "abc_thumb.webp"]
+    with Image.open(os.path.join(upload_dir, variants["medium"])) as medium:
+        medium.verify()
+    print(f"✅ Scenario 1: Thumbnail is {original_size // thumb_size}x smaller than the original; concurrent renders do not collide.")
+
+    # Scenario 2: the process pool renders and records variants on the row
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionTest = sessionmaker(bind=engine)
+    db = SessionTest()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    db.add(owner)
+    db.commit()
+    help_request = Request(title="Flood", description="Help", location="Kochi", photo="abc.jpg", user_id=owner.id)
+    db.add(help_request)
+    db.commit()
+
+    with patch("database.SessionLocal", SessionTest):
+        future = schedule_derivatives(help_request.id, "abc.jpg", upload_dir)
+        future.result(timeout=60)
+        # The done callback runs right after the result is set
+        for _ in range(100):
+            db.expire_all()
+            if db.query(Request).get(help_request.id).photo_variants:
+                break
+            import time; time.sleep(0.05)
+    shutdown_derivatives()
+    assert db.query(Request).get(help_request.id).photo_variants["thumb"] == "abc_thumb.webp"
+    print("✅ Scenario 2: Variants are recorded on the request.")
+
+    # Scenario 3: ?size=thumb swaps the photo, falling back to the original
+    items = [{"photo": "abc.jpg", "photo_variants": variants}, {"photo": "new.jpg", "photo_variants": None}]
+    assert [item["photo"] for item in apply_photo_size(items, "thumb")] == ["abc_thumb.webp", "new.jpg"]
+    print("✅ Scenario 3: Clients can ask for the thumbnail.")
+
+    print("✅ All photo derivative tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_photo_derivatives()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,113 @@
+import sys
+import os
+import io
+import asyncio
+import tempfile
+import hashlib
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.datastructures import UploadFile
+
+from database import Base
+from models.photo_blob import PhotoBlob
+from utils.static import ContentAddressedStaticFiles
+from utils.uploads import receive_upload, finalize_upload, retain_photo, release_photo, collect_photo
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+
+
+def fetch(app, path, headers=None):
+    """
+    Minimal ASGI GET returning (status, headers, body).
+    """
+    messages = []
+    scope = {
+        "type": "http", "method": "GET", "path": path, "root_path": "", "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+
+    received = []
+
+    async def receive():
+        if received:
+            # Client stays connected until the response is complete
+            await asyncio.Event().wait()
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def attach(db, upload_dir, data):
+    pending = asyncio.run(receive_upload(UploadFile(io.BytesIO(data), filename="photo.jpg"), upload_dir))
+    retain_photo(db, pending)
+    db.commit()
+    finalize_upload(pending, upload_dir)
+    return pending.filename
+
+
+def test_content_addressed_storage():
+    print("Starting content-addressed photo storage test...")
+    upload_dir = tempfile.mkdtemp()
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    # Scenario 1: the same photo attached twice is stored once with two references
+    first = attach(db, upload_dir, JPEG)
+    second = attach(db, upload_dir, JPEG)
+    digest = hashlib.sha256(JPEG).hexdigest()
+    assert first == second == f"{digest[:2]}/{digest}.jpg"
+    assert db.query(PhotoBlob).one().refcount == 2
+    assert [name for _, _, names in os.walk(upload_dir) for name in names] == [f"{digest}.jpg"]
+    print("✅ Scenario 1: Duplicate uploads are stored once.")
+
+    # Scenario 2: files are only collected once the last reference is gone
+    release_photo(db, first)
+    db.commit()
+    assert not collect_photo(db, first, upload_dir)
+    assert os.path.exists(os.path.join(upload_dir, first))
+    release_photo(db, second)
+    db.commit()
+    assert collect_photo(db, second, upload_dir)
+    assert not os.path.exists(os.path.join(upload_dir, first)) and db.query(PhotoBlob).count() == 0
+    print("✅ Scenario 2: Deleting the last reference garbage-collects the file.")
+
+    # Scenario 3: content-addressed files are immutable, cacheable and support Range
+    name = attach(db, upload_dir, JPEG)
+    with open(os.path.join(upload_dir, "1_legacy.jpg"), "wb") as f:
+        f.write(JPEG)
+    app = ContentAddressedStaticFiles(directory=upload_dir)
+
+    status, headers, body = fetch(app, f"/{name}")
+    assert status == 200 and body == JPEG
+    assert "immutable" in headers["cache-control"]
+    assert headers["etag"] == f'"{digest}"'
+    assert fetch(app, f"/{name}", {"If-None-Match": f'"{digest}"'})[0] == 304
+    status, _, body = fetch(app, f"/{name}", {"Range": "bytes=0-3"})
+    assert status == 206 and body == JPEG[:4]
+    assert "cache-control" not in fetch(app, "/1_legacy.jpg")[1]
+    print("✅ Scenario 3: Photos are served with immutable caching, strong ETags and Range.")
+
+    print("✅ All photo storage tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_content_addressed_storage()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,88 @@
+import sys
+import os
+import io
+import asyncio
+import tempfile
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.responses import Response
+
+from utils.uploads import MULTIPART_OVERHEAD, reject_oversized_uploads, store_upload, sniff_image_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1000
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 1000
+
+
+def upload(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+def rejected(coro) -> int:
+    try:
+        asyncio.run(coro)
+    except HTTPException as e:
+        return e.status_code
+    raise AssertionError("upload was accepted")
+
+
+def test_upload_pipeline():
+    print("Starting photo upload pipeline test...")
+    upload_dir = tempfile.mkdtemp()
+
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == ".webp"
+    assert sniff_image_type(b"GIF89a......") == ".gif"
+    assert sniff_image_type(b"<html><body>") is None
+
+    # Scenario 1: files are named after their content, so a different photo with
+    # the same client file name no longer overwrites the first one
+    first = asyncio.run(store_upload(upload(PNG, "photo.png"), upload_dir))
+    second = asyncio.run(store_upload(upload(PNG + b"\x01", "photo.png"), upload_dir))
+    assert first != second and first.endswith(".png")
+    assert asyncio.run(store_upload(upload(PNG, "copy.png"), upload_dir)) == first
+    with open(os.path.join(upload_dir, first), "rb") as f:
+        assert f.read() == PNG
+    print("✅ Scenario 1: Uploads are stored under unique names.")
+
+    # Scenario 2: the sniffed type wins over a misleading extension, non-images are refused
+    assert asyncio.run(store_upload(upload(JPEG, "photo.png"), upload_dir)).endswith(".jpg")
+    assert rejected(store_upload(upload(b"#!/bin/sh\nrm -rf /\n", "photo.jpg"), upload_dir)) == 415
+    assert rejected(store_upload(upload(PNG, "photo.exe"), upload_dir)) == 415
+    print("✅ Scenario 2: Content is checked by magic bytes.")
+
+    # Scenario 3: oversized uploads abort and leave no partial file behind
+    with patch("utils.uploads.settings.MAX_UPLOAD_SIZE", 600 * 1024), patch("utils.uploads.CHUNK_SIZE", 64 * 1024):
+        assert rejected(store_upload(upload(JPEG + b"\x00" * 1024 * 1024, "big.jpg"), upload_dir)) == 413
+    stored = [name for _, _, names in os.walk(upload_dir) for name in names]
+    assert len(stored) == 3 and not any(name.endswith(".part") for name in stored)
+    print("✅ Scenario 3: Size limit is enforced while streaming.")
+
+    # Scenario 4: upload routes refuse bodies that are declared too large, or not declared at all
+    def post(path, headers):
+        request = Request({"type": "http", "method": "POST", "path": path, "headers": [(k.encode(), v.encode()) for k, v in headers.items()]})
+
+        async def route(request):
+            return Response(status_code=201)
+        return asyncio.run(reject_oversized_uploads(request, route)).status_code
+
+    with patch("utils.uploads.settings.MAX_UPLOAD_SIZE", 1000):
+        assert post("/request/request-help", {"content-length": "1000"}) == 201
+        assert post("/request/request-help", {"content-length": str(1000 + MULTIPART_OVERHEAD + 1)}) == 413
+        assert post("/request/request-help", {"transfer-encoding": "chunked"}) == 411
+        assert post("/request/bulk", {"transfer-encoding": "chunked"}) == 201
+    print("✅ Scenario 4: Oversized and chunked photo uploads are refused before the body is read.")
+
+    print("✅ All photo upload tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_upload_pipeline()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
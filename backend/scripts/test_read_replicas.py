@@ -0,0 +1,181 @@
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request as HTTPRequest
+from starlette.responses import Response
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, configure_sqlite
+from dependencies.oauth2 import get_current_user
+from models.auth.token import create_access_token
+from models.request import Request
+from models.user import User as UserModel
+from schemas.request import RequestFeedParams
+from utils.cache import MemoryCache, feed_cache
+from utils.feed import load_feed_page
+from utils.replicas import ReplicaRouter, is_recent_writer, mark_recent_writer, mark_writer_after_response, reader_id
+from utils.user_cache import user_cache
+
+
+def make_databases():
+    """
+    A primary and a replica copied from it, which then stops receiving
+    changes, so a read shows which of the two served it.
+    """
+    directory = tempfile.mkdtemp()
+    primary_path, replica_path = os.path.join(directory, "primary.db"), os.path.join(directory, "replica.db")
+    engine = create_engine(f"sqlite:///{primary_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    db.add(owner)
+    db.flush()
+    db.add(Request(title="Flood", description="Help", location="Kochi", user_id=owner.id))
+    db.commit()
+    db.close()
+    with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+    db = sessionmaker(bind=engine)()
+    db.add(Request(title="Fire", description="Help", location="Kochi", user_id=1))
+    db.commit()
+    db.close()
+    return directory, engine
+
+
+def replica_url(directory: str, name: str, driver: str = "sqlite") -> str:
+    # Read-only, so a missing replica fails to connect instead of being created empty
+    return f"{driver}:///file:{os.path.join(directory, name)}?mode=ro&uri=true"
+
+
+def replica_factory(url: str):
+    replica = create_engine(url, connect_args={"check_same_thread": False})
+    configure_sqlite(replica, read_only=True)
+    return sessionmaker(bind=replica, info={"replica": True})
+
+
+def count_requests(db) -> int:
+    count = db.query(Request).count()
+    db.close()
+    return count
+
+
+def test_routing_and_read_your_writes():
+    print("Starting read replica test...")
+    directory, engine = make_databases()
+    router = ReplicaRouter(sessionmaker(bind=engine), [replica_factory(replica_url(directory, "replica.db"))], retry_seconds=60)
+    writers = MemoryCache(max_entries=100, max_bytes=10000, ttl=0.2)
+
+    with patch("utils.replicas.recent_writers", writers):
+        # Scenario 1: reads go to the replica
+        assert count_requests(router.session()) == 1
+        assert count_requests(router.session(user_id=1)) == 1
+        assert router.stats()["replica_reads"] == 2
+        print("✅ Scenario 1: Reads are served by the replica.")
+
+        # Scenario 2: a user who just wrote reads the primary until the window passes
+        mark_recent_writer(1)
+        assert count_requests(router.session(user_id=1)) == 2
+        assert count_requests(router.session(user_id=2)) == 1
+        time.sleep(0.3)
+        assert not is_recent_writer(1)
+        assert count_requests(router.session(user_id=1)) == 1
+        assert router.stats()["read_your_writes"] == 1
+        print("✅ Scenario 2: Writers read their own writes from the primary, for a limited window.")
+
+        # Scenario 3: an authenticated write marks the writer once its response is out; reads do not
+        user_cache.clear()
+        token = create_access_token({"sub": "owner@test.com", "uid": 1, "role": "user"})
+
+        def handle(method):
+            request = HTTPRequest({"type": "http", "method": method, "headers": [], "path": "/"})
+
+            async def route(request):
+                await get_current_user(request, token)
+                # Still writing: the window must not start before the commit
+                assert not is_recent_writer(1)
+                return Response()
+            return asyncio.run(mark_writer_after_response(request, route))
+
+        with patch("dependencies.oauth2.AsyncSessionLocal", async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{directory}/primary.db"))):
+            handle("GET")
+            assert not is_recent_writer(1)
+            handle("POST")
+            assert is_recent_writer(1)
+        assert reader_id(f"Bearer {token}") == 1 and reader_id("Bearer garbage") is None and reader_id(None) is None
+        print("✅ Scenario 3: Authenticated writes start the read-your-writes window of their user after the response.")
+
+    # Scenario 4: feed pages read on a replica are not cached
+    feed_cache.clear()
+    params = RequestFeedParams(limit=10)
+    replica_db = router.session()
+    items, _ = load_feed_page(replica_db, params)
+    replica_db.close()
+    assert len(items) == 1 and feed_cache.stats()["entries"] == 0
+    primary_db = router.primary()
+    items, _ = load_feed_page(primary_db, params)
+    primary_db.close()
+    assert len(items) == 2 and feed_cache.stats()["entries"] == 1
+    print("✅ Scenario 4: Only pages read on the primary are cached.")
+
+
+def test_failover():
+    directory, engine = make_databases()
+    broken = replica_factory(replica_url(directory, "missing.db"))
+    healthy = replica_factory(replica_url(directory, "replica.db"))
+    router = ReplicaRouter(sessionmaker(bind=engine), [broken, healthy], retry_seconds=60)
+
+    # Scenario 5: an unreachable replica is skipped, and stays skipped until its retry time
+    assert [count_requests(router.session()) for _ in range(4)] == [1, 1, 1, 1]
+    stats = router.stats()
+    assert stats["failovers"] == 1 and stats["healthy"] == 1 and stats["replica_reads"] == 4
+    router._down_until[0] = 0
+    count_requests(router.session())
+    assert router.stats()["failovers"] == 2
+    print("✅ Scenario 5: Reads fail over from an unreachable replica to a healthy one.")
+
+    # Scenario 6: with no replica reachable, reads fall back to the primary
+    router = ReplicaRouter(sessionmaker(bind=engine), [broken], retry_seconds=60)
+    assert count_requests(router.session()) == 2
+    assert router.stats()["primary_reads"] == 1
+    print("✅ Scenario 6: Without a reachable replica, reads go to the primary.")
+
+    # Scenario 7: async sessions are routed the same way
+    async def async_counts():
+        replicas = []
+        for name in ("missing.db", "replica.db"):
+            replica = create_async_engine(replica_url(directory, name, "sqlite+aiosqlite"))
+            replicas.append(async_sessionmaker(replica, info={"replica": True}))
+        primary = create_async_engine(f"sqlite+aiosqlite:///{directory}/primary.db")
+        async_router = ReplicaRouter(async_sessionmaker(primary), replicas, retry_seconds=60)
+        counts = []
+        for user_id in (None, 1):
+            async with await async_router.async_session(user_id) as db:
+                counts.append(await db.run_sync(lambda session: session.query(Request).count()))
+        return counts, async_router.stats()
+
+    with patch("utils.replicas.recent_writers", MemoryCache(max_entries=100, max_bytes=10000, ttl=60)):
+        mark_recent_writer(1)
+        counts, stats = asyncio.run(async_counts())
+    assert counts == [1, 2] and stats["failovers"] == 1 and stats["read_your_writes"] == 1
+    print("✅ Scenario 7: Async read sessions fail over and honour read-your-writes.")
+
+    print("✅ All read replica tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_routing_and_read_your_writes()
+        test_failover()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
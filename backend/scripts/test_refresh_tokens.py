@@ -0,0 +1,140 @@
+import sys
+import os
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database import Base
+from dependencies.oauth2 import user_from_token
+from models.auth.hashing import Hash
+from models.auth_session import RefreshToken, RevokedSession
+from models.user import User as UserModel
+from routers.user import login, refresh_tokens, logout_session
+from schemas.user import RefreshRequest
+from utils.bloom import BloomFilter
+from utils.sessions import RevocationList
+from utils.user_cache import user_cache
+
+TEST_ROUNDS = 4
+
+
+def make_session_factory():
+    path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    return sessionmaker(bind=engine), statements
+
+
+def session_id_of(access_token: str) -> str:
+    return jwt.get_unverified_claims(access_token)["sid"]
+
+
+def status_of(call, *args, **kwargs) -> int:
+    try:
+        call(*args, **kwargs)
+        return 200
+    except HTTPException as e:
+        return e.status_code
+
+
+def test_bloom_filter():
+    print("Starting refresh token test...")
+    bloom = BloomFilter(10000, 0.01)
+    members = [f"member-{i}" for i in range(10000)]
+    for member in members:
+        bloom.add(member)
+    assert all(member in bloom for member in members)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 200
+    print(f"✅ Scenario 1: The Bloom filter has no false negatives and {false_positives / 100:.2f}% false positives at capacity.")
+
+
+def test_refresh_rotation_and_logout():
+    user_cache.clear()
+    session_factory, statements = make_session_factory()
+    db = session_factory()
+    fast_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=TEST_ROUNDS)
+    revocations = RevocationList(session_factory, capacity=1000, error_rate=0.001, sync_seconds=3600)
+
+    with patch.object(settings, "BCRYPT_ROUNDS", TEST_ROUNDS), \
+         patch("models.auth.hashing.pwd_context", fast_context), \
+         patch("utils.sessions.revocation_list", revocations), \
+         patch("dependencies.oauth2.revocation_list", revocations):
+        db.add(UserModel(username="vol", email="vol@test.com", password=Hash.bcrypt("pw"), role="volunteer"))
+        db.commit()
+
+        # Scenario 2: login opens a session with an access and a refresh token
+        tokens = asyncio.run(login(OAuth2PasswordRequestForm(username="vol@test.com", password="pw"), db=db))
+        assert user_from_token(tokens["access_token"], db).email == "vol@test.com"
+        assert status_of(user_from_token, tokens["refresh_token"], db) == 401
+        print("✅ Scenario 2: Login returns an access token and a refresh token that cannot be used as one.")
+
+        # Scenario 3: a refresh token is exchanged once for the next pair
+        rotated = refresh_tokens(RefreshRequest(refresh_token=tokens["refresh_token"]), db=db)
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+        assert user_from_token(rotated["access_token"], db).role == "volunteer"
+        assert db.query(RefreshToken).count() == 2
+        print("✅ Scenario 3: Refreshing rotates the refresh token without the password.")
+
+        # Scenario 4: replaying a used refresh token revokes the whole session
+        assert status_of(refresh_tokens, RefreshRequest(refresh_token=tokens["refresh_token"]), db=db) == 401
+        assert status_of(refresh_tokens, RefreshRequest(refresh_token=rotated["refresh_token"]), db=db) == 401
+        assert status_of(user_from_token, rotated["access_token"], db) == 401
+        print("✅ Scenario 4: Reusing a rotated refresh token ends the session for every holder.")
+
+        # Scenario 5: checking live sessions costs no query
+        session = asyncio.run(login(OAuth2PasswordRequestForm(username="vol@test.com", password="pw"), db=db))
+        user_from_token(session["access_token"], db)
+        statements.clear()
+        for _ in range(1000):
+            user_from_token(session["access_token"], db)
+        assert statements == []
+        print("✅ Scenario 5: Authenticating with a live session reads neither the users nor the revocations.")
+
+        # Scenario 6: logout takes effect here at once and in other workers at their next sync
+        other_worker = RevocationList(session_factory, capacity=1000, error_rate=0.001, sync_seconds=0)
+        assert not other_worker.is_revoked(session_id_of(session["access_token"]))
+        assert logout_session(RefreshRequest(refresh_token=session["refresh_token"]), db=db) == {"message": "Logged out"}
+        assert status_of(user_from_token, session["access_token"], db) == 401
+        assert other_worker.is_revoked(session_id_of(session["access_token"]))
+        assert db.query(RevokedSession).count() == 2
+        print("✅ Scenario 6: Logged-out sessions are rejected by every worker.")
+
+        # Scenario 7: a revocation that commits after one with a higher id is still loaded
+        now = datetime.utcnow()
+        expires = now + timedelta(minutes=5)
+        db.add(RevokedSession(id=100, session_id="committed-first", revoked_at=now, expires_at=expires))
+        db.commit()
+        assert other_worker.is_revoked("committed-first")
+        items = other_worker.stats()["items"]
+        db.add(RevokedSession(id=50, session_id="committed-late", revoked_at=now - timedelta(seconds=10), expires_at=expires))
+        db.commit()
+        assert other_worker.is_revoked("committed-late")
+        assert other_worker.stats()["items"] == items + 1, "rows reread in the overlap are not added twice"
+        print("✅ Scenario 7: Syncs reread recent revocations, so out-of-order commits are not missed.")
+
+    print("✅ All refresh token tests passed!")
+    db.close()
+
+
+if __name__ == "__main__":
+    try:
+        test_bloom_filter()
+        test_refresh_rotation_and_logout()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from routers.request import list_requests
+from schemas.request import RequestFeedParams
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from utils.versioning import bump_version, get_version
+
+
+def test_conditional_get():
+    print("Starting conditional GET test...")
+    feed_cache.clear()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    db.add(owner)
+    db.commit()
+    db.add(Request(title="Flood", description="Help", location="Kochi", user_id=owner.id))
+    bump_version(db)
+    db.commit()
+    assert get_version(db) == 1
+    viewer = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+
+    def poll(if_none_match, limit=10):
+        response = Response()
+        result = list_requests(
+            response=response, params=RequestFeedParams(limit=limit), size=None, stream=False, accept=None,
+            if_none_match=if_none_match, db=db, current_user=viewer
+        )
+        return response, result
+
+    # Scenario 1: the first poll returns the list and an ETag
+    response, result = poll(None)
+    etag = response.headers["ETag"]
+    assert len(result) == 1
+    print("✅ Scenario 1: Listing carries an ETag.")
+
+    # Scenario 2: a matching If-None-Match is answered without touching the request tables
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    _, result = poll(etag)
+    event.remove(engine, "before_cursor_execute", listener)
+    assert isinstance(result, Response) and result.status_code == 304
+    assert not any("requests" in statement or "volunteer_applications" in statement for statement in statements)
+    print("✅ Scenario 2: Unchanged listing returns 304 from the version lookup alone.")
+
+    # Scenario 3: a write or different query parameters produce a new ETag
+    _, result = poll(etag, limit=5)
+    assert isinstance(result, list)
+    bump_version(db)
+    db.commit()
+    response, result = poll(etag)
+    assert isinstance(result, list) and response.headers["ETag"] != etag
+    print("✅ Scenario 3: Writes and other parameters invalidate the ETag.")
+
+    print("✅ All conditional GET tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_conditional_get()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
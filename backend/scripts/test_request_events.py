@@ -0,0 +1,186 @@
+import sys
+import os
+import asyncio
+import json
+import tempfile
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.user import User as UserModel
+from routers.request import save_new_request, update_request, delete_request
+from routers.volunteer import apply_to_help
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from utils.events import MemoryEventBroker, SQLiteEventBroker, stream_events, CREATED
+
+
+def parse(chunk: str) -> list:
+    """
+    (id, event, data) for every event in a chunk of the stream; comments are skipped.
+    """
+    events = []
+    for message in chunk.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((int(fields["id"]) if "id" in fields else None, fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def read_events(stream, count: int, timeout: float = 5) -> list:
+    events = []
+    while len(events) < count:
+        events.extend(parse(await asyncio.wait_for(stream.__anext__(), timeout)))
+    return events
+
+
+def make_session():
+    path = os.path.join(tempfile.mkdtemp(), "events_requests.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteer = UserModel(username="vol", email="vol@test.com", role="volunteer")
+    db.add_all([owner, volunteer])
+    db.commit()
+    return (
+        db,
+        f"sqlite+aiosqlite:///{path}",
+        UserOut(id=owner.id, username="owner", email="owner@test.com", role="user"),
+        UserOut(id=volunteer.id, username="vol", email="vol@test.com", role="volunteer")
+    )
+
+
+def test_write_paths_publish_deltas():
+    print("Starting live request events test...")
+    feed_cache.clear()
+    db, async_url, owner, volunteer = make_session()
+    broker = MemoryEventBroker(retention=100, max_batches=16)
+
+    async def scenario():
+        stream = stream_events(None)
+        assert (await stream.__anext__()).startswith(": connected")
+
+        def create_and_update():
+            created = save_new_request(db, owner, "Flood", "Help", "Kochi", "high", None, "rescue")
+            update_request(created["id"], "Flood rising", "Help", "Kochi", "high", category=None, db=db, current_user=owner)
+            db.commit()  # ends the read transaction, so the async session can write
+            return created["id"]
+
+        request_id = await asyncio.to_thread(create_and_update)
+        async_engine = create_async_engine(async_url)
+        async with AsyncSession(async_engine) as async_db:
+            await apply_to_help(request_id, db=async_db, current_user=volunteer)
+        await async_engine.dispose()
+        await asyncio.to_thread(delete_request, request_id, db=db, current_user=owner)
+        events = await read_events(stream, 4)
+        await stream.aclose()
+        return request_id, events
+
+    with patch("utils.events.event_broker", broker):
+        request_id, events = asyncio.run(scenario())
+
+    assert [event for _, event, _ in events] == ["created", "updated", "applied", "deleted"]
+    assert all(data["id"] == request_id for _, _, data in events)
+    assert events[0][2]["category"] == "rescue" and events[1][2]["title"] == "Flood rising"
+    assert events[2][2]["volunteer_id"] == volunteer.id and events[3][2] == {"id": request_id}
+    assert [event_id for event_id, _, _ in events] == sorted(event_id for event_id, _, _ in events)
+    assert broker.hub.count() == 0
+    print("✅ Scenario 1: Create, update, apply and delete are pushed as compact deltas.")
+
+
+def test_resume_from_cursor():
+    broker = MemoryEventBroker(retention=5, max_batches=16)
+    broker.publish([(CREATED, {"id": i}) for i in range(1, 5)])
+    first_id = broker.since(broker._next_id - 4)[0][0]
+
+    async def resume(cursor, count):
+        stream = stream_events(cursor)
+        events = await read_events(stream, count)
+        await stream.aclose()
+        return events
+
+    with patch("utils.events.event_broker", broker):
+        # Scenario 2: a reconnecting client gets exactly what it missed
+        events = asyncio.run(resume(first_id + 1, 2))
+        assert [data["id"] for _, _, data in events] == [3, 4]
+        print("✅ Scenario 2: Clients resume after their last event id.")
+
+        # Scenario 3: a cursor older than the retained window asks the client to reload
+        broker.publish([(CREATED, {"id": i}) for i in range(5, 10)])
+        events = asyncio.run(resume(first_id, 1))
+        assert events[0][1] == "reset"
+        assert broker.since(broker._next_id + 5) is None
+        print("✅ Scenario 3: Expired cursors get a reset event.")
+
+
+def test_slow_subscriber_is_dropped():
+    broker = MemoryEventBroker(retention=100, max_batches=2)
+
+    async def scenario():
+        stream = stream_events(None)
+        await stream.__anext__()
+        for i in range(5):
+            broker.publish([(CREATED, {"id": i})])
+        await asyncio.sleep(0.05)
+        received = []
+        async for chunk in stream:
+            received.extend(parse(chunk))
+        return received
+
+    with patch("utils.events.event_broker", broker):
+        received = asyncio.run(scenario())
+    # Only what fitted in its queue, then the stream ends so the client resumes from its cursor
+    assert [data["id"] for _, _, data in received] == [0, 1]
+    assert broker.hub.count() == 0
+    print("✅ Scenario 4: Clients that fall behind are disconnected instead of buffering without bound.")
+
+
+def test_sqlite_broker_across_workers():
+    path = os.path.join(tempfile.mkdtemp(), "events.db")
+    # Two brokers on one file stand in for two uvicorn workers
+    publisher = SQLiteEventBroker(path, retention=3, max_batches=16, poll_seconds=0.05)
+    listener = SQLiteEventBroker(path, retention=3, max_batches=16, poll_seconds=0.05)
+    listener.start()
+
+    async def scenario():
+        stream = stream_events(None)
+        await stream.__anext__()
+        await asyncio.to_thread(publisher.publish, [(CREATED, {"id": 1}), (CREATED, {"id": 2})])
+        events = await read_events(stream, 2)
+        await stream.aclose()
+        return events
+
+    try:
+        with patch("utils.events.event_broker", listener):
+            events = asyncio.run(scenario())
+        assert [data["id"] for _, _, data in events] == [1, 2]
+        print("✅ Scenario 5: Events published by one worker reach clients of another.")
+
+        # Scenario 6: both workers resume from the shared log, which keeps a bounded window
+        publisher.publish([(CREATED, {"id": i}) for i in range(3, 6)])
+        cursor = events[-1][0]
+        assert [event_id for event_id, _ in listener.since(cursor + 1)] == [cursor + 2, cursor + 3]
+        assert listener.since(cursor) is not None and listener.since(cursor - 1) is None
+        print("✅ Scenario 6: The shared event log serves resumes and prunes old events.")
+    finally:
+        listener.stop()
+
+    print("✅ All live request events tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_write_paths_publish_deltas()
+        test_resume_from_cursor()
+        test_slow_subscriber_is_dropped()
+        test_sqlite_broker_across_workers()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
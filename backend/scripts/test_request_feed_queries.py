@@ -0,0 +1,94 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_application import VolunteerApplication
+from routers.request import list_requests
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from schemas.request import RequestFeedParams
+from fastapi import Response
+
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def seed(db, owner, volunteers, count):
+    for i in range(count):
+        req = Request(title=f"Flood {i}", description="Help", location="Kochi", urgency_level="high", user_id=owner.id)
+        db.add(req)
+        db.flush()
+        for volunteer in volunteers[: (i % len(volunteers)) + 1]:
+            db.add(VolunteerApplication(volunteer_id=volunteer.id, request_id=req.id))
+    db.commit()
+
+
+def count_feed_queries(engine, db, viewer):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        # Measure the uncached path
+        feed_cache.clear()
+        db.expire_all()
+        feed = list_requests(
+            response=Response(), params=RequestFeedParams(limit=500), size=None, stream=False, accept=None, if_none_match=None, db=db, current_user=viewer
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements), feed
+
+
+def test_feed_query_count_is_constant():
+    print("Starting request feed query count test...")
+
+    engine, db = make_session()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteers = [UserModel(username=f"vol{i}", email=f"vol{i}@test.com", role="volunteer") for i in range(3)]
+    db.add_all([owner, *volunteers])
+    db.commit()
+
+    owner_view = UserOut(id=owner.id, username=owner.username, email=owner.email, role=owner.role)
+    volunteer_view = UserOut(id=volunteers[0].id, username="vol0", email="vol0@test.com", role="volunteer")
+
+    seed(db, owner, volunteers, 5)
+    small_owner, feed = count_feed_queries(engine, db, owner_view)
+    small_volunteer, _ = count_feed_queries(engine, db, volunteer_view)
+    assert len(feed) == 5
+    assert feed[0]["user"]["username"] == "owner"
+    assert len(feed[2]["volunteers"]) == 3
+
+    seed(db, owner, volunteers, 50)
+    large_owner, feed = count_feed_queries(engine, db, owner_view)
+    large_volunteer, volunteer_feed = count_feed_queries(engine, db, volunteer_view)
+    assert len(feed) == 55
+    assert all(item["has_applied"] for item in volunteer_feed)
+
+    assert small_owner == large_owner, f"owner feed grew from {small_owner} to {large_owner} queries"
+    assert small_volunteer == large_volunteer, f"volunteer feed grew from {small_volunteer} to {large_volunteer} queries"
+    print(f"✅ Feed uses {large_owner} queries (owner) and {large_volunteer} queries (volunteer) at any size.")
+
+
+if __name__ == "__main__":
+    try:
+        test_feed_query_count_is_constant()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,129 @@
+import sys
+import os
+import random
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from routers.request import get_nearby_requests, insert_request_rows
+from schemas.request import RequestCreate
+from schemas.user import UserOut
+from utils.geo import geocode, encode_geohash, geohash_ranges, haversine_km, location_fields
+
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def test_geocoding():
+    print("Starting geocoding test...")
+
+    # Scenario 1: gazetteer lookups tolerate case, punctuation, aliases and extra words
+    kochi = geocode("Kochi")
+    assert kochi == (9.9312, 76.2673)
+    assert geocode("MG Road, KOCHI") == kochi
+    assert geocode("Relief camp near Cochin port") == kochi
+    assert geocode("new delhi") == (28.6139, 77.2090)
+    assert geocode("9.95, 76.30") == (9.95, 76.30)
+    assert geocode("Atlantis") is None and geocode("") is None
+    assert location_fields("Atlantis") == {"latitude": None, "longitude": None, "geohash": None}
+    print("✅ Scenario 1: Place names and coordinates are geocoded offline.")
+
+    # Scenario 2: geohashes match the reference encoding
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert location_fields("Kochi")["geohash"] == encode_geohash(9.9312, 76.2673)
+    print("✅ Scenario 2: Geohash encoding is correct.")
+
+    # Scenario 3: the covering ranges contain every point of the circle, also across the antimeridian
+    rng = random.Random(7)
+    for lat, lon, radius in ((9.93, 76.27, 5), (0.0, 179.9, 40), (-33.9, 151.2, 150), (78.2, 15.6, 100)):
+        ranges = geohash_ranges(lat, lon, radius)
+        assert len(ranges) <= 16
+        for _ in range(500):
+            point_lat = max(-90.0, min(90.0, lat + rng.uniform(-2, 2)))
+            point_lon = (lon + rng.uniform(-6, 6) + 180) % 360 - 180
+            if haversine_km(lat, lon, point_lat, point_lon) <= radius:
+                cell = encode_geohash(point_lat, point_lon)
+                assert any(low <= cell < high for low, high in ranges), (lat, lon, point_lat, point_lon)
+    print("✅ Scenario 3: Covering cells contain the whole search circle.")
+
+
+def test_nearby_endpoint():
+    print("Starting nearby search test...")
+
+    engine, db = make_session()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteer = UserModel(username="vol", email="vol@test.com", role="volunteer")
+    db.add_all([owner, volunteer])
+    db.commit()
+
+    rng = random.Random(42)
+    rows = [
+        RequestCreate(
+            title=f"Request {i}",
+            description="Help",
+            location=f"{9.9 + rng.uniform(-1, 1):.5f}, {76.3 + rng.uniform(-1, 1):.5f}"
+        )
+        for i in range(500)
+    ]
+    rows.append(RequestCreate(title="Named place", description="Help", location="Ernakulam"))
+    rows.append(RequestCreate(title="Unknown place", description="Help", location="Somewhere"))
+    insert_request_rows(db, rows, owner.id)
+    viewer = UserOut(id=volunteer.id, username="vol", email="vol@test.com", role="volunteer")
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    # Scenario 1: results match a brute-force scan, nearest first
+    for radius in (2, 15, 60):
+        items = get_nearby_requests(lat=9.95, lon=76.28, radius=radius, limit=500, size=None, db=db, current_user=viewer)
+        expected = sorted(
+            (haversine_km(9.95, 76.28, r.latitude, r.longitude), r.id)
+            for r in db.query(Request).filter(Request.latitude.isnot(None))
+        )
+        expected = [request_id for distance, request_id in expected if distance <= radius]
+        assert [item["id"] for item in items] == expected, radius
+        assert all(item["distance_km"] <= radius for item in items)
+        assert all(item["has_applied"] is False for item in items)
+    assert "Named place" in [item["title"] for item in items]
+    print("✅ Scenario 1: Nearby results equal a full scan, sorted by distance.")
+
+    # Scenario 2: candidates come from the geohash index and the limit is applied
+    statements.clear()
+    items = get_nearby_requests(lat=9.95, lon=76.28, radius=60, limit=5, size=None, db=db, current_user=viewer)
+    assert len(items) == 5
+    candidate_query = statements[0]
+    assert "geohash" in candidate_query
+    plan = engine.connect().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + candidate_query,
+        tuple(value for low, high in geohash_ranges(9.95, 76.28, 60) for value in (low, high))
+    ).all()
+    assert any("USING COVERING INDEX ix_requests_geohash" in row[-1] for row in plan) and "SCAN" not in str(plan), plan
+    print("✅ Scenario 2: Candidates are read with bounded geohash range scans.")
+
+    # Scenario 3: requests that cannot be geocoded are never returned
+    unknown = db.query(Request).filter(Request.title == "Unknown place").one()
+    assert unknown.latitude is None and unknown.geohash is None
+    print("✅ Scenario 3: Ungeocoded requests are skipped.")
+
+    print("✅ All nearby search tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_geocoding()
+        test_nearby_endpoint()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,119 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import settings
+from database import Base
+from dependencies.feed import get_feed_params
+from models.request import Request
+from models.user import User as UserModel
+from routers.request import list_requests
+from schemas.request import RequestFeedParams
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from utils.pagination import encode_cursor
+
+
+def make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def fetch_all_pages(db, viewer, **filters):
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        page = list_requests(
+            response=response,
+            params=RequestFeedParams(limit=7, cursor=cursor, **filters),
+            size=None,
+            stream=False,
+            accept=None,
+            if_none_match=None,
+            db=db,
+            current_user=viewer
+        )
+        seen.extend(item["id"] for item in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_keyset_pagination():
+    print("Starting request feed pagination test...")
+    feed_cache.clear()
+
+    db = make_session()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    other = UserModel(username="other", email="other@test.com", role="user")
+    db.add_all([owner, other])
+    db.commit()
+
+    base = datetime(2026, 1, 19, 12, 0, 0)
+    for i in range(40):
+        db.add(Request(
+            title=f"Request {i}",
+            description="Help",
+            location="Kochi" if i % 2 else "Chennai",
+            urgency_level="high" if i % 4 == 0 else "low",
+            # Groups of identical timestamps exercise the id tie-breaker
+            timestamp=base + timedelta(minutes=i // 3),
+            user_id=owner.id if i % 5 else other.id
+        ))
+    db.commit()
+    viewer = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+
+    # Scenario 1: walking every page yields every row once, newest first
+    ids = fetch_all_pages(db, viewer)
+    expected = [r.id for r in db.query(Request).order_by(Request.timestamp.desc(), Request.id.desc())]
+    assert ids == expected
+    print("✅ Scenario 1: Cursor walk returns every request exactly once.")
+
+    # Scenario 2: filters combine with the cursor
+    ids = fetch_all_pages(db, viewer, urgency_level="high", location="Chennai")
+    rows = db.query(Request).filter(Request.id.in_(ids)).all()
+    assert len(ids) == 10 and all(r.urgency_level == "high" and r.location == "Chennai" for r in rows)
+    ids = fetch_all_pages(db, viewer, user_id=other.id, since=base + timedelta(minutes=3), until=base + timedelta(minutes=9))
+    rows = db.query(Request).filter(Request.id.in_(ids)).all()
+    assert ids and all(r.user_id == other.id and base + timedelta(minutes=3) <= r.timestamp < base + timedelta(minutes=9) for r in rows)
+    print("✅ Scenario 2: Filters are applied server-side across pages.")
+
+    # Scenario 3: garbage cursors are rejected
+    try:
+        list_requests(response=Response(), params=RequestFeedParams(limit=7, cursor="not-a-cursor"), size=None, stream=False, accept=None, if_none_match=None, db=db, current_user=viewer)
+        assert False, "invalid cursor accepted"
+    except HTTPException as e:
+        assert e.status_code == 400
+    print("✅ Scenario 3: Invalid cursors return 400.")
+
+    # Scenario 4: without limit and cursor the whole feed comes back in one response, as before pagination
+    params = asyncio.run(get_feed_params(limit=None, cursor=None, urgency_level=None, location=None, user_id=None, since=None, until=None))
+    response = Response()
+    page = list_requests(response=response, params=params, size=None, stream=False, accept=None, if_none_match=None, db=db, current_user=viewer)
+    assert [item["id"] for item in page] == expected and "X-Next-Cursor" not in response.headers
+    cursor = encode_cursor(base + timedelta(minutes=13), 40)
+    params = asyncio.run(get_feed_params(limit=None, cursor=cursor, urgency_level=None, location=None, user_id=None, since=None, until=None))
+    assert params.limit == settings.FEED_PAGE_SIZE
+    print("✅ Scenario 4: Requests without limit or cursor get every request; a bare cursor gets the default page size.")
+
+    print("✅ All pagination tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_keyset_pagination()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,113 @@
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from routers.request import search_help_requests, insert_request_rows
+from schemas.request import RequestCreate
+from schemas.user import UserOut
+from utils.search import ensure_search_index, search_requests
+
+
+def search(db, viewer, q, limit=20, offset=0):
+    response = Response()
+    items = search_help_requests(response=response, q=q, limit=limit, offset=offset, size=None, db=db, current_user=viewer)
+    return [item["title"] for item in items], response.headers.get("X-Next-Offset")
+
+
+def test_full_text_search():
+    print("Starting full-text search test...")
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    db.add(owner)
+    db.commit()
+    viewer = UserOut(id=owner.id, username="owner", email="owner@test.com", role="user")
+
+    # Rows that exist before the index must be picked up when it is created
+    db.add(Request(title="Insulin needed", description="Diabetic patient, fridge lost power", location="Kochi", user_id=owner.id))
+    db.commit()
+    ensure_search_index(engine)
+    ensure_search_index(engine)
+
+    insert_request_rows(db, [
+        RequestCreate(title="Boat required", description="Family stranded on a rooftop", location="Aluva"),
+        RequestCreate(title="Food packets", description="Need a boat to reach the camp", location="Kochi"),
+        RequestCreate(title="Medicines", description="Running out of insulin and bandages", location="Chennai"),
+    ] + [RequestCreate(title=f"Water {i}", description="Drinking water", location="Thrissur") for i in range(5)], owner.id)
+
+    # Scenario 1: matches come from every column, title matches rank first
+    titles, _ = search(db, viewer, "insulin")
+    assert titles == ["Insulin needed", "Medicines"], titles
+    titles, _ = search(db, viewer, "boat")
+    assert titles == ["Boat required", "Food packets"], titles
+    titles, _ = search(db, viewer, "kochi")
+    assert sorted(titles) == ["Food packets", "Insulin needed"]
+    print("✅ Scenario 1: Title, description and location are searched and ranked.")
+
+    # Scenario 2: all words must match, stems and the prefix being typed match too
+    assert search(db, viewer, "boat kochi")[0] == ["Food packets"]
+    assert search(db, viewer, "boats")[0] == ["Boat required", "Food packets"]
+    assert search(db, viewer, "insul")[0] == ["Insulin needed", "Medicines"]
+    assert search(db, viewer, 'insulin" OR title:*')[0] == []
+    assert search(db, viewer, "?!")[0] == []
+    print("✅ Scenario 2: Multi-word, stemmed and prefix queries work and operators are inert.")
+
+    # Scenario 3: results are paginated
+    first, next_offset = search(db, viewer, "water", limit=3)
+    second, last_offset = search(db, viewer, "water", limit=3, offset=int(next_offset))
+    assert len(first) == 3 and len(second) == 2 and last_offset is None
+    assert sorted(first + second) == [f"Water {i}" for i in range(5)]
+    print("✅ Scenario 3: Pages follow X-Next-Offset without overlap.")
+
+    # Scenario 4: the index follows updates and deletes
+    boat = db.query(Request).filter(Request.title == "Boat required").one()
+    boat.title = "Rescue needed"
+    db.commit()
+    assert search(db, viewer, "boat")[0] == ["Food packets"]
+    assert search(db, viewer, "rescue")[0] == ["Rescue needed"]
+    db.delete(db.query(Request).filter(Request.title == "Medicines").one())
+    db.commit()
+    assert search(db, viewer, "insulin")[0] == ["Insulin needed"]
+    print("✅ Scenario 4: Updates and deletes are reflected immediately.")
+
+    # Scenario 5: the query runs against the inverted index
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    search_requests(db, "water", 10)
+    assert "requests_fts MATCH" in statements[0]
+    print("✅ Scenario 5: Search uses the FTS5 index.")
+
+    # Scenario 6: on PostgreSQL the GIN index is built without blocking writes
+    postgres = MagicMock()
+    postgres.dialect.name = "postgresql"
+    ensure_search_index(postgres)
+    postgres.connect.return_value.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    conn = postgres.connect.return_value.execution_options.return_value.__enter__.return_value
+    assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_requests_search" in str(conn.execute.call_args.args[0])
+    assert not postgres.begin.called
+    print("✅ Scenario 6: The PostgreSQL search index is created CONCURRENTLY outside a transaction.")
+
+    print("✅ All full-text search tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_full_text_search()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_application import VolunteerApplication
+from routers.request import list_requests, stream_requests_ndjson
+from schemas.request import RequestFeedParams
+from schemas.user import UserOut
+from utils.cache import feed_cache
+
+
+def test_ndjson_stream():
+    print("Starting NDJSON export test...")
+    feed_cache.clear()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionTest = sessionmaker(bind=engine)
+    db = SessionTest()
+
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    volunteer = UserModel(username="vol", email="vol@test.com", role="volunteer")
+    db.add_all([owner, volunteer])
+    db.commit()
+    for i in range(23):
+        db.add(Request(title=f"Request {i}", description="Help", location="Kochi", urgency_level="high" if i % 2 else "low", user_id=owner.id))
+    db.commit()
+    db.add(VolunteerApplication(volunteer_id=volunteer.id, request_id=1))
+    db.commit()
+    viewer = UserOut(id=volunteer.id, username="vol", email="vol@test.com", role="volunteer")
+
+    with patch("routers.request.SessionLocal", SessionTest), patch("routers.request.settings.STREAM_BATCH_SIZE", 5):
+        # Scenario 1: the export streams every row, batch by batch
+        chunks = list(stream_requests_ndjson(RequestFeedParams(limit=1), viewer))
+        rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+        assert len(chunks) == 5
+        assert len(rows) == 23 and len({row["id"] for row in rows}) == 23
+        assert [row["has_applied"] for row in rows if row["id"] == 1] == [True]
+        print("✅ Scenario 1: All rows streamed in fixed-size batches.")
+
+        # Scenario 2: filters still apply
+        rows = "".join(stream_requests_ndjson(RequestFeedParams(limit=1, urgency_level="high"), viewer)).splitlines()
+        assert len(rows) == 11
+        print("✅ Scenario 2: Filters apply to the export.")
+
+    # Scenario 3: ?stream=1 and Accept both switch the route to streaming
+    common = dict(response=Response(), params=RequestFeedParams(limit=1), size=None, if_none_match=None, db=db, current_user=viewer)
+    assert isinstance(list_requests(stream=True, accept=None, **common), StreamingResponse)
+    assert isinstance(list_requests(stream=False, accept="application/x-ndjson", **common), StreamingResponse)
+    assert isinstance(list_requests(stream=False, accept="application/json", **common), list)
+    print("✅ Scenario 3: Streaming is negotiated via ?stream=1 or Accept.")
+
+    print("✅ All NDJSON export tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_ndjson_stream()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
@@ -1,55 +1,152 @@
 import sys
 import os
-from unittest.mock import MagicMock, patch
+import tempfile
+import threading
+import time
+from collections import Counter
+from unittest.mock import patch
 
 # Add backend to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from routers.request import trigger_volunteer_notifications
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from utils.notifications import fan_out_notifications
 from models.request import Request
 from models.user import User as UserModel
 from models.notification import NotificationLog
 
 def test_robust_notification_logic():
     print("Starting robust notification logic test...")
-    
-    # Mock DB session
-    db = MagicMock()
-    
-    # Mock Request
-    mock_request = Request(id=1, title="Flood", location="Kochi", description="Help", urgency_level="high")
-    db.query(Request).filter().first.return_value = mock_request
-    
-    # Mock Volunteers
-    volunteer1 = UserModel(id=1, username="Vol1", email="vol1@test.com", role="volunteer")
-    volunteer2 = UserModel(id=2, username="Vol2", email="vol2@test.com", role="volunteer")
-    db.query(UserModel).filter().all.return_value = [volunteer1, volunteer2]
-    
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    owner = UserModel(username="Owner", email="owner@test.com", role="user")
+    volunteers = [UserModel(username=f"Vol{i}", email=f"vol{i}@test.com", role="volunteer") for i in range(1, 26)]
+    db.add_all([owner, *volunteers])
+    db.commit()
+    db.add(Request(title="Flood", location="Kochi", description="Help", urgency_level="high", user_id=owner.id))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
     # Scenario 1: New notification (no existing logs)
-    db.query(NotificationLog).filter_by().first.return_value = None
-    
-    with patch('routers.request.notify_volunteer') as mock_notify:
-        trigger_volunteer_notifications(db, 1, "new_disaster")
-        
-        # Should notify both
-        assert mock_notify.call_count == 2
-        print("✅ Scenario 1: Both volunteers notified successfully.")
-        
+    with patch('utils.notifications.notify_volunteer_batch', return_value="sent") as mock_notify, \
+         patch('utils.notifications.settings.NOTIFY_BATCH_SIZE', 10):
+        outcome = fan_out_notifications(db, [1], "new_disaster")
+        statement_count = len(statements)
+
+        # Should notify every volunteer, but not the owner
+        assert mock_notify.call_count == 25
+        assert sorted(call.args[0] for call in mock_notify.call_args_list) == sorted(v.email for v in volunteers)
+        assert outcome == {"claimed": 25, "sent": 25, "failed": 0, "rejected": 0, "digest": 0}
+        assert db.query(NotificationLog).filter_by(status="sent").count() == 25
+        # A handful of statements per batch of 10 volunteers (read, claim, fetch, record), not several per volunteer
+        assert statement_count < 20, statement_count
+        print("✅ Scenario 1: All volunteers notified with set-based queries.")
+
     # Scenario 2: Deduplication (already notified)
-    db.query(NotificationLog).filter_by().first.return_value = NotificationLog(id=1)
-    
-    with patch('routers.request.notify_volunteer') as mock_notify:
-        trigger_volunteer_notifications(db, 1, "new_disaster")
-        
+    with patch('utils.notifications.notify_volunteer_batch', return_value="sent") as mock_notify:
+        outcome = fan_out_notifications(db, [1], "new_disaster")
+
         # Should notify NONE because of existing log
-        assert mock_notify.call_count == 0
+        assert mock_notify.call_count == 0 and outcome["claimed"] == 0
         print("✅ Scenario 2: Deduplication prevents double emails.")
 
+    # Scenario 3: A duplicate log row is rejected by the unique index
+    try:
+        db.add(NotificationLog(user_id=volunteers[0].id, request_id=1, notification_type="new_disaster"))
+        db.commit()
+        assert False, "duplicate log row accepted"
+    except Exception as e:
+        db.rollback()
+        assert "UNIQUE" in str(e)
+    print("✅ Scenario 3: The unique constraint guards against concurrent fan-outs.")
+
+    # Scenario 4: Failed deliveries are recorded per volunteer
+    failing = {volunteers[0].email}
+    with patch('utils.notifications.notify_volunteer_batch', side_effect=lambda email, *args: "failed" if email in failing else "sent"):
+        outcome = fan_out_notifications(db, [1], "update")
+    assert outcome == {"claimed": 25, "sent": 24, "failed": 1, "rejected": 0, "digest": 0}
+    failed = db.query(NotificationLog).filter_by(notification_type="update", status="failed").one()
+    assert failed.user_id == volunteers[0].id
+    print("✅ Scenario 4: Delivery outcomes are written to the notification log.")
+
+
+def test_concurrent_fan_outs():
+    # A file database, so each fan-out has its own connection as in separate workers
+    engine = create_engine(
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'fan_out.db')}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    owner = UserModel(username="Owner", email="owner@test.com", role="user")
+    db.add_all([owner, *[UserModel(username=f"Vol{i}", email=f"vol{i}@test.com", role="volunteer") for i in range(1, 13)]])
+    db.commit()
+    db.add(Request(title="Flood", location="Kochi", description="Help", urgency_level="high", user_id=owner.id))
+    db.commit()
+    db.close()
+
+    mails = Counter()
+    lock = threading.Lock()
+
+    def slow_send(email, *args):
+        time.sleep(0.02)
+        with lock:
+            mails[email] += 1
+        return "sent"
+
+    # Scenario 5: two fan-outs for the same request at once, e.g. a re-claimed job next to the original
+    outcomes = []
+    def fan_out():
+        session = session_factory()
+        try:
+            outcomes.append(fan_out_notifications(session, [1], "new_disaster"))
+        finally:
+            session.close()
+
+    with patch('utils.notifications.notify_volunteer_batch', side_effect=slow_send), \
+         patch('utils.notifications.settings.NOTIFY_BATCH_SIZE', 3):
+        threads = [threading.Thread(target=fan_out) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(mails) == 12 and set(mails.values()) == {1}, mails
+    assert sum(outcome["sent"] for outcome in outcomes) == 12
+    db = session_factory()
+    assert db.query(NotificationLog).filter_by(status="sent").count() == 12
+    db.close()
+    print("✅ Scenario 5: Concurrent fan-outs for one request mail each volunteer once.")
+
+    # Scenario 6: rows claimed by a run that died are sent again once its lease has passed
+    db = session_factory()
+    db.query(NotificationLog).update({"status": "sending", "claimed_by": "dead-run"})
+    db.commit()
+    with patch('utils.notifications.notify_volunteer_batch', return_value="sent") as mock_notify:
+        assert fan_out_notifications(db, [1], "new_disaster")["sent"] == 0
+        with patch('utils.notifications.settings.NOTIFY_LEASE_SECONDS', -1):
+            assert fan_out_notifications(db, [1], "new_disaster")["sent"] == 12
+    assert mock_notify.call_count == 12
+    db.close()
+    engine.dispose()
+    print("✅ Scenario 6: Claims of a crashed run expire after the lease.")
+
     print("✅ All robust notification tests passed!")
 
 if __name__ == "__main__":
     try:
         test_robust_notification_logic()
+        test_concurrent_fan_outs()
     except Exception as e:
         print(f"❌ Test failed: {str(e)}")
         sys.exit(1)
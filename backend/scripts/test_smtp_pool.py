@@ -0,0 +1,229 @@
+import sys
+import os
+import smtplib
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models.notification import NotificationLog
+from models.request import Request
+from models.user import User as UserModel
+from utils.email import SMTPTransport, RateLimiter, close_transports, SENT, FAILED, REJECTED
+from utils.notifications import fan_out_notifications
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult, LoginPassword
+except ImportError:  # Optional test dependency
+    Controller = None
+
+
+class RecordingHandler:
+    """
+    Local SMTP stand-in: accepts everyone except temp*@ (451) and nobody@ (550),
+    and answers the message data of spam*@ with 554 and of busy*@ with 451.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.data_attempts = []
+        self.sessions = set()
+        self.lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("temp"):
+            return "451 4.3.0 Try again later"
+        if address.startswith("nobody"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.sessions.add(session)
+            self.data_attempts.append(envelope.rcpt_tos[0])
+        if envelope.rcpt_tos[0].startswith("spam"):
+            return "554 5.7.1 Message rejected as spam"
+        if envelope.rcpt_tos[0].startswith("busy"):
+            return "451 4.3.0 Mailbox busy"
+        with self.lock:
+            self.messages.append((envelope.rcpt_tos[0], envelope.content))
+        return "250 Message accepted"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    ok = isinstance(auth_data, LoginPassword) and auth_data.login == b"relief" and auth_data.password == b"secret"
+    return AuthResult(success=ok, handled=False)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(handler, port):
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port, authenticator=authenticate, auth_require_tls=False
+    )
+    controller.start()
+    return controller
+
+
+def make_message(to_email: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "alerts@relief.test"
+    message["To"] = to_email
+    message["Subject"] = "Alert"
+    message.set_content("Help needed")
+    return message
+
+
+def test_pooled_transport():
+    print("Starting pooled SMTP transport test...")
+    if Controller is None:
+        print("⚠️ aiosmtpd is not installed; skipping SMTP transport tests.")
+        return
+
+    handler = RecordingHandler()
+    port = free_port()
+    controller = start_server(handler, port)
+    transport = SMTPTransport("127.0.0.1", port, "relief", "secret", pool_size=3, max_messages=20)
+    try:
+        # Scenario 1: many messages share a few authenticated connections
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(transport.send, [make_message(f"vol{i}@relief.test") for i in range(60)]))
+        assert results == [SENT] * 60
+        assert len(handler.messages) == 60
+        assert 3 <= transport.stats()["connections"] <= 6 and len(handler.sessions) == transport.stats()["connections"]
+        print("✅ Scenario 1: 60 messages went over at most 3 concurrent, reused connections.")
+
+        # Scenario 2: per-message outcomes distinguish transient and permanent refusals
+        assert transport.send(make_message("temp@relief.test")) == FAILED
+        assert transport.send(make_message("nobody@relief.test")) == REJECTED
+        assert transport.send(make_message("ok@relief.test")) == SENT
+        print("✅ Scenario 2: 4xx is reported as failed, 5xx as rejected, and the session survives both.")
+
+        # Scenario 3: a reply to the message data is an outcome, not a broken connection to retry on
+        stats = transport.stats()
+        assert transport.send(make_message("spam@relief.test")) == REJECTED
+        assert transport.send(make_message("busy@relief.test")) == FAILED
+        assert handler.data_attempts.count("spam@relief.test") == 1
+        assert handler.data_attempts.count("busy@relief.test") == 1
+        after = transport.stats()
+        assert after["reconnects"] == stats["reconnects"] and after["connections"] == stats["connections"]
+        assert after[REJECTED] == stats[REJECTED] + 1 and after[FAILED] == stats[FAILED] + 1
+        assert transport.send(make_message("ok@relief.test")) == SENT
+        print("✅ Scenario 3: 5xx on DATA is rejected and 4xx failed, each sent once on the same session.")
+
+        # Scenario 4: a dropped server is reconnected to transparently
+        controller.stop()
+        controller = start_server(handler, port)
+        before = transport.stats()["reconnects"]
+        assert transport.send(make_message("after-restart@relief.test")) == SENT
+        assert transport.stats()["reconnects"] == before + 1
+        print("✅ Scenario 4: Broken pooled connections are replaced and the message retried.")
+
+        # Scenario 5: wrong credentials or a refused handshake fail the message but leave it retryable
+        closed = []
+        close = smtplib.SMTP.close
+
+        def recording_close(connection):
+            closed.append(connection)
+            close(connection)
+
+        with patch.object(smtplib.SMTP, "close", recording_close):
+            bad = SMTPTransport("127.0.0.1", port, "relief", "wrong", pool_size=1)
+            assert bad.send(make_message("vol@relief.test")) == FAILED
+            assert len(closed) == 1 and closed[0].sock is None
+            with patch.object(smtplib.SMTP, "ehlo", side_effect=smtplib.SMTPHeloError(554, b"Go away")):
+                assert bad.send(make_message("vol@relief.test")) == FAILED
+            assert len(closed) == 3 and all(connection.sock is None for connection in closed)
+        assert bad.stats()[REJECTED] == 0 and bad.stats()["connections"] == 0
+        bad.close()
+        print("✅ Scenario 5: Authentication and handshake failures are reported per message and close their socket.")
+    finally:
+        transport.close()
+        controller.stop()
+
+
+def test_rate_limiter():
+    print("Starting SMTP rate limiter test...")
+    limiter = RateLimiter(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(11):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.45 <= elapsed < 1.5, elapsed
+    print("✅ Scenario 6: Sends are paced to the provider's rate limit.")
+
+
+def test_outcomes_reach_notification_log():
+    print("Starting SMTP notification log test...")
+    if Controller is None:
+        print("⚠️ aiosmtpd is not installed; skipping SMTP notification log test.")
+        return
+
+    handler = RecordingHandler()
+    port = free_port()
+    controller = start_server(handler, port)
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = UserModel(username="owner", email="owner@test.com", role="user")
+    db.add(owner)
+    db.add_all([
+        UserModel(username=name, email=f"{name}@relief.test", role="volunteer")
+        for name in ("alice", "bob", "temp", "nobody")
+    ])
+    db.commit()
+    db.add(Request(title="Flood", description="Help", location="Kochi", urgency_level="high", user_id=owner.id))
+    db.commit()
+
+    try:
+        with patch("utils.email.settings.EMAIL_BACKEND", "smtp"), \
+             patch("utils.email.settings.SMTP_SERVER", "127.0.0.1"), \
+             patch("utils.email.settings.SMTP_PORT", port), \
+             patch("utils.email.settings.SMTP_USERNAME", "relief"), \
+             patch("utils.email.settings.SMTP_PASSWORD", "secret"):
+            outcome = fan_out_notifications(db, [1], "new_disaster")
+            close_transports()
+        assert outcome == {"claimed": 4, SENT: 2, FAILED: 1, REJECTED: 1, "digest": 0}
+        statuses = {
+            email: status for email, status in db.query(UserModel.email, NotificationLog.status).join(
+                NotificationLog, NotificationLog.user_id == UserModel.id
+            )
+        }
+        assert statuses == {
+            "alice@relief.test": SENT, "bob@relief.test": SENT,
+            "temp@relief.test": FAILED, "nobody@relief.test": REJECTED
+        }
+        print("✅ Scenario 7: Each delivery outcome is written to NotificationLog.status.")
+    finally:
+        controller.stop()
+
+    print("✅ All SMTP transport tests passed!")
+
+
+if __name__ == "__main__":
+    try:
+        test_pooled_transport()
+        test_rate_limiter()
+        test_outcomes_reach_notification_log()
+    except Exception as e:
+        print(f"❌ Test failed: {str(e)}")
+        sys.exit(1)
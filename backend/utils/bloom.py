@@ -0,0 +1,38 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed bit array: never a false negative, false
+    positives at about `error_rate` while it holds up to `capacity` items.
+    Positions come from one BLAKE2b digest split into two hashes
+    (Kirsch-Mitzenmacher double hashing).
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter needs a positive capacity and an error rate between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def stats(self) -> dict:
+        return {"capacity": self.capacity, "items": self.count, "bits": self.size, "hashes": self.hashes}
@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from schemas.request import RequestCreate
+from utils.uploads import MULTIPART_OVERHEAD
+from config import settings
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+def detect_format(content_type: str, filename: str = "") -> str:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    filename = (filename or "").lower()
+    if content_type in CSV_TYPES or filename.endswith(".csv"):
+        return "csv"
+    if content_type in NDJSON_TYPES or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "json"
+
+
+async def upload_chunks(upload: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def read_upload(chunks: AsyncIterator[bytes]) -> bytes:
+    """
+    Collects an upload chunk by chunk and rejects it as soon as it exceeds
+    BULK_MAX_BYTES, before anything is parsed.
+    """
+    data = bytearray()
+    async for chunk in chunks:
+        data += chunk
+        if len(data) > settings.BULK_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds the {settings.BULK_MAX_BYTES} byte limit")
+    return bytes(data)
+
+
+def check_multipart_size(content_length: Optional[str]):
+    """
+    Refuses a multipart upload before its form is parsed: 411 without a
+    Content-Length, 413 when it declares more than BULK_MAX_BYTES plus
+    room for the form's boundaries and headers.
+    """
+    if not content_length or not content_length.isdigit():
+        raise HTTPException(status_code=411, detail="Multipart uploads need a Content-Length header")
+    if int(content_length) > settings.BULK_MAX_BYTES + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {settings.BULK_MAX_BYTES} byte limit")
+
+
+def parse_rows(data: bytes, fmt: str) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """
+    Splits an upload into (row number, raw row) pairs. Rows are numbered
+    from 1; for CSV the header line is not counted. Lines that cannot be
+    decoded at all are reported as errors instead of failing the upload.
+    An upload that is not UTF-8 or not readable as CSV raises ValueError.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Upload is not valid UTF-8 (byte {e.start})")
+    rows, errors = [], []
+
+    if fmt == "csv":
+        try:
+            for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+                rows.append((number, row))
+        except csv.Error as e:
+            raise ValueError(f"Invalid CSV: {e}")
+    elif fmt == "ndjson":
+        number = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                rows.append((number, json.loads(line)))
+            except json.JSONDecodeError as e:
+                errors.append({"row": number, "errors": [f"Invalid JSON: {e.msg}"]})
+    else:
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}")
+        if not isinstance(payload, list):
+            raise ValueError("Expected a JSON array of requests")
+        rows = list(enumerate(payload, start=1))
+
+    return rows, errors
+
+
+def validate_rows(rows: List[Tuple[int, dict]]) -> Tuple[List[Tuple[int, RequestCreate]], List[dict]]:
+    """
+    Validates every row against RequestCreate and collects per-row errors.
+    """
+    valid, errors = [], []
+    for number, row in rows:
+        if not isinstance(row, dict):
+            errors.append({"row": number, "errors": ["Expected an object"]})
+            continue
+        # Empty CSV cells mean "not given", so optional fields keep their defaults
+        row = {key: value for key, value in row.items() if key is not None and value not in ("", None)}
+        try:
+            valid.append((number, RequestCreate(**row)))
+        except ValidationError as e:
+            errors.append({
+                "row": number,
+                "errors": [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()]
+            })
+    return valid, errors
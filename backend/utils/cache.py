@@ -0,0 +1,286 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+from utils.offload import off_event_loop
+from config import settings
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with a TTL and bounds on both entry count and total
+    size. Values are stored as JSON so callers can never mutate a cached
+    entry and the size bound reflects what is actually held.
+
+    Every invalidation advances the cache's generation. A caller that reads
+    generation() before loading a value and passes it to set() never stores
+    a value that an invalidation made while it was loading has outdated.
+    """
+
+    # Never waits on IO, so async code calls it without a thread hop
+    blocking = False
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, payload, tags)
+        self._tags = {}  # tag -> set of keys
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "stale_sets": 0, "evictions": 0, "invalidations": 0}
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            payload = entry[1]
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = (), generation: Optional[int] = None):
+        payload = json.dumps(value)
+        if len(payload) > self.max_bytes:
+            return
+        tags = frozenset(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stats["stale_sets"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, payload, tags)
+            self._bytes += len(payload)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._stats["sets"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "bytes": self._bytes, **self._stats}
+
+    def _remove(self, key: str):
+        _, payload, tags = self._entries.pop(key)
+        self._bytes -= len(payload)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class SQLiteCache:
+    """
+    Cache stored in a local SQLite file, so every uvicorn worker on the host
+    shares the same entries and sees the same invalidations. Eviction is
+    least-recently-used by last access time. The generation is a row of the
+    file too, so set() with a generation sees invalidations from every worker.
+    """
+
+    # Waits on the file lock (up to its 5s timeout), so async code calls it on the threadpool
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "stale_sets": 0, "evictions": 0, "invalidations": 0}
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at);
+                CREATE TABLE IF NOT EXISTS cache_tags (
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (tag, key)
+                );
+                CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key);
+                CREATE TABLE IF NOT EXISTS cache_generation (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    generation INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO cache_generation (id, generation) VALUES (1, 0);
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    @off_event_loop
+    def generation(self) -> int:
+        return self._conn().execute("SELECT generation FROM cache_generation").fetchone()[0]
+
+    @off_event_loop
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return json.loads(row[0])
+
+    @off_event_loop
+    def set(self, key: str, value: Any, tags: Iterable[str] = (), generation: Optional[int] = None):
+        payload = json.dumps(value)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if generation is not None and generation != conn.execute("SELECT generation FROM cache_generation").fetchone()[0]:
+                self._count("stale_sets")
+                return
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now + self.ttl, now)
+            )
+            conn.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in set(tags)])
+            evicted = self._evict(conn, now)
+        self._count("sets")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        conn.execute("DELETE FROM cache_tags WHERE key IN (SELECT key FROM cache_entries WHERE expires_at < ?)", (now,))
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+        evicted = 0
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        while count > self.max_entries or size > self.max_bytes:
+            key, entry_size = conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at LIMIT 1").fetchone()
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            count, size, evicted = count - 1, size - entry_size, evicted + 1
+        return evicted
+
+    @off_event_loop
+    def invalidate_tags(self, tags: Iterable[str]):
+        tags = list(set(tags))
+        if not tags:
+            return
+        placeholders = ",".join("?" for _ in tags)
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE cache_generation SET generation = generation + 1")
+            removed = conn.execute(
+                f"DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_tags WHERE tag IN ({placeholders}))", tags
+            ).rowcount
+            conn.execute(
+                f"DELETE FROM cache_tags WHERE key IN (SELECT key FROM cache_tags WHERE tag IN ({placeholders}))", tags
+            )
+        if removed:
+            self._count("invalidations", removed)
+
+    @off_event_loop
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE cache_generation SET generation = generation + 1")
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_tags")
+
+    def stats(self) -> dict:
+        count, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        with self._stats_lock:
+            return {"backend": "sqlite", "entries": count, "bytes": size, **self._stats}
+
+
+class NullCache:
+    """
+    Cache that never stores anything, for CACHE_BACKEND=none.
+    """
+
+    blocking = False
+
+    def generation(self) -> int:
+        return 0
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = (), generation: Optional[int] = None):
+        pass
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
+
+
+def create_cache(backend: str, max_entries: int, max_bytes: int, ttl: float):
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteCache(settings.CACHE_SQLITE_PATH, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+# Viewer-independent pages of the request feed
+feed_cache = create_cache(
+    settings.CACHE_BACKEND,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    ttl=settings.CACHE_TTL_SECONDS
+)
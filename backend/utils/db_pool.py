@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the checkout wait histogram; counts are cumulative, as in Prometheus
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+# Most recent waits kept for the percentiles
+WAIT_SAMPLES = 2048
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waits for a connection,
+    how many connections are in use at once, how often a checkout has to
+    open an overflow connection beyond pool_size, and how often one gives
+    up after pool_timeout. Every process has its own pool, so the numbers
+    are per uvicorn worker, which is the unit DB_POOL_SIZE is set for.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._metrics = {
+            "checkouts": 0,
+            "overflow_checkouts": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "peak_in_use": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self):
+        # The whole checkout as the caller sees it: waiting, connecting and pre-ping
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._metrics["timeouts"] += 1
+            logger.warning(f"No database connection free after {self._timeout}s ({self.status()})")
+            raise
+        self._record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _create_connection(self):
+        # Called only when the pool has no idle connection; past pool_size it is an overflow connection
+        with self._metrics_lock:
+            self._metrics["connections_created"] += 1
+            if self._overflow > 0:
+                self._metrics["overflow_checkouts"] += 1
+        return super()._create_connection()
+
+    def _record_checkout(self, wait: float):
+        in_use = self.checkedout()
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait * 1000 <= bound), len(WAIT_BUCKETS_MS))
+        with self._metrics_lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], in_use)
+            self._buckets[bucket] += 1
+            self._waits.append(wait)
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            waits = sorted(self._waits)
+            buckets = list(self._buckets)
+            wait_total, wait_max = self._wait_total, self._wait_max
+
+        def percentile(fraction: float) -> float:
+            return round(waits[min(int(len(waits) * fraction), len(waits) - 1)] * 1000, 3) if waits else 0.0
+
+        cumulative, histogram = 0, {}
+        for bound, count in zip([str(bound) for bound in WAIT_BUCKETS_MS] + ["+Inf"], buckets):
+            cumulative += count
+            histogram[bound] = cumulative
+        return {
+            "pid": os.getpid(),
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **metrics,
+            "wait_ms": {
+                "mean": round(wait_total / metrics["checkouts"] * 1000, 3) if metrics["checkouts"] else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(wait_max * 1000, 3),
+            },
+            "wait_ms_histogram": histogram,
+        }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    The same metrics for the pool of the async engine.
+    """
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"pid": os.getpid(), "pool": type(pool).__name__, "instrumented": False}
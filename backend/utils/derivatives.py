@@ -0,0 +1,123 @@
+import os
+import logging
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+from config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it only originals are served
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest side in pixels
+VARIANTS = {"thumb": 320, "medium": 1024}
+WEBP_QUALITY = 75
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_filename(photo_filename: str, variant: str) -> str:
+    stem = os.path.splitext(photo_filename)[0]
+    return f"{stem}_{variant}.webp"
+
+
+def render_variants(photo_filename: str, upload_dir: str) -> dict:
+    """
+    Writes a downscaled WebP for every entry in VARIANTS next to the original
+    and returns {variant: filename}. Runs in a worker process.
+    """
+    variants = {variant: variant_filename(photo_filename, variant) for variant in VARIANTS}
+    # Content-addressed photos share derivatives with earlier uploads of the same file
+    if all(os.path.exists(os.path.join(upload_dir, filename)) for filename in variants.values()):
+        return variants
+
+    with Image.open(os.path.join(upload_dir, photo_filename)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        for variant, max_side in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((max_side, max_side))
+            target = os.path.join(upload_dir, variants[variant])
+            # A unique temp name per render: concurrent renders of the same photo must not share one
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".variant-", suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    resized.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+                os.replace(temp_path, target)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+    return variants
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.DERIVATIVE_WORKERS)
+        return _executor
+
+
+def _record_variants(request_id: int, future):
+    # Imported here so worker processes never load the database layer
+    from database import SessionLocal
+    from models.request import Request
+    from utils.feed import invalidate_feed
+    from utils.versioning import bump_version
+
+    try:
+        variants = future.result()
+    except Exception:
+        logger.exception(f"Generating photo derivatives for request {request_id} failed")
+        return
+
+    db = SessionLocal()
+    try:
+        updated = db.query(Request).filter(Request.id == request_id).update(
+            {Request.photo_variants: variants}, synchronize_session=False
+        )
+        if updated:
+            bump_version(db)
+        db.commit()
+    finally:
+        db.close()
+    invalidate_feed([request_id])
+
+
+def schedule_derivatives(request_id: int, photo_filename: str, upload_dir: str = settings.UPLOAD_DIR):
+    """
+    Queues thumbnail/WebP generation for a stored photo on the process pool.
+    The request row is updated with the variant names once they exist.
+    """
+    if Image is None or not settings.PHOTO_DERIVATIVES_ENABLED:
+        return None
+    future = _get_executor().submit(render_variants, photo_filename, upload_dir)
+    future.add_done_callback(partial(_record_variants, request_id))
+    return future
+
+
+def select_photo(photo: Optional[str], variants: Optional[dict], size: Optional[str]) -> Optional[str]:
+    """
+    Picks the file to serve for ?size=, falling back to the original while
+    derivatives are missing or still being generated.
+    """
+    if size and variants and size in variants:
+        return variants[size]
+    return photo
+
+
+def shutdown_derivatives():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
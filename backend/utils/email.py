@@ -1,27 +1,253 @@
 import smtplib
+import ssl
 from email.message import EmailMessage
 import os
 import logging
+import queue
+import threading
+import time
 from typing import Optional
 from config import settings
 
 logger = logging.getLogger(__name__)
 
-def send_email(to_email: str, subject: str, body: str) -> bool:
+# Per-message delivery outcomes, stored in NotificationLog.status
+SENT = "sent"
+FAILED = "failed"  # Transient (connection lost, 4xx): retried by the notification outbox
+REJECTED = "rejected"  # Permanent (5xx, recipient refused): never retried
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread sending through one provider:
+    `rate` messages per second on average, bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMTPTransport:
+    """
+    Pool of authenticated SMTP connections to one provider. Each connection
+    carries many messages (up to max_messages) instead of one handshake,
+    STARTTLS and login per mail; at most pool_size are open and in use at
+    once and sends are paced by the provider's rate limit. A connection
+    that breaks is replaced and the message retried on the new one.
+    """
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "", use_tls: bool = True,
+                 pool_size: int = 4, rate_limit: float = 0, max_messages: int = 100,
+                 idle_seconds: float = 60, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle = queue.LifoQueue()  # (connection, messages sent, last used)
+        self._rate = RateLimiter(rate_limit, burst=pool_size)
+        self._lock = threading.Lock()
+        self._stats = {"connections": 0, "reconnects": 0, SENT: 0, FAILED: 0, REJECTED: 0}
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.port == 465:
+            connection = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=ssl.create_default_context())
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.port != 465:
+                connection.ehlo()
+                if self.use_tls and connection.has_extn("starttls"):
+                    connection.starttls(context=ssl.create_default_context())
+                    connection.ehlo()
+            if self.username:
+                connection.login(self.username, self.password)
+        except BaseException:
+            # The socket is open but the session unusable; don't leave it to the garbage collector
+            connection.close()
+            raise
+        self._count("connections")
+        return connection
+
+    @staticmethod
+    def _close(connection: Optional[smtplib.SMTP]):
+        if connection is None:
+            return
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _checkout(self):
+        while True:
+            try:
+                connection, sent, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+            if time.monotonic() - last_used < self.idle_seconds:
+                return connection, sent
+            # Providers drop idle sessions; don't find out by failing a send
+            self._close(connection)
+
+    def _checkin(self, connection: smtplib.SMTP, sent: int):
+        if sent >= self.max_messages:
+            self._close(connection)
+        else:
+            self._idle.put((connection, sent, time.monotonic()))
+
+    def send(self, message: EmailMessage) -> str:
+        """
+        Delivers one message and returns SENT, FAILED or REJECTED.
+        """
+        self._rate.acquire()
+        with self._slots:
+            for attempt in range(2):
+                try:
+                    # Retry on a fresh connection, not another pooled one that may be just as stale
+                    connection, sent = self._checkout() if attempt == 0 else (self._connect(), 0)
+                except smtplib.SMTPAuthenticationError as e:
+                    # Our credentials, not this recipient: keep it retryable, without a second login
+                    logger.warning(f"Sending to {message['To']} failed: {e.smtp_code} {e.smtp_error!r}")
+                    self._count(FAILED)
+                    return FAILED
+                except OSError as e:
+                    # Every SMTPException is an OSError. A refused HELO or STARTTLS is about
+                    # the connection, never this message, so it is not a rejection
+                    error = e
+                else:
+                    try:
+                        connection.send_message(message)
+                        self._checkin(connection, sent + 1)
+                        self._count(SENT)
+                        return SENT
+                    except smtplib.SMTPRecipientsRefused as e:
+                        # The session is still usable after the server refused a recipient
+                        self._checkin(connection, sent + 1)
+                        outcome = REJECTED if all(code >= 500 for code, _ in e.recipients.values()) else FAILED
+                        logger.warning(f"Recipients refused for {message['To']}: {e.recipients}")
+                        self._count(outcome)
+                        return outcome
+                    except smtplib.SMTPResponseException as e:
+                        # Before OSError: a server reply is an answer about this message, not a broken connection
+                        self._checkin(connection, sent + 1)
+                        outcome = REJECTED if e.smtp_code >= 500 else FAILED
+                        logger.warning(f"Sending to {message['To']} failed: {e.smtp_code} {e.smtp_error!r}")
+                        self._count(outcome)
+                        return outcome
+                    except OSError as e:
+                        error = e
+                    self._close(connection)
+                if attempt == 0:
+                    self._count("reconnects")
+                    continue
+                logger.warning(f"Sending to {message['To']} failed: {error}")
+                self._count(FAILED)
+                return FAILED
+            return FAILED
+
+    def close(self):
+        while True:
+            try:
+                connection, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"host": self.host, "idle_connections": self._idle.qsize(), **self._stats}
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport() -> SMTPTransport:
     """
-    Email sending disabled in production due to Render SMTP restrictions.
-    Logs the email content for debugging purposes.
-    Returns True to indicate "success" for flow continuity.
+    The shared transport for the configured provider. Keyed by provider so
+    every sender of one account shares its connections and rate limit.
     """
+    key = (settings.SMTP_SERVER, settings.SMTP_PORT, settings.SMTP_USERNAME)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = _transports[key] = SMTPTransport(
+                settings.SMTP_SERVER,
+                settings.SMTP_PORT,
+                settings.SMTP_USERNAME,
+                settings.SMTP_PASSWORD,
+                use_tls=settings.SMTP_USE_TLS,
+                pool_size=settings.SMTP_POOL_SIZE,
+                rate_limit=settings.SMTP_RATE_LIMIT,
+                max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+                idle_seconds=settings.SMTP_IDLE_SECONDS,
+                timeout=settings.SMTP_TIMEOUT
+            )
+        return transport
+
+
+def close_transports():
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
+
+
+def deliver_email(to_email: str, subject: str, body: str) -> str:
+    """
+    Sends one email and returns its outcome (SENT, FAILED or REJECTED).
+    With EMAIL_BACKEND=log (the default, as SMTP is blocked on Render) the
+    email is only logged and counts as sent.
+    """
+    if settings.EMAIL_BACKEND == "smtp":
+        message = EmailMessage()
+        message["From"] = settings.EMAIL_FROM
+        message["To"] = to_email
+        message["Subject"] = subject
+        message.set_content(body)
+        return get_transport().send(message)
+
     # Log the email content
     print(f"\n--- [EMAIL DISABLED - LOG ONLY] ---")
     print(f"To: {to_email}")
     print(f"Subject: {subject}")
     print(f"Body:\n{body}")
     print(f"----------------------\n")
-    
+
     logger.info(f"Email to {to_email} logged (sending disabled)")
-    return True
+    return SENT
+
+def send_email(to_email: str, subject: str, body: str) -> bool:
+    """
+    Sends one email; True if it was accepted (or logged, with EMAIL_BACKEND=log).
+    """
+    return deliver_email(to_email, subject, body) == SENT
 
 def notify_volunteer(volunteer_email: str, volunteer_name: str, request_data: dict, notification_type: str):
     """
@@ -51,10 +277,66 @@ Stay safe,
 Disaster Relief Team
     """
     
-    send_email(to_email=volunteer_email, subject=subject, body=body)
+    return deliver_email(to_email=volunteer_email, subject=subject, body=body)
+
+def notify_volunteer_batch(volunteer_email: str, volunteer_name: str, requests_data: list, notification_type: str):
+    """
+    Sends one summary email covering several requests, used when a whole
+    batch is ingested at once instead of one alert per request.
+    """
+    if len(requests_data) == 1:
+        return notify_volunteer(volunteer_email, volunteer_name, requests_data[0], notification_type)
+
+    subject = f"🚨 URGENT: {len(requests_data)} New Disaster Requests Reported"
+    details = "\n".join(
+        f"- [{data['urgency_level'].upper()}] {data['title']} ({data['location']})"
+        for data in requests_data
+    )
+
+    body = f"""
+Hello {volunteer_name},
+
+{len(requests_data)} disaster help requests have been reported that need your attention.
+
+Requests:
+{details}
+
+Please log in to the Disaster Relief platform to view more details and provide assistance.
+
+Stay safe,
+Disaster Relief Team
+    """
+
+    return deliver_email(to_email=volunteer_email, subject=subject, body=body)
+
+def notify_volunteer_digest(volunteer_email: str, volunteer_name: str, alerts: list):
+    """
+    Sends the periodic summary for a volunteer in digest mode: every
+    low-urgency alert, new or updated, collected since the last one.
+    `alerts` is a list of (notification_type, request_data) pairs.
+    """
+    subject = f"📋 Disaster Relief Digest: {len(alerts)} Request Alert{'s' if len(alerts) != 1 else ''}"
+    details = "\n".join(
+        f"- [{data['urgency_level'].upper()}] {'New' if notification_type == 'new_disaster' else 'Updated'}: "
+        f"{data['title']} ({data['location']})"
+        for notification_type, data in alerts
+    )
+
+    body = f"""
+Hello {volunteer_name},
+
+Here is your summary of disaster help requests since your last digest.
+
+Requests:
+{details}
+
+Please log in to the Disaster Relief platform to view more details and provide assistance.
+
+Stay safe,
+Disaster Relief Team
+    """
 
-    # Note: NotificationLog update should happen where this is called 
-    # if we want to ensure atomicity with the DB session.
+    return deliver_email(to_email=volunteer_email, subject=subject, body=body)
 
 def send_otp_email(email: str, username: str, otp: str):
     """
@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from models.request import Request
+from utils.offload import off_event_loop
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Deltas pushed to live feed subscribers
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+APPLIED = "applied"
+
+# (event id, the event already formatted as a Server-Sent Events message)
+Event = Tuple[int, str]
+
+
+def format_event(event_id: int, event_type: str, payload: str) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+# The compact form of a request sent with created/updated events: the feed
+# fields without the owner and photo variants, which clients fetch if they need them
+DELTA_FIELDS = (
+    "id", "title", "description", "location", "latitude", "longitude",
+    "urgency_level", "category", "photo", "timestamp", "user_id"
+)
+
+
+def request_delta(request: Request) -> dict:
+    return {field: getattr(request, field) for field in DELTA_FIELDS}
+
+
+class Subscriber:
+    """
+    One connected client. Batches of events are queued on its event loop;
+    a client that falls more than EVENTS_SUBSCRIBER_QUEUE batches behind is
+    marked lagging and disconnected, and catches up by resuming from its
+    last event id.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_batches: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_batches)
+        self.lagging = False
+
+    def deliver(self, events: List[Event]):
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(events)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class EventHub:
+    """
+    The subscribers connected to this process. Events can be dispatched
+    from any thread; each event loop gets one callback per batch, which
+    hands the batch to all of its subscribers.
+    """
+
+    def __init__(self, max_batches: int):
+        self.max_batches = max_batches
+        self._subscribers = {}  # event loop -> set of subscribers
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop(), self.max_batches)
+        with self._lock:
+            self._subscribers.setdefault(subscriber.loop, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.loop)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.loop]
+
+    def dispatch(self, events: List[Event]):
+        with self._lock:
+            targets = [(loop, list(subscribers)) for loop, subscribers in self._subscribers.items()]
+        for loop, subscribers in targets:
+            try:
+                loop.call_soon_threadsafe(self._deliver, subscribers, events)
+            except RuntimeError:
+                # The loop is closed; its subscribers are gone with it
+                with self._lock:
+                    self._subscribers.pop(loop, None)
+
+    @staticmethod
+    def _deliver(subscribers: List[Subscriber], events: List[Event]):
+        for subscriber in subscribers:
+            subscriber.deliver(events)
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class MemoryEventBroker:
+    """
+    Keeps the last EVENTS_RETENTION events in process memory and pushes
+    them straight to local subscribers. Only clients connected to the same
+    worker see the events; use the sqlite backend with several workers.
+    """
+
+    blocking = False
+
+    def __init__(self, retention: int, max_batches: int):
+        self.hub = EventHub(max_batches)
+        self._events = deque(maxlen=retention)
+        # Ids continue from the clock, so cursors from before a restart are recognised as stale
+        self._next_id = int(time.time() * 1000)
+        self._lock = threading.Lock()
+        self._published = 0
+
+    def publish(self, deltas: Iterable[Tuple[str, dict]]):
+        with self._lock:
+            events = []
+            for event_type, data in deltas:
+                self._next_id += 1
+                events.append((self._next_id, format_event(self._next_id, event_type, json.dumps(jsonable_encoder(data)))))
+            if not events:
+                return
+            self._events.extend(events)
+            self._published += len(events)
+            # Dispatched under the lock so every subscriber sees ids in order
+            self.hub.dispatch(events)
+
+    def since(self, cursor: int) -> Optional[List[Event]]:
+        """
+        The events after `cursor`, or None if some of them are no longer
+        retained (or the cursor is from another run) and the client has to
+        reload the feed instead.
+        """
+        with self._lock:
+            oldest = self._events[0][0] if self._events else self._next_id + 1
+            if cursor > self._next_id or cursor < oldest - 1:
+                return None
+            return [event for event in self._events if event[0] > cursor]
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "subscribers": self.hub.count(), "retained": len(self._events), "published": self._published}
+
+
+class SQLiteEventBroker:
+    """
+    Events appended to a local SQLite file shared by every uvicorn worker
+    on the host. Each process runs one poller thread that reads new rows
+    every EVENTS_POLL_SECONDS (at once for its own writes) and dispatches
+    them to its subscribers, so all clients see the same ids and order.
+    """
+
+    # publish takes the file's write lock, so async code calls it on the threadpool
+    blocking = True
+
+    def __init__(self, path: str, retention: int, max_batches: int, poll_seconds: float):
+        self.path = path
+        self.retention = retention
+        self.poll_seconds = poll_seconds
+        self.hub = EventHub(max_batches)
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"published": 0, "polled": 0}
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS feed_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str, amount: int):
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    @off_event_loop
+    def publish(self, deltas: Iterable[Tuple[str, dict]]):
+        now = time.time()
+        rows = [(event_type, json.dumps(jsonable_encoder(data)), now) for event_type, data in deltas]
+        if not rows:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.executemany("INSERT INTO feed_events (event_type, payload, created_at) VALUES (?, ?, ?)", rows)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            # Keep a window of EVENTS_RETENTION ids; cheap thanks to the rowid key
+            conn.execute("DELETE FROM feed_events WHERE id <= ?", (last_id - self.retention,))
+        self._count("published", len(rows))
+        self._wake.set()
+
+    def _read(self, cursor: int, limit: int) -> List[Event]:
+        rows = self._conn().execute(
+            "SELECT id, event_type, payload FROM feed_events WHERE id > ? ORDER BY id LIMIT ?", (cursor, limit)
+        ).fetchall()
+        return [(event_id, format_event(event_id, event_type, payload)) for event_id, event_type, payload in rows]
+
+    def _last_id(self) -> int:
+        row = self._conn().execute("SELECT seq FROM sqlite_sequence WHERE name = 'feed_events'").fetchone()
+        return row[0] if row else 0
+
+    def since(self, cursor: int) -> Optional[List[Event]]:
+        last_id = self._last_id()
+        oldest = self._conn().execute("SELECT MIN(id) FROM feed_events").fetchone()[0] or last_id + 1
+        if cursor > last_id or cursor < oldest - 1:
+            return None
+        return self._read(cursor, self.retention)
+
+    def _poll(self):
+        cursor = self._last_id()
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            try:
+                events = self._read(cursor, 1000)
+                while events:
+                    self.hub.dispatch(events)
+                    self._count("polled", len(events))
+                    cursor = events[-1][0]
+                    events = self._read(cursor, 1000)
+            except sqlite3.Error:
+                # A locked or busy database is retried on the next round
+                continue
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="feed-events-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {"backend": "sqlite", "subscribers": self.hub.count(), "last_id": self._last_id(), **self._stats}
+
+
+def create_event_broker(backend: str):
+    if backend == "memory":
+        return MemoryEventBroker(settings.EVENTS_RETENTION, settings.EVENTS_SUBSCRIBER_QUEUE)
+    if backend == "sqlite":
+        return SQLiteEventBroker(
+            settings.EVENTS_SQLITE_PATH, settings.EVENTS_RETENTION, settings.EVENTS_SUBSCRIBER_QUEUE, settings.EVENTS_POLL_SECONDS
+        )
+    raise ValueError(f"Unknown event backend: {backend}")
+
+
+# Live deltas of the request feed
+event_broker = create_event_broker(settings.EVENTS_BACKEND)
+
+
+def publish_events(deltas: Iterable[Tuple[str, dict]]):
+    """
+    Broadcasts deltas to live feed subscribers. Call it after the change
+    is committed; a failure here never fails the write that caused it.
+    """
+    try:
+        event_broker.publish(deltas)
+    except Exception:
+        logger.exception("Publishing feed events failed")
+
+
+async def stream_events(cursor: Optional[int]):
+    """
+    Server-Sent Events for one client: the retained events after `cursor`
+    (or a 'reset' event if they are gone), then live events, with a
+    comment line every EVENTS_HEARTBEAT_SECONDS to keep proxies from
+    closing an idle connection. Ends if the client falls too far behind.
+    """
+    subscriber = event_broker.hub.subscribe()
+    try:
+        # Subscribed first so nothing published while reading the backlog is missed
+        last_id = cursor or 0
+        if cursor is not None:
+            backlog = await asyncio.get_running_loop().run_in_executor(None, event_broker.since, cursor)
+            if backlog is None:
+                yield "event: reset\ndata: {}\n\n"
+                last_id = 0
+            else:
+                if backlog:
+                    last_id = backlog[-1][0]
+                yield "".join(text for _, text in backlog) or ": connected\n\n"
+        else:
+            yield ": connected\n\n"
+
+        while True:
+            try:
+                events = await asyncio.wait_for(subscriber.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            chunk = "".join(text for event_id, text in events if event_id > last_id)
+            if chunk:
+                last_id = events[-1][0]
+                yield chunk
+            if subscriber.lagging and subscriber.queue.empty():
+                return
+    finally:
+        event_broker.hub.unsubscribe(subscriber)
@@ -0,0 +1,171 @@
+from typing import Iterable, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, joinedload
+from models.request import Request
+from models.volunteer_application import VolunteerApplication
+from schemas.request import RequestFeedParams
+from schemas.user import UserOut
+from utils.cache import feed_cache
+from utils.user_cache import user_tag
+from utils.pagination import paginate_requests
+from utils.derivatives import select_photo
+
+
+def serialize_request(request: Request) -> dict:
+    """
+    Builds the feed representation of a request, including its owner.
+    Expects `request.user` to be loaded already.
+    """
+    request_dict = {
+        "id": request.id,
+        "title": request.title,
+        "description": request.description,
+        "location": request.location,
+        "latitude": request.latitude,
+        "longitude": request.longitude,
+        "urgency_level": request.urgency_level,
+        "category": request.category,
+        "photo": request.photo,
+        "photo_variants": request.photo_variants,
+        "timestamp": request.timestamp,
+        "user_id": request.user_id
+    }
+
+    user = request.user
+    if user:
+        request_dict["user"] = {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "phone_number": user.phone_number
+        }
+
+    return request_dict
+
+
+def serialize_volunteers(applications) -> list:
+    """
+    Builds the volunteer list shown to a request owner from loaded applications.
+    """
+    volunteers = []
+    for app in applications:
+        volunteer = app.volunteer
+        if volunteer:
+            volunteers.append({
+                "id": volunteer.id,
+                "username": volunteer.username,
+                "email": volunteer.email,
+                "phone_number": volunteer.phone_number,
+                "applied_at": app.applied_at.isoformat() if app.applied_at else None
+            })
+    return volunteers
+
+
+def query_feed_page(db: Session, params: RequestFeedParams) -> Tuple[list, Optional[str]]:
+    """
+    Reads one page of the viewer-independent feed straight from the database.
+    """
+    requests, next_cursor = paginate_requests(db.query(Request).options(joinedload(Request.user)), params)
+    return jsonable_encoder([serialize_request(request) for request in requests]), next_cursor
+
+
+def feed_page_tags(params: RequestFeedParams, items: list) -> list:
+    """
+    Tags a cached page with everything whose change can alter it: the
+    requests it contains, the users shown as their owners, the filter values
+    it selects on, and "head" for first pages, which are the only ones a
+    newly created request lands on.
+    """
+    tags = [f"request:{item['id']}" for item in items]
+    tags.extend(user_tag(user_id) for user_id in {item["user_id"] for item in items if item["user_id"] is not None})
+    if not params.cursor:
+        tags.append("head")
+    if params.urgency_level:
+        tags.append(f"urgency_level:{params.urgency_level}")
+    if params.location:
+        tags.append(f"location:{params.location}")
+    return tags
+
+
+def load_feed_page(db: Session, params: RequestFeedParams) -> Tuple[list, Optional[str]]:
+    """
+    Read-through cache in front of query_feed_page. The page is keyed by its
+    parameters only; per-viewer fields are added by overlay_viewer_fields.
+    Pages read on a replica are not cached: one that lags behind a write
+    could store the page that write's invalidation just dropped, and serve
+    it to everyone, the writer included. For the same reason a page is only
+    stored if no invalidation happened while it was being read.
+    """
+    key = f"feed:{params.model_dump_json()}"
+    cached = feed_cache.get(key)
+    if cached is not None:
+        return cached["items"], cached["next_cursor"]
+
+    generation = feed_cache.generation()
+    items, next_cursor = query_feed_page(db, params)
+    if db.info.get("replica"):
+        return items, next_cursor
+    feed_cache.set(
+        key, {"items": items, "next_cursor": next_cursor}, tags=feed_page_tags(params, items), generation=generation
+    )
+    return items, next_cursor
+
+
+def overlay_viewer_fields(db: Session, items: list, current_user: UserOut) -> list:
+    """
+    Adds the fields that depend on who is looking: the volunteer list on the
+    viewer's own requests and has_applied for volunteers. Two queries at most,
+    both restricted to the ids on the page.
+    """
+    owned_ids = [item["id"] for item in items if item["user_id"] == current_user.id]
+    if owned_ids:
+        applications = db.query(VolunteerApplication).options(
+            joinedload(VolunteerApplication.volunteer)
+        ).filter(VolunteerApplication.request_id.in_(owned_ids)).all()
+
+        by_request = {}
+        for app in applications:
+            by_request.setdefault(app.request_id, []).append(app)
+        for item in items:
+            volunteers = serialize_volunteers(by_request.get(item["id"], []))
+            if volunteers:
+                item["volunteers"] = volunteers
+
+    if current_user.role == "volunteer":
+        other_ids = [item["id"] for item in items if item["user_id"] != current_user.id]
+        applied_ids = set()
+        if other_ids:
+            applied_ids = {
+                request_id for (request_id,) in db.query(VolunteerApplication.request_id).filter(
+                    VolunteerApplication.volunteer_id == current_user.id,
+                    VolunteerApplication.request_id.in_(other_ids)
+                )
+            }
+        for item in items:
+            if item["user_id"] != current_user.id:
+                item["has_applied"] = item["id"] in applied_ids
+
+    return items
+
+
+def apply_photo_size(items: list, size: Optional[str]) -> list:
+    """
+    Points `photo` at the requested derivative (?size=thumb) where one exists.
+    """
+    if size:
+        for item in items:
+            item["photo"] = select_photo(item["photo"], item.get("photo_variants"), size)
+    return items
+
+
+def invalidate_feed(request_ids: Iterable[int] = (), created: bool = False, filter_values: Optional[dict] = None):
+    """
+    Drops exactly the cached pages a write can affect. Applications do not
+    need this: they only change the per-viewer overlay, which is never cached.
+    """
+    tags = [f"request:{request_id}" for request_id in request_ids]
+    if created:
+        tags.append("head")
+    for field, value in (filter_values or {}).items():
+        tags.append(f"{field}:{value}")
+    feed_cache.invalidate_tags(tags)
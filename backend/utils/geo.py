@@ -0,0 +1,205 @@
+import csv
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+from models.request import Request
+from config import settings
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Sorts after every geohash character, so [prefix, prefix + "{") is one cell
+GEOHASH_UPPER = "{"
+
+COORDINATES = re.compile(r"\s*(-?\d{1,3}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*")
+
+
+def normalize_place(name: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", (name or "").lower()).split())
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer(path: str = settings.GAZETTEER_PATH) -> Dict[str, Tuple[float, float]]:
+    """
+    Reads the offline gazetteer shipped with the app into {normalized name: (lat, lon)}.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        return {
+            normalize_place(row["name"]): (float(row["latitude"]), float(row["longitude"]))
+            for row in csv.DictReader(f)
+        }
+
+
+@lru_cache(maxsize=settings.GEOCODE_CACHE_SIZE)
+def geocode(location: str) -> Optional[Tuple[float, float]]:
+    """
+    Resolves a free-text location to (lat, lon). Accepts "lat, lon" as is,
+    otherwise looks for the most specific gazetteer place in it: the whole
+    string, then each comma-separated part, then runs of up to three words
+    ("Relief camp near Kochi port" -> "kochi"). Returns None if nothing matches.
+    """
+    match = COORDINATES.fullmatch(location or "")
+    if match:
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+
+    gazetteer = load_gazetteer()
+    candidates = [normalize_place(location)] + [normalize_place(part) for part in (location or "").split(",")]
+    for candidate in candidates:
+        if candidate in gazetteer:
+            return gazetteer[candidate]
+
+    words = candidates[0].split()
+    for length in (3, 2, 1):
+        for start in range(len(words) - length + 1):
+            place = " ".join(words[start:start + length])
+            if place in gazetteer:
+                return gazetteer[place]
+    return None
+
+
+def encode_geohash(lat: float, lon: float, precision: int = settings.GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            interval[0] = middle
+        else:
+            value <<= 1
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def location_fields(location: str) -> dict:
+    """
+    Column values derived from a request's location; all None if it cannot be geocoded.
+    """
+    coordinates = geocode(location)
+    if coordinates is None:
+        return {"latitude": None, "longitude": None, "geohash": None}
+    lat, lon = coordinates
+    return {"latitude": lat, "longitude": lon, "geohash": encode_geohash(lat, lon)}
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    # Longitude takes the first of every two bits
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def _bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    dlat = radius_km / KM_PER_DEGREE
+    lat_min, lat_max = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    widest = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+    dlon = 180.0 if widest < 1e-9 else min(180.0, radius_km / (KM_PER_DEGREE * widest))
+    return lat_min, lat_max, lon - dlon, lon + dlon
+
+
+def _covering_cells(lat_min: float, lat_max: float, lon_min: float, lon_max: float, precision: int) -> List[str]:
+    cell_lat, cell_lon = _cell_size(precision)
+    rows = int(round(180.0 / cell_lat))
+    cols = int(round(360.0 / cell_lon))
+    first_row = min(rows - 1, int((lat_min + 90) // cell_lat))
+    last_row = min(rows - 1, int((lat_max + 90) // cell_lat))
+    first_col = int((lon_min + 180) // cell_lon)
+    last_col = int((lon_max + 180) // cell_lon)
+    col_indexes = {col % cols for col in range(first_col, min(last_col, first_col + cols - 1) + 1)}
+
+    return [
+        encode_geohash(-90 + (row + 0.5) * cell_lat, -180 + (col + 0.5) * cell_lon, precision)
+        for row in range(first_row, last_row + 1)
+        for col in col_indexes
+    ]
+
+
+def _cell_count(lat_min: float, lat_max: float, lon_min: float, lon_max: float, precision: int) -> int:
+    cell_lat, cell_lon = _cell_size(precision)
+    rows = int((lat_max + 90) // cell_lat) - int((lat_min + 90) // cell_lat) + 1
+    cols = min(int(round(360.0 / cell_lon)), int((lon_max + 180) // cell_lon) - int((lon_min + 180) // cell_lon) + 1)
+    return rows * cols
+
+
+def _to_int(cell: str) -> int:
+    value = 0
+    for char in cell:
+        value = value * 32 + GEOHASH_ALPHABET.index(char)
+    return value
+
+
+def covering_cells(lat: float, lon: float, radius_km: float, precision: int) -> List[str]:
+    """
+    The geohash cells of one precision that cover the circle's bounding box.
+    """
+    return sorted(set(_covering_cells(*_bounding_box(lat, lon, radius_km), precision)))
+
+
+def geohash_ranges(lat: float, lon: float, radius_km: float) -> List[Tuple[str, str]]:
+    """
+    Covers the circle with the finest geohash cells that need at most
+    NEARBY_MAX_CELLS of them, and merges cells that are adjacent in geohash
+    order. Each (low, high) pair is one index range scan: low <= geohash < high.
+    """
+    box = _bounding_box(lat, lon, radius_km)
+    precision = 1
+    for candidate in range(settings.GEOHASH_PRECISION, 0, -1):
+        if _cell_count(*box, candidate) <= settings.NEARBY_MAX_CELLS:
+            precision = candidate
+            break
+
+    ranges = []
+    for cell in sorted(set(_covering_cells(*box, precision))):
+        if ranges and _to_int(cell) == _to_int(ranges[-1][1]) + 1:
+            ranges[-1][1] = cell
+        else:
+            ranges.append([cell, cell])
+    return [(low, high + GEOHASH_UPPER) for low, high in ranges]
+
+
+def find_nearby_requests(db: Session, lat: float, lon: float, radius_km: float, limit: int) -> List[Tuple[Request, float]]:
+    """
+    Returns up to `limit` geocoded requests within radius_km of (lat, lon),
+    nearest first, as (request, distance in km). Candidates come from a few
+    range scans of ix_requests_geohash, which also holds the coordinates, so
+    only rows in the covering cells are read and only the winners are loaded.
+    """
+    cells = or_(*(and_(Request.geohash >= low, Request.geohash < high) for low, high in geohash_ranges(lat, lon, radius_km)))
+    candidates = db.query(Request.id, Request.latitude, Request.longitude).filter(cells)
+
+    nearest = []
+    for request_id, request_lat, request_lon in candidates:
+        distance = haversine_km(lat, lon, request_lat, request_lon)
+        if distance <= radius_km:
+            nearest.append((distance, request_id))
+    nearest.sort()
+    nearest = nearest[:limit]
+    if not nearest:
+        return []
+
+    by_id = {
+        request.id: request
+        for request in db.query(Request).options(joinedload(Request.user)).filter(
+            Request.id.in_([request_id for _, request_id in nearest])
+        )
+    }
+    return [(by_id[request_id], distance) for distance, request_id in nearest if request_id in by_id]
@@ -0,0 +1,190 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from config import settings
+
+# A write: called with the writer's session, must not commit, returns plain values (ids), not ORM objects
+Work = Callable[[Session], Any]
+
+
+class GroupCommitWriter:
+    """
+    One thread that applies small writes from many requests. Writes that
+    arrive within `window` seconds of each other, up to `max_batch`, run in
+    one transaction, so SQLite takes its write lock and syncs once per
+    batch rather than once per request, and concurrent writers never race
+    for the lock. If any write in a batch fails, the batch is rolled back
+    and each write is retried in a transaction of its own, so only the
+    failing one reports an error.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int, window: float):
+        self.session_factory = session_factory
+        self.bind = session_factory.kw.get("bind")  # the engine; only sessions on it are routed here
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"writes": 0, "failed": 0, "batches": 0, "split_batches": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        # Writes queued before stop are still committed
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, work: Work) -> Any:
+        """
+        Runs `work` on the writer and blocks until it is committed; its
+        return value or exception is passed back to the caller.
+        """
+        return self._enqueue(work).result()
+
+    async def submit_async(self, work: Work) -> Any:
+        """
+        submit for async routes: waits for the commit without blocking the
+        event loop or holding a thread.
+        """
+        return await asyncio.wrap_future(self._enqueue(work))
+
+    def _enqueue(self, work: Work) -> Future:
+        future = Future()
+        self._queue.put((work, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch: List[Tuple[Work, Future]]):
+        results = self._apply(batch)
+        if results is None and len(batch) > 1:
+            self._count("split_batches")
+            for item in batch:
+                self._commit([item])
+            return
+        if results is None:
+            return
+        self._count("batches")
+        self._count("writes", len(batch))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _apply(self, batch: List[Tuple[Work, Future]]) -> Optional[list]:
+        """
+        The results of the batch after committing it, or None if it was
+        rolled back. A single failing write gets its exception.
+        """
+        db = self.session_factory()
+        try:
+            results = [work(db) for work, _ in batch]
+            db.commit()
+            return results
+        except Exception as e:
+            db.rollback()
+            if len(batch) == 1:
+                self._count("failed")
+                batch[0][1].set_exception(e)
+            return None
+        finally:
+            db.close()
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"running": self.running, "queued": self._queue.qsize(), **self._stats}
+
+
+_writer: Optional[GroupCommitWriter] = None
+
+
+def start_writer(session_factory: Callable[[], Session]) -> GroupCommitWriter:
+    global _writer
+    if _writer is None:
+        _writer = GroupCommitWriter(
+            session_factory, settings.SQLITE_GROUP_COMMIT_MAX_BATCH, settings.SQLITE_GROUP_COMMIT_WINDOW_MS / 1000
+        )
+        _writer.start()
+    return _writer
+
+
+def stop_writer(timeout: Optional[float] = None):
+    global _writer
+    if _writer is not None:
+        _writer.stop(timeout)
+        _writer = None
+
+
+def writer_stats() -> dict:
+    return _writer.stats() if _writer is not None else {"running": False}
+
+
+def commit_write(db: Session, work: Work) -> Any:
+    """
+    Runs `work` and commits it: on the group-commit writer when it is
+    running for the same database as `db`, otherwise directly on `db`.
+    `db` must not hold uncommitted changes; its read snapshot is ended so
+    that it sees the write afterwards.
+    """
+    writer = _writer
+    if writer is not None and db.get_bind() is writer.bind:
+        db.rollback()
+        return writer.submit(work)
+    result = work(db)
+    db.commit()
+    return result
+
+
+def same_database(engine, other) -> bool:
+    # The async engine reaches the writer's database through another driver
+    return (engine.url.get_backend_name(), engine.url.database) == (other.url.get_backend_name(), other.url.database)
+
+
+async def async_commit_write(db: AsyncSession, work: Work) -> Any:
+    """
+    commit_write for an AsyncSession. `work` is the same synchronous
+    function; without the writer it runs on `db` through run_sync.
+    """
+    writer = _writer
+    if writer is not None and same_database(db.get_bind(), writer.bind):
+        await db.rollback()
+        return await writer.submit_async(work)
+    result = await db.run_sync(work)
+    await db.commit()
+    return result
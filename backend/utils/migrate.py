@@ -0,0 +1,183 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+from config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock file, run migrations from one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Key of the PostgreSQL advisory lock held while migrating
+MIGRATION_LOCK_KEY = 7340021
+
+# One row per applied migration. Kept out of Base.metadata, which describes
+# the application's tables; the migrations create those
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.current_timestamp()),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Engine], None]
+
+
+def current_version(engine: Engine) -> int:
+    """
+    The newest migration applied to the database; 0 if none ever was. One
+    table lookup and one primary key lookup, however large the database.
+    """
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_version.name):
+            return 0
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+@contextmanager
+def migration_lock(engine: Engine):
+    """
+    Held while migrating, so that of several workers starting together one
+    migrates and the rest wait, then find nothing left to do. An advisory
+    lock on PostgreSQL and a lock file next to a SQLite database; both are
+    released if the process dies.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                conn.commit()
+        return
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:" or fcntl is None:
+        yield
+        return
+    with open(f"{database}.migrate-lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migrate(engine: Engine, migrations: Sequence[Migration], target: Optional[int] = None) -> List[int]:
+    """
+    Applies the pending migrations up to `target` (default: all), in order,
+    and returns their versions. Each one is recorded as soon as it finishes,
+    so a run that is interrupted resumes with the migration it stopped in;
+    migrations must therefore be safe to run again.
+    """
+    with migration_lock(engine):
+        schema_metadata.create_all(bind=engine)
+        applied = current_version(engine)
+        done = []
+        for migration in migrations:
+            if migration.version <= applied or (target is not None and migration.version > target):
+                continue
+            logger.info(f"Applying migration {migration.version} ({migration.name})...")
+            start = time.perf_counter()
+            migration.upgrade(engine)
+            with engine.begin() as conn:
+                conn.execute(schema_version.insert().values(version=migration.version, name=migration.name))
+            logger.info(f"Applied migration {migration.version} in {time.perf_counter() - start:.1f}s")
+            done.append(migration.version)
+        return done
+
+
+def check_schema(engine: Engine, migrations: Sequence[Migration], auto_migrate: bool) -> int:
+    """
+    Startup check. An up-to-date database costs one version lookup. A
+    database behind the code is migrated if `auto_migrate`, otherwise the
+    worker refuses to start. A database ahead of the code is accepted:
+    migrations only add to the schema, so the previous release keeps working
+    against it while a rolling restart replaces its workers.
+    """
+    head = migrations[-1].version
+    version = current_version(engine)
+    if version > head:
+        logger.warning(f"The database schema is at version {version}, newer than this release ({head})")
+    if version >= head:
+        return version
+    if not auto_migrate:
+        raise RuntimeError(
+            f"The database schema is at version {version} and this release needs {head}; "
+            "run python scripts/migrate.py"
+        )
+    migrate(engine, migrations)
+    return head
+
+
+def add_columns(engine: Engine, table: str, columns: Sequence[Tuple[str, str]]):
+    """
+    Adds the (name, definition) columns that the table does not have yet.
+    Adding a nullable column, or one with a constant default, changes only
+    the table definition on SQLite and PostgreSQL: no rows are rewritten.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table):
+        return
+    existing = {column["name"] for column in inspector.get_columns(table)}
+    with engine.begin() as conn:
+        for name, definition in columns:
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+                logger.info(f"Added column {table}.{name}")
+
+
+def create_indexes(engine: Engine, indexes: Sequence[Index]):
+    """
+    Creates the indexes that are missing. PostgreSQL builds them
+    CONCURRENTLY, so writes to the table continue while they are built.
+    """
+    for index in indexes:
+        if engine.dialect.name != "postgresql":
+            index.create(bind=engine, checkfirst=True)
+            continue
+        statement = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+        statement = statement.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+        # CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(statement))
+
+
+def backfill(
+    engine: Engine,
+    select_batch: Callable[[Connection, int, int], Sequence],
+    apply_batch: Callable[[Connection, Sequence], None],
+    batch_size: int = settings.MIGRATION_BATCH_SIZE,
+    pause_ms: float = settings.MIGRATION_BATCH_PAUSE_MS,
+) -> int:
+    """
+    Runs a data migration over a table while the application keeps using
+    it. select_batch(conn, last_id, limit) returns the next rows after
+    last_id in id order, id first; apply_batch(conn, rows) writes them.
+    Each batch is one short transaction, with a pause after it in which
+    the application's writers get the write lock. Returns the rows seen.
+    """
+    total, last_id = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = select_batch(conn, last_id, batch_size)
+            if not rows:
+                return total
+            apply_batch(conn, rows)
+        total += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"Backfilled {total} rows (up to id {last_id})")
+        time.sleep(pause_ms / 1000)
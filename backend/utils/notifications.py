@@ -0,0 +1,264 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+from sqlalchemy import and_, case, exists, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models.notification import NotificationLog
+from models.request import Request
+from models.user import User as UserModel
+from models.volunteer_routing import VolunteerAreaCell, VolunteerCategory
+from utils.email import notify_volunteer_batch, notify_volunteer_digest, SENT, FAILED, REJECTED
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Log status of low-urgency rows held for a volunteer's periodic digest; also the outbox job type that sends them
+DIGEST = "digest"
+# Log statuses of rows claimed by a fan-out or digest run that is mailing them right now
+SENDING = "sending"
+SENDING_DIGEST = "sending_digest"
+
+
+def _insert_ignoring_duplicates(dialect: str):
+    # Concurrent fan-outs for the same request may race past the anti-join;
+    # the unique index settles it without failing the statement.
+    if dialect == "postgresql":
+        return postgresql.insert(NotificationLog).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(NotificationLog).on_conflict_do_nothing()
+    return insert(NotificationLog)
+
+
+def routed_recipients(request_ids: List[int]):
+    """
+    (user_id, request_id) pairs of the volunteers each request should
+    reach, as a union of index lookups rather than a scan of all users:
+    - volunteers with a service area cell containing the request's geohash,
+    - volunteers without service areas (service_scope 'everywhere'),
+    - and for requests that could not be geocoded, volunteers with areas too.
+    Category preferences are applied by the caller.
+    """
+    in_area = select(VolunteerAreaCell.user_id, Request.id).select_from(Request).join(
+        VolunteerAreaCell, VolunteerAreaCell.cell == func.substr(Request.geohash, 1, settings.SERVICE_AREA_PRECISION)
+    ).where(Request.id.in_(request_ids))
+    everywhere = select(UserModel.id, Request.id).select_from(Request).join(
+        UserModel, and_(UserModel.role == "volunteer", UserModel.service_scope == "everywhere")
+    ).where(Request.id.in_(request_ids))
+    unplaced = select(UserModel.id, Request.id).select_from(Request).join(
+        UserModel, and_(UserModel.role == "volunteer", UserModel.service_scope == "areas")
+    ).where(Request.id.in_(request_ids), Request.geohash.is_(None))
+    return union_all(in_area, everywhere, unplaced).subquery()
+
+
+def claim_recipients(db: Session, request_ids: List[int], notification_type: str) -> int:
+    """
+    Inserts a log row for every routed (volunteer, request) pair that has
+    not been notified yet and matches the volunteer's categories, with one
+    INSERT ... SELECT over an anti-join. Rows are 'pending', or 'digest'
+    for volunteers in digest mode unless the request is high urgency.
+    Returns the number of rows claimed.
+    """
+    routed = routed_recipients(request_ids)
+    user_id, request_id = routed.c
+    already_logged = exists().where(
+        NotificationLog.user_id == user_id,
+        NotificationLog.request_id == request_id,
+        NotificationLog.notification_type == notification_type
+    )
+    wants_category = or_(
+        Request.category.is_(None),
+        ~exists().where(VolunteerCategory.user_id == user_id),
+        exists().where(VolunteerCategory.user_id == user_id, VolunteerCategory.category == Request.category)
+    )
+    status = case(
+        (and_(UserModel.notification_mode == "digest", func.coalesce(Request.urgency_level, "medium") != "high"), literal(DIGEST)),
+        else_=literal("pending")
+    )
+    recipients = select(
+        user_id,
+        request_id,
+        literal(notification_type),
+        status,
+        literal(datetime.utcnow())
+    ).select_from(routed).join(UserModel, UserModel.id == user_id).join(Request, Request.id == request_id).where(
+        UserModel.role == "volunteer",
+        wants_category,
+        ~already_logged
+    )
+    result = db.execute(
+        _insert_ignoring_duplicates(db.get_bind().dialect.name).from_select(
+            ["user_id", "request_id", "notification_type", "status", "sent_at"], recipients
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _send(recipient: dict) -> str:
+    try:
+        if recipient["digest"]:
+            return notify_volunteer_digest(recipient["email"], recipient["username"], recipient["alerts"])
+        notification_type = recipient["alerts"][0][0]
+        return notify_volunteer_batch(
+            recipient["email"], recipient["username"], [data for _, data in recipient["alerts"]], notification_type
+        )
+    except Exception:
+        logger.exception(f"Notifying {recipient['email']} failed")
+        return FAILED
+
+
+def _deliver(db: Session, scope, statuses: List[str], digest: bool = False, on_batch: Optional[Callable[[], None]] = None) -> dict:
+    """
+    Sends one mail per volunteer covering all of their log rows in `scope`
+    with one of `statuses`. Volunteers are handled NOTIFY_BATCH_SIZE at a
+    time. Each batch's rows are first claimed: a conditional UPDATE moves
+    them to 'sending' under a fresh token and commits, so a concurrent run
+    for the same rows claims none of them and nobody is mailed twice. The
+    claimed rows are then mailed in parallel and each gets its own outcome
+    (sent, failed or rejected), written with one UPDATE per outcome. Failed
+    digest rows go back to 'digest' so the retried digest picks them up
+    again. Rows whose run died are claimable again after NOTIFY_LEASE_SECONDS.
+    `on_batch` runs before each batch's outcome is committed.
+    """
+    claimed_status = SENDING_DIGEST if digest else SENDING
+    outcome = {SENT: 0, FAILED: 0, REJECTED: 0}
+    last_user_id = 0
+    with ThreadPoolExecutor(max_workers=settings.NOTIFY_MAIL_WORKERS) as pool:
+        while True:
+            now = datetime.utcnow()
+            claimable = and_(scope, or_(
+                NotificationLog.status.in_(statuses),
+                and_(
+                    NotificationLog.status == claimed_status,
+                    NotificationLog.sent_at < now - timedelta(seconds=settings.NOTIFY_LEASE_SECONDS)
+                )
+            ))
+            user_ids = [
+                user_id for (user_id,) in db.query(NotificationLog.user_id).filter(
+                    claimable, NotificationLog.user_id > last_user_id
+                ).distinct().order_by(NotificationLog.user_id).limit(settings.NOTIFY_BATCH_SIZE)
+            ]
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            token = uuid.uuid4().hex
+            db.query(NotificationLog).filter(claimable, NotificationLog.user_id.in_(user_ids)).update({
+                NotificationLog.status: claimed_status,
+                NotificationLog.claimed_by: token,
+                NotificationLog.sent_at: now
+            }, synchronize_session=False)
+            db.commit()
+
+            rows = db.query(
+                NotificationLog.id, NotificationLog.user_id, NotificationLog.notification_type,
+                UserModel.email, UserModel.username,
+                Request.title, Request.location, Request.urgency_level, Request.description
+            ).join(UserModel, UserModel.id == NotificationLog.user_id).join(
+                Request, Request.id == NotificationLog.request_id
+            ).filter(
+                NotificationLog.user_id.in_(user_ids),
+                NotificationLog.claimed_by == token,
+                NotificationLog.status == claimed_status
+            ).order_by(NotificationLog.user_id, NotificationLog.request_id)
+
+            recipients = {}
+            for log_id, user_id, notification_type, email, username, title, location, urgency_level, description in rows:
+                recipient = recipients.setdefault(
+                    user_id, {"email": email, "username": username, "digest": digest, "log_ids": [], "alerts": []}
+                )
+                recipient["log_ids"].append(log_id)
+                recipient["alerts"].append((notification_type, {
+                    "title": title,
+                    "location": location,
+                    "urgency_level": urgency_level or "medium",
+                    "description": description
+                }))
+            if not recipients:
+                # Another run claimed this batch first
+                continue
+            results = list(pool.map(_send, recipients.values()))
+
+            log_ids = {SENT: [], FAILED: [], REJECTED: []}
+            for recipient, result in zip(recipients.values(), results):
+                log_ids[result].extend(recipient["log_ids"])
+                outcome[result] += 1
+            now = datetime.utcnow()
+            for status, ids in log_ids.items():
+                if ids:
+                    db.execute(update(NotificationLog).where(NotificationLog.id.in_(ids)).values(
+                        status=DIGEST if digest and status == FAILED else status, claimed_by=None, sent_at=now
+                    ))
+            if on_batch is not None:
+                on_batch()
+            db.commit()
+
+    return outcome
+
+
+def deliver_pending(
+    db: Session,
+    request_ids: List[int],
+    notification_type: str,
+    on_batch: Optional[Callable[[], None]] = None
+) -> dict:
+    """
+    Delivers the undelivered rows for these requests: 'pending' ones and
+    'failed' ones from an earlier attempt. Rows waiting for a digest are
+    left alone.
+    """
+    return _deliver(db, and_(
+        NotificationLog.request_id.in_(request_ids),
+        NotificationLog.notification_type == notification_type
+    ), ["pending", FAILED], on_batch=on_batch)
+
+
+def deliver_digests(db: Session, on_batch: Optional[Callable[[], None]] = None) -> dict:
+    """
+    Sends every volunteer in digest mode one summary of all their rows
+    waiting for a digest, new and updated requests alike.
+    """
+    return _deliver(db, literal(True), [DIGEST], digest=True, on_batch=on_batch)
+
+
+def fan_out_notifications(
+    db: Session,
+    request_ids: Iterable[int],
+    notification_type: str,
+    renotify_before: Optional[datetime] = None,
+    on_batch: Optional[Callable[[], None]] = None
+) -> dict:
+    """
+    Notifies every volunteer about the given requests at most once per
+    request and type. A bulk upload passes all of its ids and each
+    volunteer gets one coalesced mail. Rows left 'pending' by an
+    interrupted run are delivered by the next fan-out for the same requests.
+
+    With `renotify_before`, volunteers whose notification of this type was
+    sent before that time are notified again; update jobs pass their
+    creation time, so each round of edits is announced once and rerunning
+    the same job still sends nothing twice. The result counts the rows
+    left waiting for a digest under "digest". `on_batch` is called once per
+    delivery batch, before it commits.
+    """
+    request_ids = list(request_ids)
+    if not request_ids:
+        return {"claimed": 0, SENT: 0, FAILED: 0, REJECTED: 0, DIGEST: 0}
+    if renotify_before is not None:
+        db.query(NotificationLog).filter(
+            NotificationLog.request_id.in_(request_ids),
+            NotificationLog.notification_type == notification_type,
+            NotificationLog.status == SENT,
+            NotificationLog.sent_at < renotify_before
+        ).delete(synchronize_session=False)
+    claimed = claim_recipients(db, request_ids, notification_type)
+    outcome = deliver_pending(db, request_ids, notification_type, on_batch=on_batch)
+    waiting = db.query(func.count(NotificationLog.id)).filter(
+        NotificationLog.request_id.in_(request_ids),
+        NotificationLog.notification_type == notification_type,
+        NotificationLog.status == DIGEST
+    ).scalar()
+    return {"claimed": claimed, **outcome, DIGEST: waiting}
@@ -0,0 +1,30 @@
+import functools
+from typing import Any, Callable
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+
+def off_event_loop(method: Callable) -> Callable:
+    """
+    For blocking methods, such as those of the SQLite cache and event
+    backends. Sync code run by AsyncSession.run_sync executes on the event
+    loop thread; called from there, the method runs on the threadpool and
+    is awaited through the session's greenlet, so the loop keeps serving
+    other requests while it waits on a lock.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if in_greenlet():
+            return await_only(run_in_threadpool(method, *args, **kwargs))
+        return method(*args, **kwargs)
+    return wrapper
+
+
+async def offload(blocking: bool, function: Callable, *args, **kwargs) -> Any:
+    """
+    Calls `function` from async code: on the threadpool if it may block,
+    directly if it only touches memory and a thread hop would cost more.
+    """
+    if blocking:
+        return await run_in_threadpool(function, *args, **kwargs)
+    return function(*args, **kwargs)
@@ -0,0 +1,355 @@
+import logging
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, event, func, insert, or_, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models.notification_job import MERGEABLE, NotificationJob
+from utils.notifications import fan_out_notifications, deliver_digests, DIGEST
+from utils.email import SENT, FAILED, REJECTED
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 200
+
+
+def enqueue_notification(
+    db: Session,
+    request_ids: Iterable[int],
+    notification_type: str,
+    coalesce_key: Optional[str] = None,
+    delay: float = 0
+) -> NotificationJob:
+    """
+    Adds a fan-out job to the caller's transaction; it becomes visible to
+    the workers, and wakes the in-process ones, when that transaction commits.
+
+    With a coalesce_key the job waits `delay` seconds, and work enqueued
+    under the same key meanwhile is merged into it instead of adding a
+    job of its own: five edits within the window make one fan-out.
+    """
+    request_ids = list(request_ids)
+    available_at = datetime.utcnow() + timedelta(seconds=delay)
+    if coalesce_key is None:
+        job = NotificationJob(notification_type=notification_type, request_ids=request_ids, available_at=available_at)
+        db.add(job)
+    else:
+        job = mergeable_job(db, coalesce_key)
+        if job is None:
+            # Skipped if a concurrent transaction queued a job under the key since the lookup; either way it is read back
+            db.execute(_insert_unless_mergeable(db.get_bind().dialect.name).values(
+                notification_type=notification_type,
+                request_ids=request_ids,
+                coalesce_key=coalesce_key,
+                available_at=available_at
+            ))
+            job = mergeable_job(db, coalesce_key)
+        job.request_ids = job.request_ids + [request_id for request_id in request_ids if request_id not in job.request_ids]
+    event.listen(db, "after_commit", lambda session: wake_workers(), once=True)
+    return job
+
+
+def _insert_unless_mergeable(dialect: str):
+    # The partial unique index allows one mergeable job per coalesce_key
+    conflict = {"index_elements": ["coalesce_key"], "index_where": text(MERGEABLE)}
+    if dialect == "postgresql":
+        return postgresql.insert(NotificationJob).on_conflict_do_nothing(**conflict)
+    if dialect == "sqlite":
+        return sqlite.insert(NotificationJob).on_conflict_do_nothing(**conflict)
+    return insert(NotificationJob)
+
+
+def mergeable_job(db: Session, coalesce_key: str) -> Optional[NotificationJob]:
+    """
+    The queued job that work under `coalesce_key` merges into. Only a job
+    that has not run yet: one that has already sent mail cannot absorb
+    newer work. A partial unique index allows one such job per key.
+    """
+    return db.query(NotificationJob).filter(
+        NotificationJob.coalesce_key == coalesce_key,
+        NotificationJob.status == "queued",
+        NotificationJob.attempts == 0
+    ).order_by(NotificationJob.id).first()
+
+
+def enqueue_update(db: Session, request_id: int) -> NotificationJob:
+    """
+    Announces an edit to a request once NOTIFY_COALESCE_SECONDS have
+    passed, together with any further edits made in the meantime.
+    """
+    return enqueue_notification(
+        db, [request_id], "update", coalesce_key=f"update:{request_id}", delay=settings.NOTIFY_COALESCE_SECONDS
+    )
+
+
+def schedule_digest(db: Session) -> NotificationJob:
+    """
+    Makes sure a digest run is queued, NOTIFY_DIGEST_MINUTES after the
+    first alert that is waiting for it.
+    """
+    return enqueue_notification(db, [], DIGEST, coalesce_key=DIGEST, delay=settings.NOTIFY_DIGEST_MINUTES * 60)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter: base, 2x base, 4x base ... capped,
+    each scaled by a random factor in [0.5, 1) so failed jobs spread out.
+    """
+    delay = min(settings.NOTIFY_RETRY_MAX_SECONDS, settings.NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim_jobs(db: Session, limit: int) -> Tuple[Optional[str], List[int]]:
+    """
+    Marks up to `limit` due jobs as running under a fresh claim token and
+    returns the token and the job ids. Queued jobs whose retry time has
+    come and running jobs whose worker died (lease expired) are both due.
+    The status check in the UPDATE keeps two workers from claiming the
+    same job.
+    """
+    now = datetime.utcnow()
+    due = or_(
+        and_(NotificationJob.status == "queued", NotificationJob.available_at <= now),
+        and_(NotificationJob.status == "running", NotificationJob.lease_expires_at < now)
+    )
+    candidates = db.query(NotificationJob.id).filter(due).order_by(NotificationJob.available_at, NotificationJob.id).limit(limit)
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    job_ids = [job_id for (job_id,) in candidates]
+    if not job_ids:
+        db.rollback()
+        return None, []
+
+    token = uuid.uuid4().hex
+    db.query(NotificationJob).filter(NotificationJob.id.in_(job_ids), due).update({
+        NotificationJob.status: "running",
+        NotificationJob.claimed_by: token,
+        NotificationJob.lease_expires_at: now + timedelta(seconds=settings.NOTIFY_LEASE_SECONDS),
+        NotificationJob.attempts: NotificationJob.attempts + 1
+    }, synchronize_session=False)
+    db.commit()
+    return token, [job_id for (job_id,) in db.query(NotificationJob.id).filter(NotificationJob.claimed_by == token).order_by(NotificationJob.id)]
+
+
+def renew_lease(db: Session, token: str):
+    """
+    Extends the lease of every job still running under `token`, so a
+    fan-out longer than NOTIFY_LEASE_SECONDS, and the jobs of its batch
+    waiting behind it, are not reclaimed while the worker is alive.
+    Joins the caller's transaction.
+    """
+    db.query(NotificationJob).filter(
+        NotificationJob.claimed_by == token, NotificationJob.status == "running"
+    ).update({
+        NotificationJob.lease_expires_at: datetime.utcnow() + timedelta(seconds=settings.NOTIFY_LEASE_SECONDS)
+    }, synchronize_session=False)
+
+
+def run_job(db: Session, job_id: int, token: str) -> Optional[str]:
+    """
+    Runs one job claimed under `token` and records the outcome: 'done',
+    'queued' again with a backoff delay, or 'failed' after
+    NOTIFY_MAX_ATTEMPTS. The lease is renewed after every delivery batch.
+    Fan-outs are idempotent, so running a job twice never notifies anyone
+    twice. Alerts held for a digest make sure a digest job is queued.
+    Returns None, recording nothing, if another worker reclaimed the job.
+    """
+    job = db.get(NotificationJob, job_id)
+    renew = partial(renew_lease, db, token)
+    try:
+        if job.notification_type == DIGEST:
+            outcome = deliver_digests(db, on_batch=renew)
+        else:
+            outcome = fan_out_notifications(
+                db, job.request_ids, job.notification_type,
+                renotify_before=job.created_at if job.notification_type == "update" else None,
+                on_batch=renew
+            )
+            if outcome[DIGEST]:
+                # Committed at once: a failed delivery below rolls back, and the held rows still need their digest
+                schedule_digest(db)
+                db.commit()
+        if outcome[FAILED]:
+            # Transient delivery failures stay 'failed' in the log and are resent on the next attempt
+            raise RuntimeError(f"{outcome[FAILED]} of {outcome[SENT] + outcome[FAILED] + outcome[REJECTED]} deliveries failed")
+    except Exception as e:
+        logger.exception(f"Notification job {job_id} failed")
+        db.rollback()
+        job = db.get(NotificationJob, job_id)
+        values = {NotificationJob.last_error: f"{type(e).__name__}: {e}"[:500]}
+        if job.attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+            values.update({NotificationJob.status: "failed", NotificationJob.finished_at: datetime.utcnow()})
+        else:
+            values.update({
+                NotificationJob.status: "queued",
+                NotificationJob.available_at: datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))
+            })
+    else:
+        values = {NotificationJob.status: "done", NotificationJob.finished_at: datetime.utcnow()}
+
+    # A worker whose lease ran out must not overwrite the run of the worker that reclaimed the job
+    recorded = db.query(NotificationJob).filter(
+        NotificationJob.id == job_id, NotificationJob.claimed_by == token
+    ).update({
+        **values, NotificationJob.claimed_by: None, NotificationJob.lease_expires_at: None
+    }, synchronize_session=False)
+    db.commit()
+    if not recorded:
+        logger.warning(f"Notification job {job_id} was reclaimed by another worker; its outcome is left to that worker")
+        return None
+    return values[NotificationJob.status]
+
+
+def process_available_jobs(session_factory: Callable[[], Session], limit: int = settings.NOTIFY_CLAIM_BATCH) -> dict:
+    """
+    Claims one batch of due jobs and runs them with a fresh session.
+    Returns how many jobs ended in each state.
+    """
+    outcome = {"done": 0, "queued": 0, "failed": 0}
+    db = session_factory()
+    try:
+        token, job_ids = claim_jobs(db, limit)
+        for job_id in job_ids:
+            status = run_job(db, job_id, token)
+            if status is not None:
+                outcome[status] += 1
+    finally:
+        db.close()
+    return outcome
+
+
+def purge_finished_jobs(db: Session) -> int:
+    cutoff = datetime.utcnow() - timedelta(hours=settings.NOTIFY_JOB_RETENTION_HOURS)
+    deleted = db.query(NotificationJob).filter(
+        NotificationJob.status == "done", NotificationJob.finished_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def outbox_stats(db: Session) -> dict:
+    """
+    Queue depth by state, age of the oldest due job and fan-out latency
+    (enqueue to done) over the most recent jobs. Read from the database, so
+    the numbers cover external workers too.
+    """
+    now = datetime.utcnow()
+    depth = dict(db.query(NotificationJob.status, func.count()).group_by(NotificationJob.status).all())
+    oldest = db.query(func.min(NotificationJob.available_at)).filter(
+        NotificationJob.status == "queued", NotificationJob.available_at <= now
+    ).scalar()
+    recent = db.query(NotificationJob.created_at, NotificationJob.finished_at).filter(
+        NotificationJob.status == "done"
+    ).order_by(NotificationJob.finished_at.desc()).limit(LATENCY_SAMPLES).all()
+    latencies = sorted((finished - created).total_seconds() for created, finished in recent)
+
+    return {
+        "queued": depth.get("queued", 0),
+        "running": depth.get("running", 0),
+        "done": depth.get("done", 0),
+        "failed": depth.get("failed", 0),
+        "oldest_due_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+        "latency_seconds": {
+            "samples": len(latencies),
+            "avg": sum(latencies) / len(latencies) if latencies else None,
+            "p50": latencies[len(latencies) // 2] if latencies else None,
+            "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+        },
+        "workers": _pool.stats() if _pool else None,
+    }
+
+
+class NotificationWorkerPool:
+    """
+    Worker threads that drain the notification outbox. Each thread opens
+    its own sessions, claims NOTIFY_CLAIM_BATCH jobs at a time and sleeps
+    for NOTIFY_POLL_SECONDS when the outbox is empty, unless woken by a commit.
+    """
+
+    def __init__(self, workers: int, session_factory: Callable[[], Session]):
+        self.workers = workers
+        self.session_factory = session_factory
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._counts = {"done": 0, "queued": 0, "failed": 0, "errors": 0}
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"notification-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        self._wake.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"threads": len(self._threads), **self._counts}
+
+    def _run(self):
+        idle_rounds = 0
+        while not self._stop.is_set():
+            # Cleared before the round so a commit during it triggers another one
+            self._wake.clear()
+            try:
+                outcome = process_available_jobs(self.session_factory)
+            except Exception:
+                logger.exception("Notification worker round failed")
+                outcome = {}
+                with self._lock:
+                    self._counts["errors"] += 1
+            with self._lock:
+                for state, count in outcome.items():
+                    self._counts[state] += count
+
+            if any(outcome.values()):
+                idle_rounds = 0
+                continue
+
+            idle_rounds += 1
+            if idle_rounds % 600 == 1:
+                db = self.session_factory()
+                try:
+                    purge_finished_jobs(db)
+                except Exception:
+                    logger.exception("Purging finished notification jobs failed")
+                finally:
+                    db.close()
+            self._wake.wait(settings.NOTIFY_POLL_SECONDS)
+
+
+_pool: Optional[NotificationWorkerPool] = None
+
+
+def start_workers(session_factory: Callable[[], Session], workers: int = settings.NOTIFY_WORKERS) -> NotificationWorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = NotificationWorkerPool(workers, session_factory)
+        _pool.start()
+    return _pool
+
+
+def stop_workers(timeout: Optional[float] = None):
+    global _pool
+    if _pool is not None:
+        _pool.stop(timeout)
+        _pool = None
+
+
+def wake_workers():
+    if _pool is not None:
+        _pool.wake()
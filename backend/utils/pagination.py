@@ -0,0 +1,70 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from models.request import Request
+from schemas.request import RequestFeedParams
+
+
+def encode_cursor(timestamp: datetime, request_id: int) -> str:
+    """
+    Encodes the (timestamp, id) position of the last row of a page as an opaque token.
+    """
+    raw = f"{timestamp.isoformat()}|{request_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, request_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(request_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def filter_requests(query, params: RequestFeedParams):
+    """
+    Applies the feed filters. Each equality filter has a matching
+    (column, timestamp, id) index on the requests table.
+    """
+    if params.urgency_level:
+        query = query.filter(Request.urgency_level == params.urgency_level)
+    if params.location:
+        query = query.filter(Request.location == params.location)
+    if params.user_id is not None:
+        query = query.filter(Request.user_id == params.user_id)
+    if params.since:
+        query = query.filter(Request.timestamp >= params.since)
+    if params.until:
+        query = query.filter(Request.timestamp < params.until)
+    return query
+
+
+def paginate_requests(query, params: RequestFeedParams) -> Tuple[list, Optional[str]]:
+    """
+    Returns one page of requests, newest first, and the cursor of the next page.
+    Seeks past the cursor instead of using OFFSET so deep pages cost the same
+    as the first one. Without a limit every matching request is returned.
+    """
+    query = filter_requests(query, params)
+
+    if params.cursor:
+        timestamp, request_id = decode_cursor(params.cursor)
+        query = query.filter(or_(
+            Request.timestamp < timestamp,
+            and_(Request.timestamp == timestamp, Request.id < request_id)
+        ))
+
+    query = query.order_by(Request.timestamp.desc(), Request.id.desc())
+    if params.limit is None:
+        return query.all(), None
+    rows = query.limit(params.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    return rows, next_cursor
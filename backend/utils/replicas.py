@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy.exc import DBAPIError
+from utils.cache import create_cache
+from utils.offload import offload
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Users who wrote in the last READ_YOUR_WRITES_SECONDS. Shared between
+# workers with the sqlite cache backend; never disabled, since without it
+# a writer could read a replica that has not caught up with their write.
+recent_writers = create_cache(
+    "memory" if settings.CACHE_BACKEND == "none" else settings.CACHE_BACKEND,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    max_bytes=settings.USER_CACHE_MAX_ENTRIES * 64,
+    ttl=settings.READ_YOUR_WRITES_SECONDS
+)
+
+
+def writer_key(user_id: int) -> str:
+    return f"writer:{user_id}"
+
+
+def mark_recent_writer(user_id: int):
+    recent_writers.set(writer_key(user_id), True)
+
+
+def is_recent_writer(user_id: int) -> bool:
+    return recent_writers.get(writer_key(user_id)) is not None
+
+
+async def mark_writer_after_response(request: Request, call_next):
+    """
+    HTTP middleware starting the read-your-writes window of the user whose
+    write request this was (request.state.writer_id, set when it was
+    authenticated). It runs once the route has returned, so the write is
+    committed when the window starts, however long a bulk upload took.
+    """
+    response = await call_next(request)
+    user_id = getattr(request.state, "writer_id", None)
+    if user_id is not None:
+        await offload(recent_writers.blocking, mark_recent_writer, user_id)
+    return response
+
+
+def reader_id(authorization: Optional[str]) -> Optional[int]:
+    """
+    The user id claim of a bearer token. The signature is not checked: the
+    id only decides which database a read goes to, and the route still
+    authenticates the token itself.
+    """
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        user_id = jwt.get_unverified_claims(authorization[7:]).get("uid")
+    except JWTError:
+        return None
+    return user_id if isinstance(user_id, int) else None
+
+
+class ReplicaRouter:
+    """
+    Opens read-only sessions on the replicas, round-robin. Reads go to the
+    primary instead for users who wrote within READ_YOUR_WRITES_SECONDS,
+    so they see their own changes before replication catches up, and when
+    no replica is reachable. Sessions connect before they are handed out:
+    a replica that fails to connect is skipped for `retry_seconds` and the
+    read moves on to the next one rather than failing.
+
+    `primary` and `replicas` are sessionmakers, or async_sessionmakers for
+    async_session.
+    """
+
+    def __init__(self, primary: Callable, replicas: List[Callable], retry_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = [0.0] * len(replicas)
+        self._stats = {"replica_reads": 0, "primary_reads": 0, "read_your_writes": 0, "failovers": 0}
+
+    def _candidates(self, user_id: Optional[int]) -> List[int]:
+        """
+        The replicas to try, in order; none when the read must see the primary.
+        """
+        if not self.replicas:
+            return []
+        if user_id is not None and is_recent_writer(user_id):
+            self._count("read_your_writes")
+            return []
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % len(self.replicas)
+            order = [(start + offset) % len(self.replicas) for offset in range(len(self.replicas))]
+            return [index for index in order if self._down_until[index] <= now]
+
+    def _failed(self, index: int, error: Exception):
+        logger.warning(f"Read replica {index} is unreachable, skipping it for {self.retry_seconds}s: {error}")
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+            self._stats["failovers"] += 1
+
+    def session(self, user_id: Optional[int] = None):
+        for index in self._candidates(user_id):
+            db = self.replicas[index]()
+            try:
+                db.connection()
+            except DBAPIError as e:
+                db.close()
+                self._failed(index, e)
+                continue
+            self._count("replica_reads")
+            return db
+        self._count("primary_reads")
+        return self.primary()
+
+    async def async_session(self, user_id: Optional[int] = None):
+        for index in await offload(recent_writers.blocking, self._candidates, user_id):
+            db = self.replicas[index]()
+            try:
+                await db.connection()
+            except DBAPIError as e:
+                await db.close()
+                self._failed(index, e)
+                continue
+            self._count("replica_reads")
+            return db
+        self._count("primary_reads")
+        return self.primary()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": len(self.replicas),
+                "healthy": sum(down_until <= now for down_until in self._down_until),
+                **self._stats
+            }
@@ -0,0 +1,150 @@
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, or_, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, joinedload
+from models.request import Request
+
+# SQLite: external-content FTS5 table over requests, kept in sync by triggers
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE requests_fts USING fts5(
+        title, description, location,
+        content='requests', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS requests_fts_ai AFTER INSERT ON requests BEGIN
+        INSERT INTO requests_fts (rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS requests_fts_ad AFTER DELETE ON requests BEGIN
+        INSERT INTO requests_fts (requests_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS requests_fts_au AFTER UPDATE OF title, description, location ON requests BEGIN
+        INSERT INTO requests_fts (requests_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO requests_fts (rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    # Index the rows that existed before the table did
+    "INSERT INTO requests_fts (requests_fts) VALUES ('rebuild')",
+]
+
+# bm25 column weights for (title, description, location); lower scores rank higher
+SQLITE_WEIGHTS = "10.0, 1.0, 5.0"
+
+# PostgreSQL: the same expression backs the GIN index and every query, so
+# the index is maintained by the database on every write
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def search_terms(q: str) -> List[str]:
+    """
+    Splits a query into plain word tokens, so no operator syntax of either
+    engine ever reaches it.
+    """
+    return re.findall(r"\w+", (q or "").lower())
+
+
+def ensure_search_index(engine: Engine):
+    """
+    Creates the full-text index for the current database if it is missing.
+    Safe to run again. On PostgreSQL the GIN index is built CONCURRENTLY,
+    like utils.migrate.create_indexes, so writes to requests continue.
+    """
+    if engine.dialect.name == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_requests_search ON requests USING GIN (({PG_SEARCH_VECTOR}))"
+            ))
+        return
+    with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'requests_fts'")
+            ).first()
+            if not exists:
+                for statement in SQLITE_SEARCH_DDL:
+                    conn.execute(text(statement))
+
+
+def _match_sqlite(conn: Connection, terms: List[str], limit: int, offset: int) -> List[int]:
+    # Every term must match; the last one also as a prefix while the user is typing
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    rows = conn.execute(
+        text(
+            f"SELECT rowid FROM requests_fts WHERE requests_fts MATCH :match "
+            f"ORDER BY bm25(requests_fts, {SQLITE_WEIGHTS}), rowid DESC LIMIT :limit OFFSET :offset"
+        ),
+        {"match": match, "limit": limit, "offset": offset}
+    )
+    return [row[0] for row in rows]
+
+
+def _match_postgresql(conn: Connection, terms: List[str], limit: int, offset: int) -> List[int]:
+    query = " & ".join(terms) + ":*"
+    rows = conn.execute(
+        text(
+            f"SELECT id FROM requests, to_tsquery('english', :query) AS query "
+            f"WHERE ({PG_SEARCH_VECTOR}) @@ query "
+            f"ORDER BY ts_rank(({PG_SEARCH_VECTOR}), query) DESC, id DESC LIMIT :limit OFFSET :offset"
+        ),
+        {"query": query, "limit": limit, "offset": offset}
+    )
+    return [row[0] for row in rows]
+
+
+def _match_substring(db: Session, terms: List[str], limit: int, offset: int) -> List[int]:
+    # No inverted index on other databases: every term must appear somewhere, newest first
+    conditions = [
+        or_(Request.title.ilike(f"%{term}%"), Request.description.ilike(f"%{term}%"), Request.location.ilike(f"%{term}%"))
+        for term in terms
+    ]
+    rows = db.query(Request.id).filter(and_(*conditions)).order_by(
+        Request.timestamp.desc(), Request.id.desc()
+    ).limit(limit).offset(offset)
+    return [row[0] for row in rows]
+
+
+def search_requests(db: Session, q: str, limit: int, offset: int = 0) -> Tuple[List[Request], Optional[int]]:
+    """
+    Returns one page of requests matching every word of `q`, best match
+    first, and the offset of the next page (None on the last page).
+    """
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        ids = _match_sqlite(db.connection(), terms, limit + 1, offset)
+    elif dialect == "postgresql":
+        ids = _match_postgresql(db.connection(), terms, limit + 1, offset)
+    else:
+        ids = _match_substring(db, terms, limit + 1, offset)
+
+    next_offset = None
+    if len(ids) > limit:
+        ids = ids[:limit]
+        next_offset = offset + limit
+    if not ids:
+        return [], None
+
+    by_id = {
+        request.id: request
+        for request in db.query(Request).options(joinedload(Request.user)).filter(Request.id.in_(ids))
+    }
+    return [by_id[request_id] for request_id in ids if request_id in by_id], next_offset
@@ -0,0 +1,71 @@
+from typing import Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models.user import User as UserModel
+from models.volunteer_routing import VolunteerServiceArea, VolunteerAreaCell, VolunteerCategory
+from schemas.user import ServiceArea, ServicePreferences
+from utils.geo import geocode, covering_cells
+from config import settings
+
+
+def resolve_area(area: ServiceArea) -> Tuple[float, float]:
+    """
+    The center of a service area: its coordinates if given, otherwise its
+    geocoded location. Raises ValueError if neither works.
+    """
+    if area.latitude is not None and area.longitude is not None:
+        return area.latitude, area.longitude
+    if area.location:
+        coordinates = geocode(area.location)
+        if coordinates is None:
+            raise ValueError(f"Could not locate '{area.location}'")
+        return coordinates
+    raise ValueError("Each service area needs a location or latitude and longitude")
+
+
+def set_service_preferences(db: Session, user_id: int, preferences: ServicePreferences):
+    """
+    Replaces a volunteer's service areas and categories. Each area is
+    stored as entered and as the SERVICE_AREA_PRECISION geohash cells
+    covering it, which is what notification routing looks up. Raises
+    ValueError for areas that are too many, too large or cannot be located.
+    """
+    if len(preferences.areas) > settings.SERVICE_AREA_MAX_AREAS:
+        raise ValueError(f"At most {settings.SERVICE_AREA_MAX_AREAS} service areas")
+    areas = []
+    for area in preferences.areas:
+        if area.radius_km > settings.SERVICE_AREA_MAX_RADIUS_KM:
+            raise ValueError(f"Service areas can have a radius of at most {settings.SERVICE_AREA_MAX_RADIUS_KM:g} km")
+        lat, lon = resolve_area(area)
+        areas.append({"user_id": user_id, "location": area.location, "latitude": lat, "longitude": lon, "radius_km": area.radius_km})
+    cells = sorted({
+        cell
+        for area in areas
+        for cell in covering_cells(area["latitude"], area["longitude"], area["radius_km"], settings.SERVICE_AREA_PRECISION)
+    })
+
+    for model in (VolunteerServiceArea, VolunteerAreaCell, VolunteerCategory):
+        db.query(model).filter(model.user_id == user_id).delete(synchronize_session=False)
+    if areas:
+        db.execute(insert(VolunteerServiceArea), areas)
+        db.execute(insert(VolunteerAreaCell), [{"user_id": user_id, "cell": cell} for cell in cells])
+    if preferences.categories:
+        db.execute(insert(VolunteerCategory), [
+            {"user_id": user_id, "category": category} for category in sorted(set(preferences.categories))
+        ])
+    db.query(UserModel).filter(UserModel.id == user_id).update(
+        {UserModel.service_scope: "areas" if areas else "everywhere"}, synchronize_session=False
+    )
+    db.commit()
+
+
+def get_service_preferences(db: Session, user_id: int) -> ServicePreferences:
+    areas = db.query(VolunteerServiceArea).filter(VolunteerServiceArea.user_id == user_id).order_by(VolunteerServiceArea.id)
+    categories = db.query(VolunteerCategory.category).filter(VolunteerCategory.user_id == user_id).order_by(VolunteerCategory.category)
+    return ServicePreferences(
+        areas=[
+            ServiceArea(location=area.location, latitude=area.latitude, longitude=area.longitude, radius_km=area.radius_km)
+            for area in areas
+        ],
+        categories=[category for (category,) in categories]
+    )
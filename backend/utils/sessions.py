@@ -0,0 +1,238 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.auth.token import create_access_token, create_refresh_token
+from models.auth_session import RefreshToken, RevokedSession
+from models.user import User
+from utils.bloom import BloomFilter
+from config import settings
+
+# Filter hits whose table lookup is remembered, so a false positive costs one query
+CONFIRMED_CACHE_SIZE = 4096
+
+
+def new_token_id() -> str:
+    return uuid.uuid4().hex
+
+
+def issue_tokens(db: Session, user, session_id: str = None) -> dict:
+    """
+    An access token and a refresh token for `user` in session `session_id`
+    (a new session when logging in). Commits the refresh token.
+    """
+    session_id = session_id or new_token_id()
+    token_id = new_token_id()
+    db.add(RefreshToken(
+        id=token_id,
+        session_id=session_id,
+        user_id=user.id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    db.commit()
+    claims = {"sub": user.email, "uid": user.id, "sid": session_id}
+    return {
+        # The id lets authentication use the user cache; role and username are for the client
+        "access_token": create_access_token(data={**claims, "role": user.role, "username": user.username}),
+        "refresh_token": create_refresh_token(data={**claims, "jti": token_id}),
+        "token_type": "bearer"
+    }
+
+
+def decode_refresh_token(token: str) -> dict:
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise ValueError("Invalid refresh token")
+    if claims.get("type") != "refresh" or not all(claims.get(key) for key in ("jti", "sid", "uid", "sub")):
+        raise ValueError("Invalid refresh token")
+    return claims
+
+
+def rotate_refresh_token(db: Session, token: str) -> dict:
+    """
+    Exchanges a refresh token for a new access and refresh token in the
+    same session. Each refresh token works once: presenting a used one
+    again means a copy was stolen, so the session is revoked for whoever
+    holds it.
+    """
+    claims = decode_refresh_token(token)
+    now = datetime.utcnow()
+    claimed = db.query(RefreshToken).filter(
+        RefreshToken.id == claims["jti"],
+        RefreshToken.used_at.is_(None),
+        RefreshToken.revoked_at.is_(None),
+        RefreshToken.expires_at > now
+    ).update({RefreshToken.used_at: now}, synchronize_session=False)
+    if not claimed:
+        stored = db.query(RefreshToken).filter(RefreshToken.id == claims["jti"]).first()
+        if stored is not None and stored.used_at is not None and stored.revoked_at is None:
+            revoke_session(db, stored.session_id)
+        db.commit()
+        raise ValueError("Refresh token has expired, been used or been revoked")
+
+    user = db.query(User).filter(User.id == claims["uid"]).first()
+    if user is None or user.email != claims["sub"]:
+        db.rollback()
+        raise ValueError("Invalid refresh token")
+    return issue_tokens(db, user, claims["sid"])
+
+
+def revoke_session(db: Session, session_id: str):
+    """
+    Revokes a session's refresh tokens and, through the revocation list,
+    its access tokens. The caller commits.
+    """
+    now = datetime.utcnow()
+    db.query(RefreshToken).filter(
+        RefreshToken.session_id == session_id, RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    if db.query(RevokedSession.id).filter(RevokedSession.session_id == session_id).first() is None:
+        # Needed only until the session's last access token expires
+        db.add(RevokedSession(
+            session_id=session_id,
+            revoked_at=now,
+            expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        ))
+    event.listen(db, "after_commit", lambda session: revocation_list.add(session_id), once=True)
+
+
+def logout(db: Session, token: str):
+    claims = decode_refresh_token(token)
+    revoke_session(db, claims["sid"])
+    purge_expired_sessions(db)
+    db.commit()
+
+
+def purge_expired_sessions(db: Session) -> int:
+    now = datetime.utcnow()
+    removed = db.query(RevokedSession).filter(RevokedSession.expires_at < now).delete(synchronize_session=False)
+    removed += db.query(RefreshToken).filter(RefreshToken.expires_at < now).delete(synchronize_session=False)
+    return removed
+
+
+class RevocationList:
+    """
+    The revoked sessions, checked on every authenticated request. A Bloom
+    filter rules out almost every session from memory; only a possible
+    match is confirmed with the revoked_sessions table. Sessions revoked by
+    other processes are loaded every `sync_seconds`: each sync reads the
+    rows revoked since the previous one started, less `overlap_seconds`.
+    Row ids would miss a revocation whose transaction commits after one with
+    a higher id; the overlap also picks up rows committed late and clocks
+    that drift between processes.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], capacity: int, error_rate: float, sync_seconds: float,
+                 overlap_seconds: float = settings.REVOCATION_SYNC_OVERLAP_SECONDS):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.overlap_seconds = overlap_seconds
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_at = None  # when the last sync started; None loads every row
+        self._next_sync = 0.0
+        self._confirmed = OrderedDict()  # session id -> revoked, for ids the filter matched
+        self._stats = {"checks": 0, "filter_matches": 0, "lookups": 0, "syncs": 0}
+
+    def add(self, session_id: str):
+        with self._lock:
+            self._filter.add(session_id)
+            self._remember(session_id, True)
+
+    def is_revoked(self, session_id: str) -> bool:
+        self._sync_if_due()
+        with self._lock:
+            self._stats["checks"] += 1
+            if session_id not in self._filter:
+                return False
+            self._stats["filter_matches"] += 1
+            known = self._confirmed.get(session_id)
+            if known is not None:
+                return known
+            self._stats["lookups"] += 1
+
+        db = self.session_factory()
+        try:
+            revoked = db.query(RevokedSession.id).filter(RevokedSession.session_id == session_id).first() is not None
+        finally:
+            db.close()
+        with self._lock:
+            self._remember(session_id, revoked)
+        return revoked
+
+    def is_revoked_in_memory(self, session_id: str) -> Optional[bool]:
+        """
+        is_revoked when it can be answered without the database, None when
+        a sync is due or the filter matched a session not confirmed yet.
+        Lets async callers skip the thread hop on almost every check.
+        """
+        with self._lock:
+            if time.monotonic() >= self._next_sync:
+                return None
+            if session_id not in self._filter:
+                self._stats["checks"] += 1
+                return False
+            known = self._confirmed.get(session_id)
+            if known is not None:
+                self._stats["checks"] += 1
+                self._stats["filter_matches"] += 1
+            return known
+
+    def _remember(self, session_id: str, revoked: bool):
+        self._confirmed[session_id] = revoked
+        self._confirmed.move_to_end(session_id)
+        while len(self._confirmed) > CONFIRMED_CACHE_SIZE:
+            self._confirmed.popitem(last=False)
+
+    def _sync_if_due(self):
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self.sync_seconds
+            # Expired rows are purged from the table but stay in the filter; start over once it is full
+            rebuild = self._filter.count >= self.capacity
+            synced_at = None if rebuild else self._synced_at
+
+        started = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            query = db.query(RevokedSession.session_id).filter(RevokedSession.expires_at >= started)
+            if synced_at is not None:
+                query = query.filter(RevokedSession.revoked_at >= synced_at - timedelta(seconds=self.overlap_seconds))
+            rows = query.all()
+        finally:
+            db.close()
+
+        with self._lock:
+            if rebuild:
+                self._filter = BloomFilter(self.capacity, self.error_rate)
+                self._confirmed.clear()
+            for (session_id,) in rows:
+                # Rows in the overlap come back every sync; adding them again would fill the filter
+                if session_id not in self._filter:
+                    self._filter.add(session_id)
+                self._remember(session_id, True)
+            self._synced_at = started
+            self._stats["syncs"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._filter.stats(), **self._stats}
+
+
+# Sessions whose access tokens are rejected before they expire
+revocation_list = RevocationList(
+    SessionLocal,
+    settings.REVOCATION_FILTER_CAPACITY,
+    settings.REVOCATION_FILTER_ERROR_RATE,
+    settings.REVOCATION_SYNC_SECONDS
+)
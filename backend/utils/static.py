@@ -0,0 +1,32 @@
+import os
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from utils.uploads import CONTENT_ADDRESSED_NAME
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ContentAddressedStaticFiles(StaticFiles):
+    """
+    Serves uploads. Content-addressed files can never change, so they get a
+    strong ETag derived from their name and a year-long immutable
+    Cache-Control; Range requests are handled by FileResponse. Files from
+    before content addressing keep the default revalidating behaviour.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        if not CONTENT_ADDRESSED_NAME.fullmatch(relative):
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        stem = os.path.splitext(os.path.basename(relative))[0]
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={"ETag": f'"{stem}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,210 @@
+import os
+import re
+import hashlib
+import tempfile
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from models.photo_blob import PhotoBlob
+from utils.derivatives import VARIANTS, variant_filename
+
+CHUNK_SIZE = 1024 * 1024
+SNIFF_BYTES = 12
+
+# Routes taking a photo, and the room allowed for the form fields and boundaries around it
+UPLOAD_ROUTES = {"/request/request-help"}
+MULTIPART_OVERHEAD = 64 * 1024
+
+# "<2 hex>/<64 hex digest>[_<variant>].<ext>"
+CONTENT_ADDRESSED_NAME = re.compile(r"(?:[0-9a-f]{2}/)?([0-9a-f]{64})(?:_[a-z]+)?\.[a-z0-9]+")
+
+
+class PendingUpload(NamedTuple):
+    temp_path: str
+    filename: str
+    digest: str
+    size: int
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """
+    Identifies an image from its magic bytes and returns the canonical
+    extension, or None if it is not one of the accepted formats.
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def photo_digest(filename: str) -> Optional[str]:
+    """
+    Returns the content digest encoded in a stored photo name, or None for
+    files uploaded before photos were content-addressed.
+    """
+    match = CONTENT_ADDRESSED_NAME.fullmatch(filename or "")
+    return match.group(1) if match else None
+
+
+def _open_temp_file(upload_dir: str):
+    fd, path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=".part")
+    return os.fdopen(fd, "wb"), path
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    HTTP middleware for the photo upload routes. Starlette spools the whole
+    multipart body before the route reads the photo, so the size has to be
+    checked here, from Content-Length: a body cannot outgrow its declared
+    length, and a chunked upload without one is refused (411).
+    receive_upload still checks the photo's actual size.
+    """
+    if request.method == "POST" and request.url.path in UPLOAD_ROUTES:
+        content_length = request.headers.get("content-length")
+        if not content_length or not content_length.isdigit():
+            return JSONResponse(status_code=411, content={"detail": "Uploads need a Content-Length header"})
+        if int(content_length) > settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Photo exceeds the {settings.MAX_UPLOAD_SIZE} byte limit"}
+            )
+    return await call_next(request)
+
+
+async def receive_upload(photo: UploadFile, upload_dir: str = settings.UPLOAD_DIR) -> PendingUpload:
+    """
+    Streams an uploaded photo to a temp file in chunks, hashing it on the
+    way, and rejects it as soon as it exceeds MAX_UPLOAD_SIZE or its first
+    bytes are not an accepted image. File I/O runs in the threadpool so the
+    event loop never blocks. The file is not visible until finalize_upload.
+    """
+    extension = os.path.splitext(photo.filename or "")[1].lower()
+    if extension not in settings.ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type '{extension}'")
+
+    out, temp_path = await run_in_threadpool(_open_temp_file, upload_dir)
+    try:
+        size = 0
+        header = b""
+        image_type = None
+        sha256 = hashlib.sha256()
+        with out:
+            while chunk := await photo.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Photo exceeds the {settings.MAX_UPLOAD_SIZE} byte limit"
+                    )
+                if image_type is None:
+                    header += chunk[:SNIFF_BYTES]
+                    if len(header) >= SNIFF_BYTES:
+                        image_type = sniff_image_type(header)
+                        if image_type is None:
+                            raise HTTPException(status_code=415, detail="File content is not a supported image")
+                sha256.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+
+        if image_type is None:
+            raise HTTPException(status_code=415, detail="File content is not a supported image")
+
+        digest = sha256.hexdigest()
+        return PendingUpload(temp_path, f"{digest[:2]}/{digest}{image_type}", digest, size)
+    except BaseException:
+        await run_in_threadpool(_discard, temp_path)
+        raise
+
+
+def finalize_upload(pending: PendingUpload, upload_dir: str = settings.UPLOAD_DIR):
+    """
+    Publishes a received upload under its content address with an atomic
+    rename. Identical content is already on disk, so the copy is dropped.
+    Call after the reference to it has been committed.
+    """
+    target = os.path.join(upload_dir, pending.filename)
+    if os.path.exists(target):
+        _discard(pending.temp_path)
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(pending.temp_path, target)
+
+
+def discard_upload(pending: PendingUpload):
+    _discard(pending.temp_path)
+
+
+async def store_upload(photo: UploadFile, upload_dir: str = settings.UPLOAD_DIR) -> str:
+    """
+    Receives and publishes a photo without reference counting.
+    Returns the stored file name, relative to upload_dir.
+    """
+    pending = await receive_upload(photo, upload_dir)
+    await run_in_threadpool(finalize_upload, pending, upload_dir)
+    return pending.filename
+
+
+def retain_photo(db: Session, pending: PendingUpload):
+    """
+    Adds a reference to the blob inside the caller's transaction.
+    """
+    updated = db.query(PhotoBlob).filter(PhotoBlob.digest == pending.digest).update(
+        {PhotoBlob.refcount: PhotoBlob.refcount + 1}, synchronize_session=False
+    )
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(PhotoBlob(digest=pending.digest, filename=pending.filename, size=pending.size, refcount=1))
+    except IntegrityError:
+        # Another request stored the same content first
+        db.query(PhotoBlob).filter(PhotoBlob.digest == pending.digest).update(
+            {PhotoBlob.refcount: PhotoBlob.refcount + 1}, synchronize_session=False
+        )
+
+
+def release_photo(db: Session, filename: Optional[str]):
+    """
+    Drops a reference inside the caller's transaction. Follow the commit
+    with collect_photo to remove files nobody references any more.
+    """
+    digest = photo_digest(filename)
+    if digest:
+        db.query(PhotoBlob).filter(PhotoBlob.digest == digest).update(
+            {PhotoBlob.refcount: PhotoBlob.refcount - 1}, synchronize_session=False
+        )
+
+
+def collect_photo(db: Session, filename: Optional[str], upload_dir: str = settings.UPLOAD_DIR) -> bool:
+    """
+    Deletes the blob and its files if no request references it. The row is
+    deleted and the files removed before the commit, so an upload of the
+    same content either keeps the blob alive or waits and writes it again.
+    """
+    digest = photo_digest(filename)
+    if not digest:
+        return False
+
+    deleted = db.query(PhotoBlob).filter(PhotoBlob.digest == digest, PhotoBlob.refcount <= 0).delete(
+        synchronize_session=False
+    )
+    if deleted:
+        for name in [filename] + [variant_filename(filename, variant) for variant in VARIANTS]:
+            _discard(os.path.join(upload_dir, name))
+    db.commit()
+    return bool(deleted)
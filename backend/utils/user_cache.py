@@ -0,0 +1,64 @@
+from typing import Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.user import User
+from utils.cache import create_cache, feed_cache
+from config import settings
+
+# The fields authentication needs; a record is a few hundred bytes
+USER_FIELDS = ("id", "username", "email", "role")
+
+# Users by id, so authenticated requests do not look the user up every time
+user_cache = create_cache(
+    settings.CACHE_BACKEND,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    max_bytes=settings.USER_CACHE_MAX_ENTRIES * 512,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def get_cached_user(user_id: int) -> Optional[dict]:
+    return user_cache.get(user_tag(user_id))
+
+
+def cache_user(user: User) -> dict:
+    record = {field: getattr(user, field) for field in USER_FIELDS}
+    user_cache.set(user_tag(user.id), record, tags=[user_tag(user.id)])
+    return record
+
+
+def invalidate_users(user_ids: Iterable[int]):
+    tags = [user_tag(user_id) for user_id in user_ids]
+    user_cache.invalidate_tags(tags)
+    # Feed pages show each request's owner and are tagged with them
+    feed_cache.invalidate_tags(tags)
+
+
+# Any session that changes or deletes a user drops its cached record and
+# the feed pages showing it: when the change is flushed, and again after
+# commit so a lookup made in between cannot re-cache the old row. Bulk
+# query(User).update() bypasses these hooks and must call invalidate_users
+# itself.
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User) and obj.id is not None}
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+        invalidate_users(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    changed = session.info.pop("changed_users", None)
+    if changed:
+        invalidate_users(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session):
+    session.info.pop("changed_users", None)
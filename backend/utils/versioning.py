@@ -0,0 +1,42 @@
+import hashlib
+from typing import Optional
+from sqlalchemy.orm import Session
+from models.change_version import ChangeVersion
+
+REQUESTS = "requests"
+
+
+def bump_version(db: Session, name: str = REQUESTS):
+    """
+    Increments the change version inside the caller's transaction, so the
+    new version becomes visible together with the write it describes.
+    """
+    updated = db.query(ChangeVersion).filter(ChangeVersion.name == name).update(
+        {ChangeVersion.version: ChangeVersion.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.add(ChangeVersion(name=name, version=1))
+
+
+def get_version(db: Session, name: str = REQUESTS) -> int:
+    version = db.query(ChangeVersion.version).filter(ChangeVersion.name == name).scalar()
+    return version or 0
+
+
+def make_etag(version: int, *parts) -> str:
+    """
+    Weak ETag for a listing: the change version plus a digest of everything
+    else that shapes the response (viewer, filters, cursor).
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
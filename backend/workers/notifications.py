@@ -0,0 +1,37 @@
+"""
+Standalone notification worker, for running the outbox outside the API
+processes (NOTIFY_WORKER_MODE=external).
+
+Usage (from the backend directory): python -m workers.notifications [workers]
+"""
+import sys
+import signal
+import threading
+import logging
+
+import models  # registers every table and mapper
+from database import engine, SessionLocal
+from migrations import MIGRATIONS
+from utils.migrate import check_schema
+from utils.outbox import start_workers, stop_workers
+from config import settings
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else settings.NOTIFY_WORKERS
+
+    check_schema(engine, MIGRATIONS, settings.MIGRATE_ON_STARTUP)
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stopped.set())
+
+    start_workers(SessionLocal, workers)
+    print(f"✅ Notification workers running ({workers} threads). Press Ctrl+C to stop.")
+    stopped.wait()
+    print("Stopping notification workers...")
+    stop_workers()
+
+
+if __name__ == "__main__":
+    main()